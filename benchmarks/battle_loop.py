@@ -0,0 +1,76 @@
+import argparse
+import time
+from game import commands
+from game.config import Config
+from game.state_machine import StateMachine
+from game.state_machine_action import StateMachineAction
+
+
+def battle_only_config(config_file) -> Config:
+    config = Config.from_file(config_file)
+    config.events_weights = dict((event, 0) for event in config.events_weights)
+    config.events_weights['battle'] = 1
+    return config
+
+
+def admin_action(command: str, *args) -> StateMachineAction:
+    return StateMachineAction(command, args, is_given_by_admin=True)
+
+
+def user_action(command: str, *args) -> StateMachineAction:
+    return StateMachineAction(command, args)
+
+
+def enter_tower(state_machine: StateMachine):
+    state_machine.on_action(admin_action(commands.STARTED))
+    state_machine.on_action(user_action(commands.ENTER_TOWER))
+
+
+def fight_battle(state_machine: StateMachine) -> int:
+    turns = 0
+    state_machine.on_action(user_action(commands.APPROACH))
+    while state_machine.is_waiting_for_user_action():
+        state_machine.on_action(user_action(commands.ATTACK))
+        turns += 1
+    return turns
+
+
+def fight_auto_battle(state_machine: StateMachine):
+    state_machine.on_action(user_action(commands.AUTO))
+    while state_machine.is_waiting_for_user_action():
+        # Auto battle gives up a fight taking too long, the rest is fought turn by turn.
+        state_machine.on_action(user_action(commands.ATTACK))
+
+
+def run(config: Config, battles: int) -> (int, float):
+    state_machine = StateMachine(config, 'benchmark')
+    enter_tower(state_machine)
+    turns = 0
+    start = time.perf_counter()
+    for _ in range(battles):
+        turns += fight_battle(state_machine)
+        if state_machine.is_finished():
+            state_machine.on_action(admin_action(commands.RESTART))
+            enter_tower(state_machine)
+        else:
+            state_machine.on_action(admin_action(commands.BATTLE_EVENT))
+    return turns, time.perf_counter() - start
+
+
+def main():
+    args = parse_args()
+    config = battle_only_config(args.game_config)
+    turns, elapsed = run(config, args.battles)
+    print(f"{args.battles} battles, {turns} turns in {elapsed:.3f}s "
+          f"({turns / elapsed:.0f} turns/s, {elapsed / turns * 1e6:.1f} us/turn).")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('game_config', type=argparse.FileType('r'))
+    parser.add_argument('-n', '--battles', type=int, default=2000)
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    main()
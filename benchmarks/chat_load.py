@@ -0,0 +1,186 @@
+import argparse
+import asyncio
+import collections
+import logging
+import os.path
+import random
+import re
+import statistics
+import tempfile
+import time
+from benchmarks.mock_twitch_irc_server import MockTwitchIrcServer
+from game.config import Config
+from game.controller import Controller
+from twitch_bot.ad_bot import AdBot
+from twitch_game_mediator import TwitchGameMediator
+
+CHANNEL_NAME_PREFIX = 'loadtest'
+BOT_NICK = 'adbot'
+COMMANDS = ['help', 'fam_stats', 'inventory', 'floor', 'state']
+MENTION_REGEX = re.compile(r'@(?P<name>\w+):')
+
+
+class LatencyTracker:
+    def __init__(self):
+        self._pending_commands = collections.defaultdict(collections.deque)
+        self.latencies = []
+        self.bot_messages_count = 0
+        self.unsolicited_mentions_count = 0
+
+    def command_sent(self, user_name: str):
+        self._pending_commands[user_name].append(time.monotonic())
+
+    def handle_bot_message(self, channel_name: str, nick: str, content: str):
+        now = time.monotonic()
+        self.bot_messages_count += 1
+        for match in MENTION_REGEX.finditer(content):
+            pending_commands = self._pending_commands.get(match.group('name'))
+            if not pending_commands:
+                self.unsolicited_mentions_count += 1
+                continue
+            self.latencies.append(now - pending_commands.popleft())
+
+    @property
+    def pending_commands_count(self) -> int:
+        return sum(len(pending_commands) for pending_commands in self._pending_commands.values())
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    if len(sorted_values) == 0:
+        return float('nan')
+    return sorted_values[min(int(len(sorted_values) * fraction), len(sorted_values) - 1)]
+
+
+async def wait_for(condition, timeout: float, interval: float=0.05) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        await asyncio.sleep(interval)
+    return True
+
+
+async def run(args) -> (LatencyTracker, MockTwitchIrcServer, AdBot, list[Controller], float):
+    rate_limit_messages = AdBot.RATE_LIMITS[args.rate_limit]
+    server = MockTwitchIrcServer(
+        rate_limit_messages=rate_limit_messages,
+        rate_limit_period=AdBot.RATE_LIMIT_PERIOD,
+        moderator_nicks={BOT_NICK} if args.rate_limit != 'normal' else frozenset())
+    latency_tracker = LatencyTracker()
+    server.add_message_handler(latency_tracker.handle_bot_message)
+    await server.start()
+
+    game_config = Config.from_file(args.game_config)
+    state_files_directory = tempfile.TemporaryDirectory(prefix='ad_bot_load_')
+    channels_names = [f'{CHANNEL_NAME_PREFIX}{index}' for index in range(args.channels)]
+    bot_config = {
+        'OATH_TOKEN': 'oauth:loadtest',
+        'CLIENT_ID': '',
+        'NICK': BOT_NICK,
+        'PREFIX': '!',
+        'CHANNELS': channels_names,
+        'EXCLUDED_USERS': [BOT_NICK],
+        'RATE_LIMIT': args.rate_limit,
+        'OUTBOUND_QUEUE_SIZE': args.queue_size,
+        'IRC_HOST': server.url
+    }
+    ad_bot = AdBot(bot_config, asyncio.get_running_loop())
+    game_controllers = []
+    bot_ready = asyncio.Event()
+    for channel_name in channels_names:
+        channel_state_files_directory = os.path.join(state_files_directory.name, channel_name)
+        os.mkdir(channel_state_files_directory)
+        game_controller = Controller(game_config, channel_state_files_directory)
+        game_controllers.append(game_controller)
+        bot_channel = ad_bot.channel(channel_name)
+        TwitchGameMediator(bot_channel, game_controller, args.coalescing_window)
+        bot_channel.set_bot_connected_event_handler(bot_ready.set)
+    bot_task = asyncio.create_task(ad_bot.start())
+    await asyncio.wait_for(bot_ready.wait(), timeout=10)
+
+    # Chatter names are unique across channels, so responses can be matched by name alone.
+    chatters = [
+        (channel_name, f'{channel_name}_chatter{index}')
+        for channel_name in channels_names
+        for index in range(args.chatters)]
+    for channel_name, chatter in chatters:
+        await server.join(channel_name, chatter)
+
+    rng = random.Random(args.seed)
+    interval = 1.0 / args.rate
+    commands_count = int(args.duration * args.rate)
+    start = time.monotonic()
+    for index in range(commands_count):
+        channel_name, chatter = rng.choice(chatters)
+        latency_tracker.command_sent(chatter)
+        await server.send_chat_message(channel_name, chatter, f'!adbot {rng.choice(COMMANDS)}')
+        delay = start + (index + 1) * interval - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+    await wait_for(
+        lambda: latency_tracker.pending_commands_count <= rejected_commands_count(ad_bot),
+        timeout=args.drain_timeout)
+    elapsed = time.monotonic() - start
+
+    bot_task.cancel()
+    await server.stop()
+    state_files_directory.cleanup()
+    return latency_tracker, server, ad_bot, game_controllers, elapsed
+
+
+def rejected_commands_count(ad_bot: AdBot) -> int:
+    return total([bot_channel.inbound_command_filter for bot_channel in ad_bot.channels], 'rejected_commands_count')
+
+
+def total(objects: list, counter_name: str) -> int:
+    return sum(getattr(counted_object, counter_name) for counted_object in objects)
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    latency_tracker, server, ad_bot, game_controllers, elapsed = asyncio.run(run(args))
+    latencies = sorted(latency_tracker.latencies)
+    commands_count = int(args.duration * args.rate)
+    outbound_message_queues = [bot_channel.outbound_message_queue for bot_channel in ad_bot.channels]
+    inbound_command_filters = [bot_channel.inbound_command_filter for bot_channel in ad_bot.channels]
+    print(f"Channels: {args.channels}, chatters per channel: {args.chatters}, "
+          f"commands: {commands_count} at {args.rate}/s, "
+          f"rate limit: {args.rate_limit}, elapsed: {elapsed:.1f}s.")
+    print(f"Responses: {len(latencies)} ({len(latencies) / elapsed:.1f}/s) "
+          f"in {latency_tracker.bot_messages_count} chat messages "
+          f"({latency_tracker.bot_messages_count / elapsed:.2f}/s), "
+          f"unanswered: {latency_tracker.pending_commands_count}, "
+          f"unsolicited: {latency_tracker.unsolicited_mentions_count}.")
+    print(f"Latency p50: {percentile(latencies, 0.5):.3f}s, p90: {percentile(latencies, 0.9):.3f}s, "
+          f"p99: {percentile(latencies, 0.99):.3f}s, "
+          f"max: {latencies[-1] if latencies else float('nan'):.3f}s, "
+          f"mean: {statistics.fmean(latencies) if latencies else float('nan'):.3f}s.")
+    print(f"Server accepted {server.accepted_messages_count}, dropped {server.dropped_messages_count} (rate limit). "
+          f"Bot queues rejected {total(outbound_message_queues, 'rejected_messages_count')}, "
+          f"dropped {total(outbound_message_queues, 'dropped_messages_count')}, "
+          f"max wait {max(queue.max_wait_time for queue in outbound_message_queues):.2f}s.")
+    print(f"Inbound commands accepted {total(inbound_command_filters, 'accepted_commands_count')}, "
+          f"throttled {total(inbound_command_filters, 'throttled_commands_count')}, "
+          f"duplicates {total(inbound_command_filters, 'duplicate_commands_count')}.")
+    print(f"Active players: {total(game_controllers, 'active_players_count')}.")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('game_config', type=argparse.FileType('r'))
+    parser.add_argument('-n', '--channels', type=int, default=1)
+    parser.add_argument('-c', '--chatters', type=int, default=100, help='Chatters per channel.')
+    parser.add_argument('-r', '--rate', type=float, default=2.0, help='Commands per second over all channels.')
+    parser.add_argument('-d', '--duration', type=float, default=30.0, help='Seconds of sending commands.')
+    parser.add_argument('-l', '--rate_limit', choices=AdBot.RATE_LIMITS.keys(), default='normal')
+    parser.add_argument('-q', '--queue_size', type=int, default=AdBot.DEFAULT_OUTBOUND_QUEUE_SIZE)
+    parser.add_argument('-w', '--coalescing_window', type=float,
+                        default=TwitchGameMediator.DEFAULT_RESPONSE_COALESCING_WINDOW)
+    parser.add_argument('-t', '--drain_timeout', type=float, default=60.0)
+    parser.add_argument('-s', '--seed', type=int, default=0)
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import asyncio
+import random
+import time
+from twitch_bot.message_chunker import MessageChunker
+from twitch_bot.response_coalescer import ResponseCoalescer
+
+WORDS = [
+    'You', 'hit', 'from', 'above', 'dealing', 'damage.', 'Pulunpa', 'has', 'HP', 'left.', 'Your', 'turn.',
+    'Zöllner', 'żółć', 'Ω', '🐉', 'smiles', 'at', 'you.', 'You entered 3F.', 'Holy Scroll']
+
+
+def generate_responses(count: int, rng: random.Random) -> list[str]:
+    responses = []
+    for _ in range(count):
+        player_name = f'player{rng.randrange(1000)}'
+        words = ' '.join(rng.choice(WORDS) for _ in range(rng.choice([3, 8, 20, 150])))
+        responses.append(f'@{player_name}: {words}')
+    return responses
+
+
+def naive_chunks(message: str, limit: int) -> list[str]:
+    return [message[index:index + limit] for index in range(0, len(message), limit)]
+
+
+async def coalesce(responses: list[str], message_chunker: MessageChunker) -> list[str]:
+    messages = []
+    response_coalescer = ResponseCoalescer(
+        lambda message, lane, order_keys: messages.append(message),
+        message_chunker,
+        window=60.0)
+    for response in responses:
+        response_coalescer.add(response)
+    response_coalescer.flush()
+    return messages
+
+
+def main():
+    args = parse_args()
+    responses = generate_responses(args.responses, random.Random(args.seed))
+    message_chunker = MessageChunker('PRIVMSG #benchmark :.me ', 500, 512)
+
+    start = time.perf_counter()
+    messages = asyncio.run(coalesce(responses, message_chunker))
+    chunks = [chunk for message in messages for chunk in message_chunker.chunk(message)]
+    elapsed = time.perf_counter() - start
+    print(f"Coalesced and chunked {len(responses)} responses into {len(chunks)} lines in {elapsed * 1e3:.1f}ms "
+          f"({elapsed / len(responses) * 1e6:.2f} us/response).")
+
+    start = time.perf_counter()
+    naive = [chunk for response in responses for chunk in naive_chunks(response, 500)]
+    elapsed = time.perf_counter() - start
+    rejected = sum(1 for chunk in naive if not message_chunker.fits(chunk))
+    print(f"Fixed 500-character slicing: {len(naive)} lines ({rejected} over the byte budget) "
+          f"in {elapsed * 1e3:.1f}ms.")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--responses', type=int, default=20000)
+    parser.add_argument('-s', '--seed', type=int, default=0)
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    main()
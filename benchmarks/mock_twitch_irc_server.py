@@ -0,0 +1,199 @@
+import collections
+import itertools
+import logging
+import time
+import websockets
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class MockTwitchIrcServer:
+    HOST_NAME = 'tmi.twitch.tv'
+
+    class Channel:
+        def __init__(self, name: str, rate_limit_messages: int, rate_limit_period: float):
+            self.name = name
+            self.clients = set()
+            self.users = set()
+            self._rate_limit_messages = rate_limit_messages
+            self._rate_limit_period = rate_limit_period
+            self._sent_messages_times = collections.deque()
+
+        def try_accept_message(self) -> bool:
+            now = time.monotonic()
+            while len(self._sent_messages_times) > 0 and now - self._sent_messages_times[0] >= self._rate_limit_period:
+                self._sent_messages_times.popleft()
+            if len(self._sent_messages_times) >= self._rate_limit_messages:
+                return False
+            self._sent_messages_times.append(now)
+            return True
+
+    class Client:
+        def __init__(self, websocket):
+            self.websocket = websocket
+            self.nick = None
+            self.channels = set()
+
+        async def send(self, *lines: str):
+            for line in lines:
+                await self.websocket.send(f'{line}\r\n')
+
+    def __init__(
+            self,
+            host: str='127.0.0.1',
+            port: int=0,
+            rate_limit_messages: int=20,
+            rate_limit_period: float=30,
+            moderator_nicks: set=frozenset()):
+        self._host = host
+        self._port = port
+        self._moderator_nicks = moderator_nicks
+        self._rate_limit_messages = rate_limit_messages
+        self._rate_limit_period = rate_limit_period
+        self._server = None
+        self._channels = {}
+        self._message_handlers = []
+        self._user_ids = itertools.count(1)
+        self.accepted_messages_count = 0
+        self.dropped_messages_count = 0
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    @property
+    def url(self) -> str:
+        return f'ws://{self._host}:{self.port}'
+
+    def add_message_handler(self, handler: Callable[[str, str, str], None]):
+        self._message_handlers.append(handler)
+
+    async def start(self):
+        self._server = await websockets.serve(self._handle_connection, self._host, self._port)
+        logger.info(f"Mock Twitch IRC server listening on {self.url}.")
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    def _channel(self, channel_name: str) -> 'MockTwitchIrcServer.Channel':
+        channel_name = channel_name.lstrip('#').lower()
+        if channel_name not in self._channels:
+            self._channels[channel_name] = self.Channel(
+                channel_name,
+                self._rate_limit_messages,
+                self._rate_limit_period)
+        return self._channels[channel_name]
+
+    async def join(self, channel_name: str, user_name: str):
+        channel = self._channel(channel_name)
+        channel.users.add(user_name)
+        await self._broadcast(channel, f':{self._user_prefix(user_name)} JOIN #{channel.name}')
+
+    async def part(self, channel_name: str, user_name: str):
+        channel = self._channel(channel_name)
+        channel.users.discard(user_name)
+        await self._broadcast(channel, f':{self._user_prefix(user_name)} PART #{channel.name}')
+
+    async def send_chat_message(self, channel_name: str, user_name: str, content: str):
+        channel = self._channel(channel_name)
+        tags = f'@display-name={user_name};mod=0;subscriber=0;user-id={next(self._user_ids)};user-type='
+        await self._broadcast(channel, f'{tags} :{self._user_prefix(user_name)} PRIVMSG #{channel.name} :{content}')
+
+    async def _broadcast(self, channel: 'MockTwitchIrcServer.Channel', line: str):
+        for client in list(channel.clients):
+            try:
+                await client.send(line)
+            except websockets.ConnectionClosed:
+                channel.clients.discard(client)
+
+    def _user_prefix(self, user_name: str) -> str:
+        return f'{user_name}!{user_name}@{user_name}.{self.HOST_NAME}'
+
+    async def _handle_connection(self, websocket, path=None):
+        client = self.Client(websocket)
+        try:
+            async for data in websocket:
+                for line in data.splitlines():
+                    if len(line) > 0:
+                        await self._handle_line(client, line)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            for channel_name in client.channels:
+                self._channel(channel_name).clients.discard(client)
+
+    async def _handle_line(self, client: 'MockTwitchIrcServer.Client', line: str):
+        command, _, params = line.partition(' ')
+        if command == 'PASS':
+            pass
+        elif command == 'NICK':
+            await self._handle_nick(client, params.strip().lower())
+        elif command == 'CAP':
+            await client.send(f':{self.HOST_NAME} CAP * ACK :{params.partition(":")[2]}')
+        elif command == 'JOIN':
+            await self._handle_join(client, params.strip())
+        elif command == 'PART':
+            await self._handle_part(client, params.strip())
+        elif command == 'PING':
+            await client.send(f':{self.HOST_NAME} PONG {self.HOST_NAME} {params}')
+        elif command == 'PRIVMSG':
+            await self._handle_privmsg(client, params)
+        elif command != 'PONG':
+            logger.debug(f"Mock Twitch IRC server ignores '{line}'.")
+
+    async def _handle_nick(self, client: 'MockTwitchIrcServer.Client', nick: str):
+        client.nick = nick
+        await client.send(
+            f':{self.HOST_NAME} 001 {nick} :Welcome, GLHF!',
+            f':{self.HOST_NAME} 002 {nick} :Your host is {self.HOST_NAME}',
+            f':{self.HOST_NAME} 003 {nick} :This server is rather new',
+            f':{self.HOST_NAME} 004 {nick} :-',
+            f':{self.HOST_NAME} 375 {nick} :-',
+            f':{self.HOST_NAME} 372 {nick} :You are in a maze of twisty passages, all alike.',
+            f':{self.HOST_NAME} 376 {nick} :>')
+
+    async def _handle_join(self, client: 'MockTwitchIrcServer.Client', channels_string: str):
+        for channel_name in channels_string.split(','):
+            channel = self._channel(channel_name)
+            channel.clients.add(client)
+            client.channels.add(channel.name)
+            names = ' '.join([client.nick] + sorted(channel.users))
+            await client.send(
+                f':{self._user_prefix(client.nick)} JOIN #{channel.name}',
+                f':{client.nick}.{self.HOST_NAME} 353 {client.nick} = #{channel.name} :{names}',
+                f':{client.nick}.{self.HOST_NAME} 366 {client.nick} #{channel.name} :End of /NAMES list',
+                self._user_state_line(client, channel))
+
+    def _user_state_line(self, client: 'MockTwitchIrcServer.Client', channel: 'MockTwitchIrcServer.Channel') -> str:
+        is_moderator = client.nick in self._moderator_nicks
+        return (
+            f'@badges=;color=;display-name={client.nick};emote-sets=0;mod={int(is_moderator)};subscriber=0;'
+            f'user-type={"mod" if is_moderator else ""} :{self.HOST_NAME} USERSTATE #{channel.name}')
+
+    async def _handle_part(self, client: 'MockTwitchIrcServer.Client', channels_string: str):
+        for channel_name in channels_string.split(','):
+            channel = self._channel(channel_name)
+            channel.clients.discard(client)
+            client.channels.discard(channel.name)
+            await client.send(f':{self._user_prefix(client.nick)} PART #{channel.name}')
+
+    async def _handle_privmsg(self, client: 'MockTwitchIrcServer.Client', params: str):
+        channel_name, _, content = params.partition(' :')
+        channel = self._channel(channel_name)
+        if not channel.try_accept_message():
+            self.dropped_messages_count += 1
+            await client.send(
+                f'@msg-id=msg_ratelimit :{self.HOST_NAME} NOTICE #{channel.name} '
+                ':Your message was not sent because you are sending messages too quickly.')
+            return
+        self.accepted_messages_count += 1
+        # Twitch confirms every accepted message with USERSTATE, which is how clients learn their moderator status.
+        await client.send(self._user_state_line(client, channel))
+        for prefix in ('.me ', '/me '):
+            if content.startswith(prefix):
+                content = content[len(prefix):]
+                break
+        for handler in self._message_handlers:
+            handler(channel.name, client.nick, content)
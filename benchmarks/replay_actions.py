@@ -0,0 +1,131 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from game.action_recorder import ActionRecorder
+from game.config import Config
+from game.controller import Controller
+from game.player_selector import PlayerSelector
+
+
+class ReplayResult:
+    def __init__(self):
+        self.entries_count = 0
+        self.actions_count = 0
+        self.sessions_count = 0
+        self.elapsed_time = 0.0
+        self.mismatches = []
+
+
+def create_controller(game_config: Config, state_files_directory: str, start_entry: dict) -> Controller:
+    controller = Controller(game_config, state_files_directory, seed=start_entry['seed'], timers_enabled=False)
+    controller.set_response_event_handler(lambda response, origin: None)
+    return controller
+
+
+def replay_entry(controller: Controller, entry: dict) -> (int, str):
+    kind = entry['k']
+    if kind == ActionRecorder.JOIN:
+        for player_name in entry['p']:
+            controller.add_active_player(player_name)
+        return None, None
+    elif kind in (ActionRecorder.PART, ActionRecorder.EXPIRE):
+        for player_name in entry['p']:
+            controller.remove_active_player(player_name)
+        return None, None
+    elif kind == ActionRecorder.USER_ACTION:
+        responses = controller.handle_user_action(entry['p'], entry['c'], entry['a'])
+    elif kind == ActionRecorder.ADMIN_ACTION:
+        responses = controller.handle_admin_action(entry['p'], entry['c'], entry['a'])
+    elif kind == ActionRecorder.BULK_ADMIN_ACTION:
+        players_responses = controller.handle_bulk_admin_action(PlayerSelector(entry['s']), entry['c'], entry['a'])
+        responses = [response for player_responses in players_responses.values() for response in player_responses]
+    elif kind == ActionRecorder.EVENT:
+        event_command, responses = controller.run_event(entry['p'])
+        if event_command != entry['c']:
+            return ActionRecorder.responses_digest(responses), f"event command '{event_command}' != '{entry['c']}'"
+    else:
+        raise ValueError(f"Unknown entry kind '{kind}'.")
+    return ActionRecorder.responses_digest(responses), None
+
+
+def replay(game_config: Config, entries, state_files_directory: str) -> ReplayResult:
+    result = ReplayResult()
+    controller = None
+    start_time = time.perf_counter()
+    for index, entry in enumerate(entries):
+        result.entries_count += 1
+        if entry['k'] == ActionRecorder.START:
+            # Restarted process reloads saved states from disk, exactly as the recorded one did.
+            controller = create_controller(game_config, state_files_directory, entry)
+            result.sessions_count += 1
+            missing_players = [name for name in entry['loaded'] if not controller.does_player_exist(name)]
+            if len(missing_players) > 0:
+                result.mismatches.append((index, f"session started without states of {missing_players}"))
+            continue
+        if controller is None:
+            raise ValueError("Actions log does not begin with start entry.")
+        responses_digest, mismatch = replay_entry(controller, entry)
+        if responses_digest is None:
+            continue
+        result.actions_count += 1
+        if mismatch is None and responses_digest != entry['r']:
+            mismatch = f"responses differ for '{entry['c']}' of '{entry.get('p', entry.get('s'))}'"
+        if mismatch is not None:
+            result.mismatches.append((index, mismatch))
+    result.elapsed_time = time.perf_counter() - start_time
+    return result
+
+
+def compare_states(replayed_states_directory: str, expected_states_directory: str) -> list[str]:
+    differences = []
+    expected_files = {name for name in os.listdir(expected_states_directory) if name.endswith('.json')}
+    replayed_files = {name for name in os.listdir(replayed_states_directory) if name.endswith('.json')}
+    for file_name in sorted(expected_files ^ replayed_files):
+        differences.append(f"{file_name} exists only in {'expected' if file_name in expected_files else 'replayed'}")
+    for file_name in sorted(expected_files & replayed_files):
+        with open(os.path.join(expected_states_directory, file_name)) as expected_file, \
+                open(os.path.join(replayed_states_directory, file_name)) as replayed_file:
+            if json.load(expected_file) != json.load(replayed_file):
+                differences.append(f"{file_name} differs")
+    return differences
+
+
+def main():
+    args = parse_args()
+    game_config = Config.from_file(args.game_config)
+    entries = list(ActionRecorder.read(args.actions_log))
+    with tempfile.TemporaryDirectory(prefix='ad_bot_replay_') as state_files_directory:
+        if args.initial_states is not None:
+            shutil.copytree(args.initial_states, state_files_directory, dirs_exist_ok=True)
+        result = replay(game_config, entries, state_files_directory)
+        state_differences = []
+        if args.expected_states is not None:
+            state_differences = compare_states(state_files_directory, args.expected_states)
+    print(f"Replayed {result.entries_count} entries ({result.actions_count} actions, "
+          f"{result.sessions_count} session(s)) in {result.elapsed_time:.2f}s - "
+          f"{result.actions_count / result.elapsed_time:.0f} actions/s.")
+    for index, mismatch in result.mismatches[:args.max_reported]:
+        print(f"Entry {index}: {mismatch}.")
+    for state_difference in state_differences[:args.max_reported]:
+        print(f"State {state_difference}.")
+    print(f"Mismatched responses: {len(result.mismatches)}, mismatched states: {len(state_differences)}.")
+    if len(result.mismatches) > 0 or len(state_differences) > 0:
+        sys.exit(1)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('game_config', type=argparse.FileType('r'))
+    parser.add_argument('actions_log', type=argparse.FileType('r'))
+    parser.add_argument('-i', '--initial_states', help='State files the recorded session started with.')
+    parser.add_argument('-e', '--expected_states', help='State files the recorded session ended with.')
+    parser.add_argument('-m', '--max_reported', type=int, default=10)
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,330 @@
+import argparse
+import copy
+import io
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable
+from benchmarks.battle_loop import admin_action, enter_tower, fight_auto_battle, fight_battle, user_action
+from game import commands
+from game.config import Config
+from game.controller import Controller
+from game.state_character import StateFamiliarTrade, StateItemTrade
+from game.state_elevator import StateElevatorEvent
+from game.state_familiar import StateFamiliarEvent
+from game.state_item import StateItemEvent, StateItemPickUp
+from game.state_machine import StateMachine
+from game.state_machine_context import StateMachineContext
+from game.stats_calculator import StatsCalculator
+
+PROJECT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GAME_CONFIG_PATH = os.path.join(PROJECT_DIRECTORY, 'game_config.json')
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+# Mid-game is halfway up the tower with a familiar grown by the battles fought on the way.
+MID_GAME_FLOOR = 4
+MID_GAME_FAMILIAR_LEVEL = 12
+MID_GAME_MAX_EVENTS = 2000
+# Answers of a player climbing the tower who keeps found items and its familiar.
+MID_GAME_ANSWERS = {
+    StateItemEvent.__name__: commands.ACCEPTED,
+    StateItemPickUp.__name__: commands.IGNORE,
+    StateItemTrade.__name__: commands.REJECTED,
+    StateFamiliarTrade.__name__: commands.REJECTED,
+    StateFamiliarEvent.__name__: commands.IGNORE
+}
+
+
+class Benchmark:
+    # `setup` prepares everything not being measured and returns the measured callable, which returns the number
+    # of operations it has performed.
+    def __init__(self, name: str, unit: str, setup: Callable[[Config], Callable[[], int]]):
+        self.name = name
+        self.unit = unit
+        self.setup = setup
+
+    def run(self, game_config: Config, repeats: int) -> dict:
+        measured = self.setup(game_config)
+        best_time_per_operation = None
+        operations_count = 0
+        for _ in range(repeats):
+            start = time.perf_counter()
+            operations_count = measured()
+            time_per_operation = (time.perf_counter() - start) / operations_count
+            if best_time_per_operation is None or time_per_operation < best_time_per_operation:
+                best_time_per_operation = time_per_operation
+        return {'us_per_op': round(best_time_per_operation * 1e6, 3), 'ops': operations_count, 'unit': self.unit}
+
+
+def started_state_machine(game_config: Config, player_name: str, seed: int) -> StateMachine:
+    state_machine = StateMachine(game_config, player_name)
+    state_machine.seed(seed)
+    enter_tower(state_machine)
+    return state_machine
+
+
+def answer_event(state_machine: StateMachine):
+    while not state_machine.is_waiting_for_event() and not state_machine.is_finished():
+        if state_machine.is_in_battle():
+            # Healing before every turn keeps the familiar alive, so it grows instead of the game restarting.
+            state_machine.on_action(admin_action(commands.RESTORE_HP))
+            state_machine.on_action(user_action(commands.APPROACH))
+            state_machine.on_action(user_action(commands.ATTACK))
+        elif state_machine.state_name == StateElevatorEvent.__name__:
+            # Player stays on the mid-game floor until the familiar catches up.
+            going_up = state_machine.floor < MID_GAME_FLOOR
+            state_machine.on_action(user_action(commands.ACCEPTED if going_up else commands.REJECTED))
+        else:
+            state_machine.on_action(user_action(MID_GAME_ANSWERS[state_machine.state_name]))
+
+
+def is_mid_game(state_machine: StateMachine) -> bool:
+    return state_machine.floor >= MID_GAME_FLOOR and state_machine.familiar_level >= MID_GAME_FAMILIAR_LEVEL
+
+
+def mid_game_state_machine(game_config: Config) -> StateMachine:
+    state_machine = started_state_machine(game_config, 'benchmark', seed=0)
+    for _ in range(MID_GAME_MAX_EVENTS):
+        if is_mid_game(state_machine):
+            return state_machine
+        if state_machine.is_finished():
+            state_machine.on_action(admin_action(commands.RESTART))
+            enter_tower(state_machine)
+        state_machine.on_action(admin_action(commands.GENERATE_EVENT))
+        answer_event(state_machine)
+        state_machine.on_action(admin_action(commands.RESTORE_HP))
+        state_machine.on_action(admin_action(commands.RESTORE_MP))
+    raise RuntimeError(
+        f"Player did not reach {MID_GAME_FLOOR + 1}F with a LVL {MID_GAME_FAMILIAR_LEVEL} familiar "
+        f"in {MID_GAME_MAX_EVENTS} events.")
+
+
+def setup_on_action(command: str, iterations: int=20000):
+    def setup(game_config: Config) -> Callable[[], int]:
+        state_machine = mid_game_state_machine(game_config)
+        action = user_action(command)
+
+        def measured() -> int:
+            for _ in range(iterations):
+                state_machine.on_action(action)
+            return iterations
+        return measured
+    return setup
+
+
+def setup_save_load(game_config: Config, iterations: int=50) -> Callable[[], int]:
+    state_machine = mid_game_state_machine(game_config)
+
+    def measured() -> int:
+        for _ in range(iterations):
+            state_file = io.StringIO()
+            state_machine.save(state_file)
+            state_file.seek(0)
+            StateMachine.load(state_file, game_config)
+        return iterations
+    return measured
+
+
+def setup_stats_calculator(game_config: Config, iterations: int=20) -> Callable[[], int]:
+    # Evolved units' stats are accumulated level by level, which makes them the costly case.
+    level = game_config.levels.max_level
+    calculators = []
+    for unit_traits in game_config.monsters_traits.values():
+        evolved_traits = unit_traits.copy()
+        evolved_traits.is_evolved = True
+        calculators.append(StatsCalculator(evolved_traits))
+
+    def measured() -> int:
+        for _ in range(iterations):
+            for stats_calculator in calculators:
+                stats_calculator.hp(level)
+                stats_calculator.mp(level)
+                stats_calculator.attack(level)
+                stats_calculator.defense(level)
+                stats_calculator.luck(level)
+                stats_calculator.hp_increase(level)
+        return iterations * len(calculators)
+    return measured
+
+
+def setup_generate_floor_monster(game_config: Config, iterations: int=2000) -> Callable[[], int]:
+    context = StateMachineContext(game_config)
+    context.rng.seed(0)
+    floors = list(range(len(game_config.floors)))
+
+    def measured() -> int:
+        for index in range(iterations):
+            context.generate_floor_monster(floors[index % len(floors)])
+        return iterations
+    return measured
+
+
+def setup_battle_loop(game_config: Config, battles: int=300) -> Callable[[], int]:
+    battle_config = copy.deepcopy(game_config)
+    battle_config.events_weights = dict((event, 0) for event in battle_config.events_weights)
+    battle_config.events_weights['battle'] = 1
+    state_machine = started_state_machine(battle_config, 'benchmark', seed=0)
+
+    def measured() -> int:
+        turns = 0
+        for _ in range(battles):
+            turns += fight_battle(state_machine)
+            if state_machine.is_finished():
+                state_machine.on_action(admin_action(commands.RESTART))
+                enter_tower(state_machine)
+            else:
+                state_machine.on_action(admin_action(commands.BATTLE_EVENT))
+        return turns
+    return measured
+
+
+def setup_auto_battle_loop(game_config: Config, battles: int=300) -> Callable[[], int]:
+    battle_config = copy.deepcopy(game_config)
+    battle_config.events_weights = dict((event, 0) for event in battle_config.events_weights)
+    battle_config.events_weights['battle'] = 1
+    state_machine = started_state_machine(battle_config, 'benchmark', seed=0)
+
+    def measured() -> int:
+        for _ in range(battles):
+            fight_auto_battle(state_machine)
+            if state_machine.is_finished():
+                state_machine.on_action(admin_action(commands.RESTART))
+                enter_tower(state_machine)
+            else:
+                state_machine.on_action(admin_action(commands.BATTLE_EVENT))
+        return battles
+    return measured
+
+
+def setup_select_player_for_event(
+        game_config: Config,
+        players_count: int=10000,
+        started_players_count: int=2000,
+        iterations: int=20) -> Callable[[], int]:
+    # Nothing is saved, the directory only has to exist while the controller is alive.
+    state_files_directory = tempfile.TemporaryDirectory(prefix='ad_bot_benchmark_')
+    controller = Controller(game_config, state_files_directory.name, seed=0, timers_enabled=False)
+    rng = random.Random(0)
+    for index in range(players_count):
+        controller.add_active_player(f'player{index}')
+    # Some players already play, part of them are waiting for the event with selection penalty.
+    for index in rng.sample(range(players_count), started_players_count):
+        state_machine = controller._player_state_machine(f'player{index}')
+        enter_tower(state_machine)
+        if rng.random() < 0.5:
+            state_machine.set_event_selection_penalty(3600)
+
+    def measured() -> int:
+        for _ in range(iterations):
+            controller._select_player_for_event()
+        return iterations
+    measured.state_files_directory = state_files_directory
+    return measured
+
+
+def setup_startup(game_config: Config, iterations: int=3) -> Callable[[], int]:
+    # Cold start of the local commander in a fresh interpreter, with the config cache already warmed up.
+    working_directory = tempfile.TemporaryDirectory(prefix='ad_bot_benchmark_')
+    command = [
+        sys.executable, os.path.join(PROJECT_DIRECTORY, 'main.py'), GAME_CONFIG_PATH,
+        '-S', '-d', working_directory.name]
+    subprocess.run(command, cwd=working_directory.name, check=True, capture_output=True)
+
+    def measured() -> int:
+        for _ in range(iterations):
+            subprocess.run(command, cwd=working_directory.name, check=True, capture_output=True)
+        return iterations
+    measured.working_directory = working_directory
+    return measured
+
+
+BENCHMARKS = [
+    Benchmark('on_action.state', 'action', setup_on_action(commands.SHOW_STATE)),
+    Benchmark('on_action.inventory', 'action', setup_on_action(commands.SHOW_INVENTORY)),
+    Benchmark('on_action.help', 'action', setup_on_action(commands.HELP)),
+    Benchmark('on_action.fam_stats', 'action', setup_on_action(commands.SHOW_FAMILIAR_STATS)),
+    Benchmark('state_machine.save_load', 'round-trip', setup_save_load),
+    Benchmark('stats_calculator.max_level', 'unit', setup_stats_calculator),
+    Benchmark('context.generate_floor_monster', 'monster', setup_generate_floor_monster),
+    Benchmark('battle_loop', 'turn', setup_battle_loop),
+    Benchmark('battle_loop.auto', 'battle', setup_auto_battle_loop),
+    Benchmark('controller.select_player_for_event', 'selection', setup_select_player_for_event),
+    Benchmark('startup.commander', 'start', setup_startup)
+]
+
+
+def run_benchmarks(game_config: Config, benchmarks: list[Benchmark], repeats: int) -> dict:
+    results = {}
+    for benchmark in benchmarks:
+        results[benchmark.name] = benchmark.run(game_config, repeats)
+        print(f"{benchmark.name:<40} {results[benchmark.name]['us_per_op']:>12.3f} us/{benchmark.unit}", flush=True)
+    return {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'repeats': repeats,
+        'results': results
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    print(f"{'benchmark':<40} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, result in results['results'].items():
+        baseline_result = baseline['results'].get(name)
+        if baseline_result is None:
+            print(f"{name:<40} {'-':>12} {result['us_per_op']:>12.3f} {'new':>8}")
+            continue
+        ratio = result['us_per_op'] / baseline_result['us_per_op']
+        is_regression = ratio > 1 + threshold
+        print(f"{name:<40} {baseline_result['us_per_op']:>12.3f} {result['us_per_op']:>12.3f} "
+              f"{(ratio - 1) * 100:>+7.1f}%{' REGRESSION' if is_regression else ''}")
+        if is_regression:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    args = parse_args()
+    # Setups walk through the game trying every answer, rejected ones would flood the output with warnings.
+    logging.basicConfig(level=logging.ERROR)
+    game_config = Config.from_file(args.game_config)
+    benchmarks = [benchmark for benchmark in BENCHMARKS if args.select is None or args.select in benchmark.name]
+    results = run_benchmarks(game_config, benchmarks, args.repeats)
+    if args.output is not None:
+        with open(args.output, mode='w') as output_file:
+            json.dump(results, output_file, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, mode='w') as baseline_file:
+            json.dump(results, baseline_file, indent=2)
+        print(f"Baseline saved to '{args.baseline}'.")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at '{args.baseline}', nothing to compare with.")
+        return
+    with open(args.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+    regressions = compare(results, baseline, args.threshold)
+    if len(regressions) > 0:
+        print(f"{len(regressions)} benchmark(s) slower than baseline by more than {args.threshold * 100:.0f}%.")
+        sys.exit(1)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-c', '--game_config', type=argparse.FileType('r'), default=GAME_CONFIG_PATH)
+    parser.add_argument('-b', '--baseline', default=BASELINE_PATH)
+    parser.add_argument('-s', '--save_baseline', action='store_true', help='Store results as the new baseline.')
+    parser.add_argument('-o', '--output', help='File to write JSON results to.')
+    parser.add_argument('-t', '--threshold', type=float, default=0.25, help='Allowed relative slowdown.')
+    parser.add_argument('-r', '--repeats', type=int, default=5)
+    parser.add_argument('-k', '--select', help='Run only benchmarks which names contain this string.')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,8 @@
 import asyncio
+from commander.config_reloader import ConfigReloader
+from commander.profiler import Profiler
 from game.controller import Controller
+from game.game_interface import GameInterface
 
 
 class Commander:
@@ -11,16 +14,18 @@ class Commander:
     class InvalidCommand(Exception):
         pass
 
-    def __init__(self, controller: Controller):
+    def __init__(self, controller: Controller, profiler: Profiler=None, config_reloader: ConfigReloader=None):
         self._controller = controller
+        self._profiler = profiler
+        self._config_reloader = config_reloader
         self._controller.set_response_event_handler(self._response_event_handler)
 
-    def _response_event_handler(self, response: str) -> bool:
+    def _response_event_handler(self, response: str, origin: GameInterface.ResponseOrigin):
         print(response)
-        return True
 
     def run(self):
-        asyncio.run(self._get_and_execute_commands())
+        # Runs on the current event loop, so services started next to the commander are served too.
+        asyncio.get_event_loop().run_until_complete(self._get_and_execute_commands())
 
     async def _get_and_execute_commands(self):
         while True:
@@ -31,12 +36,36 @@ class Commander:
                 self._controller.add_active_player(player_name)
             elif command == self.PART_COMMAND:
                 self._controller.remove_active_player(player_name)
+            elif command == Profiler.COMMAND:
+                self._handle_profile_command(args)
+            elif command == ConfigReloader.COMMAND:
+                self._handle_config_reload_command(args)
             else:
                 if is_admin:
                     self._controller.handle_admin_action(player_name, command, args)
                 else:
                     self._controller.handle_user_action(player_name, command, args)
 
+    def _handle_profile_command(self, args: list[str]):
+        if self._profiler is None:
+            print(f"Profiling is not enabled.")
+            return
+        try:
+            for response in self._profiler.handle_command(args):
+                print(response)
+        except Profiler.InvalidCommand as exc:
+            print(f"Invalid command: {exc}")
+
+    def _handle_config_reload_command(self, args: list[str]):
+        if self._config_reloader is None:
+            print(f"Config reloading is not enabled.")
+            return
+        try:
+            for response in self._config_reloader.handle_command(args):
+                print(response)
+        except ConfigReloader.ReloadFailed as exc:
+            print(f"Config not reloaded: {exc}")
+
     def _get_command(self):
         while True:
             command_line = input("Enter command [@player_name command arg1 arg2 arg3 ...]: ")
@@ -51,6 +80,8 @@ class Commander:
             raise self.InvalidCommand('Cannot be empty.')
         if splitted[0] == self.EXIT_COMMAND:
             return self._build_command(command=self.EXIT_COMMAND)
+        if splitted[0] in (Profiler.COMMAND, ConfigReloader.COMMAND):
+            return self._build_command(command=splitted[0], args=splitted[1:])
         if len(splitted) == 1:
             raise self.InvalidCommand('Too short.')
         player_name = splitted[0]
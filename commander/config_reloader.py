@@ -0,0 +1,62 @@
+import logging
+import time
+from game.config import Config
+from game.controller import Controller
+
+logger = logging.getLogger(__name__)
+
+
+class ConfigReloader:
+    class ReloadFailed(Exception):
+        pass
+
+    COMMAND = 'reload_config'
+    MAX_REPORTED_PLAYERS = 10
+
+    def __init__(self, controllers: list[Controller], config_path: str, cache_directory: str=''):
+        self._controllers = controllers
+        self._config_path = config_path
+        self._cache_directory = cache_directory
+
+    def handle_command(self, args: list[str]) -> list[str]:
+        if len(args) > 1:
+            raise self.ReloadFailed(f"Usage: {self.COMMAND} [game config path].")
+        return self.reload(args[0] if len(args) > 0 else None)
+
+    def reload(self, config_path: str=None) -> list[str]:
+        config_path = config_path or self._config_path
+        start_time = time.perf_counter()
+        # New config is fully built and validated before anything is swapped, a broken file changes nothing.
+        game_config = self._load(config_path)
+        load_duration = time.perf_counter() - start_time
+        players_unmapped_units_names = {}
+        state_machines_count = 0
+        for controller in self._controllers:
+            state_machines_count += controller.resident_state_machines_count
+            players_unmapped_units_names.update(controller.replace_game_config(game_config))
+        self._config_path = config_path
+        duration = time.perf_counter() - start_time
+        responses = [
+            f"Reloaded '{config_path}' in {duration * 1e3:.1f}ms (loading {load_duration * 1e3:.1f}ms), "
+            f"{state_machines_count} state machine(s) updated."]
+        if len(players_unmapped_units_names) > 0:
+            unmapped = ', '.join(
+                f"{player_name} ({', '.join(units_names)})"
+                for player_name, units_names in list(players_unmapped_units_names.items())[:self.MAX_REPORTED_PLAYERS])
+            responses.append(
+                f"{len(players_unmapped_units_names)} player(s) have units missing from the new config, "
+                f"they keep their old traits: {unmapped}.")
+        for response in responses:
+            logger.info(response)
+        return responses
+
+    def _load(self, config_path: str) -> Config:
+        try:
+            with open(config_path, mode='r') as config_file:
+                if self._cache_directory == '':
+                    return Config.from_file(config_file)
+                return Config.from_file_cached(config_file, self._cache_directory)
+        except OSError as exc:
+            raise self.ReloadFailed(f"Could not read '{config_path}'. Reason - {exc}.")
+        except Config.InvalidConfig as exc:
+            raise self.ReloadFailed(f"Invalid config '{config_path}'. Reason - {exc}.")
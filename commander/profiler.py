@@ -0,0 +1,196 @@
+import asyncio
+import cProfile
+import datetime
+import enum
+import io
+import logging
+import os
+import pstats
+import tracemalloc
+from game.controller import Controller
+
+logger = logging.getLogger(__name__)
+
+
+class Profiler:
+    class InvalidCommand(Exception):
+        pass
+
+    class Scope(enum.Enum):
+        Actions = 'actions'
+        Loop = 'loop'
+
+    COMMAND = 'profile'
+    MEMORY_COMMAND = 'memory'
+    REPORTED_FUNCTIONS_COUNT = 40
+    REPORTED_ALLOCATIONS_COUNT = 30
+    TRACEMALLOC_FRAMES = 10
+
+    def __init__(self, controllers: list[Controller], output_directory: str):
+        self._controllers = controllers
+        self._output_directory = output_directory
+        self._profile: cProfile.Profile = None
+        self._scope: Profiler.Scope = None
+        self._remaining_actions: int = None
+        self._profiled_actions_count = 0
+        self._action_depth = 0
+        self._stop_timer: asyncio.TimerHandle = None
+        self._start_time: datetime.datetime = None
+        self._last_snapshot: tracemalloc.Snapshot = None
+
+    @property
+    def is_profiling(self) -> bool:
+        return self._profile is not None
+
+    def handle_command(self, args: list[str]) -> list[str]:
+        if len(args) == 0:
+            raise self.InvalidCommand(
+                f"Usage: {self.COMMAND} start actions|loop [N actions|Ns], stop, status, "
+                f"{self.MEMORY_COMMAND} [stop].")
+        subcommand, args = args[0], args[1:]
+        if subcommand == 'start':
+            return self._handle_start(args)
+        if subcommand == 'stop':
+            return self.stop()
+        if subcommand == 'status':
+            return [self.status()]
+        if subcommand == self.MEMORY_COMMAND:
+            if args == ['stop']:
+                return self.stop_memory_tracing()
+            return self.take_memory_snapshot()
+        raise self.InvalidCommand(f"Unknown {self.COMMAND} command '{subcommand}'.")
+
+    def _handle_start(self, args: list[str]) -> list[str]:
+        if len(args) not in (1, 2):
+            raise self.InvalidCommand(f"Usage: {self.COMMAND} start actions|loop [N actions|Ns].")
+        try:
+            scope = self.Scope(args[0])
+        except ValueError:
+            raise self.InvalidCommand(f"Unknown scope '{args[0]}', use 'actions' or 'loop'.")
+        seconds, actions = None, None
+        if len(args) == 2:
+            limit = args[1]
+            if limit.endswith('s') and limit[:-1].isdecimal():
+                seconds = int(limit[:-1])
+            elif limit.isdecimal() and scope is self.Scope.Actions:
+                actions = int(limit)
+            else:
+                raise self.InvalidCommand(f"Invalid limit '{limit}', use N actions (actions scope only) or Ns.")
+        return self.start(scope, seconds, actions)
+
+    def start(self, scope: 'Profiler.Scope', seconds: int=None, actions: int=None) -> list[str]:
+        if self.is_profiling:
+            raise self.InvalidCommand(f"Profiling of {self._scope.value} already running.")
+        self._profile = cProfile.Profile()
+        self._scope = scope
+        self._remaining_actions = actions
+        self._profiled_actions_count = 0
+        self._start_time = datetime.datetime.now()
+        if scope is self.Scope.Loop:
+            # Everything running on the event loop thread from now on is profiled.
+            self._profile.enable()
+        else:
+            for controller in self._controllers:
+                controller.set_action_wrapper(self._profile_action)
+        if seconds is not None:
+            self._stop_timer = asyncio.get_running_loop().call_later(seconds, self._stop_on_limit)
+        limit = f" for {seconds}s" if seconds is not None else f" for {actions} action(s)" if actions else ''
+        logger.info(f"Started profiling of {scope.value}{limit}.")
+        return [f"Started profiling of {scope.value}{limit}."]
+
+    def _profile_action(self, handle_action, *args, **kwargs) -> list[str]:
+        # Actions restarting games call themselves, only the outermost call toggles the profiler.
+        if self._action_depth > 0:
+            return handle_action(*args, **kwargs)
+        self._action_depth += 1
+        self._profile.enable()
+        try:
+            return handle_action(*args, **kwargs)
+        finally:
+            self._profile.disable()
+            self._action_depth -= 1
+            self._profiled_actions_count += 1
+            if self._remaining_actions is not None:
+                self._remaining_actions -= 1
+                if self._remaining_actions == 0:
+                    self._stop_on_limit()
+
+    def _stop_on_limit(self):
+        for response in self.stop():
+            logger.info(response)
+
+    def stop(self) -> list[str]:
+        if not self.is_profiling:
+            raise self.InvalidCommand(f"Profiling is not running.")
+        profile, scope = self._profile, self._scope
+        if scope is self.Scope.Loop:
+            profile.disable()
+        else:
+            for controller in self._controllers:
+                controller.set_action_wrapper(None)
+        if self._stop_timer is not None:
+            self._stop_timer.cancel()
+        duration = datetime.datetime.now() - self._start_time
+        self._profile, self._scope, self._stop_timer = None, None, None
+        output_path = self._output_path(f"profile_{scope.value}")
+        stats_path, report_path = f"{output_path}.pstats", f"{output_path}.txt"
+        profile.dump_stats(stats_path)
+        with open(report_path, mode='w') as report_file:
+            report_file.write(self._profile_report(profile))
+        actions = f", {self._profiled_actions_count} action(s)" if scope is self.Scope.Actions else ''
+        return [
+            f"Profiled {scope.value} for {duration.total_seconds():.1f}s{actions}.",
+            f"Stats written to '{stats_path}', report to '{report_path}'."]
+
+    def status(self) -> str:
+        memory = f" Memory tracing {'on' if tracemalloc.is_tracing() else 'off'}."
+        if not self.is_profiling:
+            return f"Profiling is not running.{memory}"
+        elapsed = (datetime.datetime.now() - self._start_time).total_seconds()
+        remaining = f", {self._remaining_actions} action(s) left" if self._remaining_actions is not None else ''
+        return f"Profiling {self._scope.value} for {elapsed:.1f}s{remaining}.{memory}"
+
+    def _profile_report(self, profile: cProfile.Profile) -> str:
+        report = io.StringIO()
+        stats = pstats.Stats(profile, stream=report)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.REPORTED_FUNCTIONS_COUNT)
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(self.REPORTED_FUNCTIONS_COUNT)
+        return report.getvalue()
+
+    def take_memory_snapshot(self) -> list[str]:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.TRACEMALLOC_FRAMES)
+            self._last_snapshot = None
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>')])
+        output_path = self._output_path('memory')
+        snapshot_path = f"{output_path}.tracemalloc"
+        snapshot.dump(snapshot_path)
+        current_size, peak_size = tracemalloc.get_traced_memory()
+        responses = [
+            f"Snapshot written to '{snapshot_path}'. "
+            f"Traced {current_size / 1024 ** 2:.1f}MB, peak {peak_size / 1024 ** 2:.1f}MB."]
+        if self._last_snapshot is not None:
+            diff_path = f"{output_path}_diff.txt"
+            statistics = snapshot.compare_to(self._last_snapshot, 'lineno')
+            with open(diff_path, mode='w') as diff_file:
+                for statistic in statistics[:self.REPORTED_ALLOCATIONS_COUNT]:
+                    diff_file.write(f"{statistic}\n")
+            responses.append(f"Difference to previous snapshot written to '{diff_path}'.")
+        else:
+            responses.append(f"Memory tracing started, take another snapshot to get a difference.")
+        self._last_snapshot = snapshot
+        return responses
+
+    def stop_memory_tracing(self) -> list[str]:
+        if not tracemalloc.is_tracing():
+            raise self.InvalidCommand(f"Memory tracing is not running.")
+        tracemalloc.stop()
+        self._last_snapshot = None
+        return [f"Memory tracing stopped."]
+
+    def _output_path(self, prefix: str) -> str:
+        os.makedirs(self._output_directory, exist_ok=True)
+        timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        return os.path.join(self._output_directory, f"{prefix}_{timestamp}")
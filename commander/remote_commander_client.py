@@ -1,37 +1,111 @@
+import argparse
 import asyncio
-import socket
+import itertools
+import json
 import sys
+from commander.remote_commander_server import RemoteCommanderServer
 
 
-def send_command(port: int, command: str):
-    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    s.sendto(command.encode(), ('127.0.0.1', port))
-    print(f"Sent command: '{command}'.")
+class RemoteCommanderClient:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+        self._request_ids = itertools.count(1)
 
+    @classmethod
+    async def connect(cls, endpoint: str) -> '__class__':
+        if endpoint.isdecimal():
+            reader, writer = await asyncio.open_connection(
+                RemoteCommanderServer.HOST, int(endpoint), limit=RemoteCommanderServer.MAX_LINE_SIZE)
+        else:
+            reader, writer = await asyncio.open_unix_connection(endpoint, limit=RemoteCommanderServer.MAX_LINE_SIZE)
+        return cls(reader, writer)
 
-async def main_loop(port):
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
+
+    async def send_command(self, command_line: str) -> dict:
+        return (await self.send_commands([command_line]))[0]
+
+    async def send_commands(self, command_lines: list[str], window: int=256) -> list[dict]:
+        return await self.send_requests([{'line': command_line} for command_line in command_lines], window)
+
+    async def send_requests(self, requests: list[dict], window: int=256) -> list[dict]:
+        # Up to `window` requests are in flight at once, responses come back in request order.
+        responses = []
+        for window_start in range(0, len(requests), window):
+            requests_window = requests[window_start:window_start + window]
+            for request in requests_window:
+                request.setdefault('id', next(self._request_ids))
+                self._writer.write((json.dumps(request) + '\n').encode())
+            await self._writer.drain()
+            for _ in requests_window:
+                line = await self._reader.readline()
+                if len(line) == 0:
+                    raise ConnectionError("Commander server closed connection.")
+                responses.append(json.loads(line))
+        return responses
+
+
+def print_response(command_line: str, response: dict):
+    if response['ok']:
+        print(f"'{command_line}':")
+        for game_response in response['responses']:
+            print(f"  {game_response}")
+    else:
+        error = response['error']
+        print(f"'{command_line}' failed - {error['code']}: {error['message']}", file=sys.stderr)
+
+
+async def main_loop(client: RemoteCommanderClient):
     while True:
-        command = input("Enter command: ")
-        if command.strip().lower() == 'exit':
+        command_line = await asyncio.to_thread(input, "Enter command: ")
+        if command_line.strip().lower() == 'exit':
             return
-        send_command(port, command)
+        print_response(command_line, await client.send_command(command_line))
 
 
-def main():
-    args = sys.argv
-    if len(args) < 2:
-        print("Provide receiver port.")
-        return
+async def send_batch(client: RemoteCommanderClient, commands_file) -> bool:
+    command_lines = [line.strip() for line in commands_file if len(line.strip()) > 0]
+    responses = await client.send_commands(command_lines)
+    failed_count = 0
+    for command_line, response in zip(command_lines, responses):
+        if not response['ok']:
+            failed_count += 1
+        print_response(command_line, response)
+    print(f"Sent {len(command_lines)} command(s), {failed_count} failed.")
+    return failed_count == 0
+
+
+async def run(args) -> bool:
+    client = await RemoteCommanderClient.connect(args.endpoint)
     try:
-        port = int(args[1])
-    except ValueError as exc:
-        print(f"Invalid port - {exc}.")
-        return
-    if len(args) == 2:
-        loop = asyncio.get_event_loop()
-        loop.run_until_complete(main_loop(port))
-    else:
-        send_command(port, ' '.join(args[2:]))
+        if args.file is not None:
+            return await send_batch(client, args.file)
+        if len(args.command) > 0:
+            command_line = ' '.join(args.command)
+            response = await client.send_command(command_line)
+            print_response(command_line, response)
+            return response['ok']
+        await main_loop(client)
+        return True
+    finally:
+        await client.close()
+
+
+def main():
+    args = parse_args()
+    if not asyncio.run(run(args)):
+        sys.exit(1)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('endpoint', help='TCP port or unix socket path of the commander server.')
+    parser.add_argument('command', nargs='*')
+    parser.add_argument('-f', '--file', type=argparse.FileType('r'), help='File with one command per line.')
+    return parser.parse_args()
 
 
 if __name__ == '__main__':
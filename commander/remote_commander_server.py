@@ -1,4 +1,5 @@
 import asyncio
+import json
 import logging
 from typing import Callable
 
@@ -6,32 +7,136 @@ logger = logging.getLogger(__name__)
 
 
 class RemoteCommanderServer:
-    class Protocol:
-        def __init__(self, command_handler):
-            self._command_handler = command_handler
+    class RequestError(Exception):
+        def __init__(self, code: str, message: str):
+            super().__init__(message)
+            self.code = code
+            self.message = message
 
-        @property
-        def _name(self) -> str:
-            return 'Commander server'
+    INVALID_JSON = 'invalid_json'
+    INVALID_REQUEST = 'invalid_request'
+    REQUEST_TOO_LARGE = 'request_too_large'
+    INTERNAL_ERROR = 'internal_error'
+    HOST = '127.0.0.1'
+    # A request line, batches included, may take up to 4 MiB instead of asyncio's default 64 KiB stream limit.
+    # That fits MAX_BATCH_SIZE ordinary commands, bigger batches are rejected as a whole.
+    MAX_LINE_SIZE = 4 * 1024 * 1024
+    MAX_BATCH_SIZE = 10000
+    LINE_SEPARATOR = b'\n'
 
-        def connection_made(self, transport):
-            logger.info(f"{self._name} - connection established.")
+    def __init__(self, request_handler: Callable[[dict], list[str]], port: int=None, unix_socket_path: str=None):
+        self._request_handler = request_handler
+        self._port = port
+        self._unix_socket_path = unix_socket_path
+        self._servers: list[asyncio.AbstractServer] = []
 
-        def connection_lost(self, exc):
-            logger.info(f"{self._name} - connection lost.")
+    @property
+    def _name(self) -> str:
+        return 'Commander server'
 
-        def datagram_received(self, data, sender_address):
-            command = data.decode()
-            logger.info(f"{self._name} - Received '{command}' from {sender_address}.")
-            self._command_handler(command)
+    async def start(self):
+        if self._port is not None:
+            logger.info(f"Starting {self._name} on port {self._port}.")
+            self._servers.append(await asyncio.start_server(
+                self._handle_connection, self.HOST, self._port, limit=self.MAX_LINE_SIZE))
+        if self._unix_socket_path is not None:
+            logger.info(f"Starting {self._name} on '{self._unix_socket_path}'.")
+            self._servers.append(await asyncio.start_unix_server(
+                self._handle_connection, self._unix_socket_path, limit=self.MAX_LINE_SIZE))
 
-    def __init__(self, port: int, command_handler: Callable[[str], None]):
-        self._port = port
-        self._command_handler = command_handler
+    async def stop(self):
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        self._servers.clear()
 
-    async def start(self):
-        logger.info(f"Starting Command server on port {self._port}.")
-        event_loop = asyncio.get_running_loop()
-        await event_loop.create_datagram_endpoint(
-            lambda: self.Protocol(self._command_handler),
-            local_addr=('127.0.0.1', self._port))
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        peer = writer.get_extra_info('peername') or 'unix socket'
+        logger.info(f"{self._name} - connection from {peer} established.")
+        handled_lines_count = 0
+        try:
+            while True:
+                try:
+                    line = await self._read_line(reader)
+                except self.RequestError as exc:
+                    logger.warning(f"{self._name} - request from {peer} rejected. Reason - {exc.code}: {exc.message}")
+                    writer.write(self._encode_response(self._error_response(None, exc.code, exc.message)))
+                    await writer.drain()
+                    continue
+                if len(line) == 0:
+                    break
+                if len(line.strip()) == 0:
+                    continue
+                writer.write(self._handle_line(line))
+                handled_lines_count += 1
+                # Pipelined requests are answered as they come, the socket is only flushed under backpressure.
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError) as exc:
+            logger.warning(f"{self._name} - connection from {peer} broken. Reason - {exc}.")
+        finally:
+            logger.info(f"{self._name} - connection from {peer} closed after {handled_lines_count} request(s).")
+            writer.close()
+
+    async def _read_line(self, reader: asyncio.StreamReader) -> bytes:
+        try:
+            return await reader.readuntil(self.LINE_SEPARATOR)
+        except asyncio.IncompleteReadError as exc:
+            return exc.partial
+        except asyncio.LimitOverrunError:
+            await self._skip_line(reader)
+            raise self.RequestError(
+                self.REQUEST_TOO_LARGE,
+                f"Request is larger than {self.MAX_LINE_SIZE} bytes, split it into smaller batches.")
+
+    async def _skip_line(self, reader: asyncio.StreamReader):
+        # Rest of an oversized line is discarded, so following requests on the connection are still answered.
+        while True:
+            try:
+                await reader.readuntil(self.LINE_SEPARATOR)
+                return
+            except asyncio.IncompleteReadError:
+                return
+            except asyncio.LimitOverrunError as exc:
+                await reader.readexactly(exc.consumed)
+
+    def _handle_line(self, line: bytes) -> bytes:
+        try:
+            request = json.loads(line)
+        except ValueError as exc:
+            response = self._error_response(None, self.INVALID_JSON, str(exc))
+        else:
+            if isinstance(request, list):
+                response = self._handle_batch(request)
+            else:
+                response = self._handle_request(request)
+        return self._encode_response(response)
+
+    def _handle_batch(self, requests: list):
+        if len(requests) > self.MAX_BATCH_SIZE:
+            return self._error_response(
+                None,
+                self.REQUEST_TOO_LARGE,
+                f"Batch has {len(requests)} requests, at most {self.MAX_BATCH_SIZE} are allowed.")
+        return [self._handle_request(batched_request) for batched_request in requests]
+
+    @staticmethod
+    def _encode_response(response) -> bytes:
+        return (json.dumps(response) + '\n').encode()
+
+    def _handle_request(self, request) -> dict:
+        if not isinstance(request, dict):
+            return self._error_response(None, self.INVALID_REQUEST, "Request must be a JSON object.")
+        request_id = request.get('id')
+        try:
+            responses = self._request_handler(request)
+        except self.RequestError as exc:
+            logger.warning(f"{self._name} - request {request_id} failed. Reason - {exc.code}: {exc.message}")
+            return self._error_response(request_id, exc.code, exc.message)
+        except Exception as exc:
+            logger.exception(f"{self._name} - request {request_id} raised.")
+            return self._error_response(request_id, self.INTERNAL_ERROR, repr(exc))
+        return {'id': request_id, 'ok': True, 'responses': responses}
+
+    @staticmethod
+    def _error_response(request_id, code: str, message: str) -> dict:
+        return {'id': request_id, 'ok': False, 'error': {'code': code, 'message': message}}
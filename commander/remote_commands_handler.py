@@ -1,25 +1,220 @@
+import collections
+from commander.config_reloader import ConfigReloader
+from commander.profiler import Profiler
+from commander.remote_commander_server import RemoteCommanderServer
 from game.controller import Controller
+from game.player_selector import PlayerSelector
 import logging
 
 logger = logging.getLogger(__name__)
 
 
 class RemoteCommandsHandler:
-    def __init__(self, controller: Controller):
-        self._controller = controller
+    UNKNOWN_CHANNEL = 'unknown_channel'
+    UNKNOWN_PLAYER = 'unknown_player'
+    INVALID_SELECTOR = 'invalid_selector'
+    INVALID_LOG_LEVEL = 'invalid_log_level'
+    INVALID_PROFILE_COMMAND = 'invalid_profile_command'
+    CONFIG_RELOAD_FAILED = 'config_reload_failed'
+    LOG_LEVEL_COMMAND = 'log_level'
+    PLAYERS_COMMAND = 'players'
+    SELECTOR_PREFIX = '*'
+    MAX_SUMMARIZED_RESPONSES = 10
+    MAX_LISTED_PLAYERS = 100
 
-    def handle_command(self, command_line: str):
+    def __init__(
+            self,
+            controllers: dict[str, Controller],
+            profiler: Profiler=None,
+            config_reloader: ConfigReloader=None):
+        self._controllers = controllers
+        self._profiler = profiler
+        self._config_reloader = config_reloader
+
+    def handle_command(self, command_line: str) -> list[str]:
+        return self.handle_request({'line': command_line})
+
+    def handle_request(self, request: dict) -> list[str]:
+        if self._is_log_level_request(request):
+            return self._handle_log_level_request(request)
+        if self._is_keyword_request(request, Profiler.COMMAND):
+            return self._handle_profile_request(request)
+        if self._is_keyword_request(request, ConfigReloader.COMMAND):
+            return self._handle_config_reload_request(request)
+        if self._is_keyword_request(request, self.PLAYERS_COMMAND):
+            return self._handle_players_request(request)
+        if 'line' in request:
+            channel_name, player_name, command, args = self._parse_command_line(request['line'])
+        else:
+            channel_name, player_name, command, args = self._parse_command_fields(request)
+        controller = self._controller(channel_name)
+        if player_name.startswith(self.SELECTOR_PREFIX):
+            return self._handle_bulk_command(controller, player_name[len(self.SELECTOR_PREFIX):], command, args)
+        if not controller.does_player_exist(player_name):
+            raise RemoteCommanderServer.RequestError(
+                self.UNKNOWN_PLAYER,
+                f"Player with name '{player_name}' does not exist.")
+        logger.info(f"Sending command '{command}' with args {args} to '{player_name}'.")
+        return controller.handle_admin_action(player_name, command, args)
+
+    def _handle_players_request(self, request: dict) -> list[str]:
+        if 'line' in request:
+            args = request['line'].split()[1:]
+            channel_name = None
+            if len(args) > 0 and args[0].startswith('#'):
+                channel_name, args = args[0], args[1:]
+            if len(args) != 1:
+                self._raise_invalid_request(f"Usage: {self.PLAYERS_COMMAND} [#channel] selector.")
+            selector_string = args[0]
+        else:
+            channel_name, selector_string = request.get('channel'), request[self.PLAYERS_COMMAND]
+            if not isinstance(selector_string, str):
+                self._raise_invalid_request(f"'{self.PLAYERS_COMMAND}' needs to be a selector string.")
+        controller = self._controller(channel_name)
+        selector = self._parse_selector(selector_string)
+        player_names = controller.select_players(selector)
+        responses = [f"{len(player_names)} player(s) selected by '{selector}'."]
+        if len(player_names) > 0:
+            listed_players = ', '.join(player_names[:self.MAX_LISTED_PLAYERS])
+            if len(player_names) > self.MAX_LISTED_PLAYERS:
+                listed_players += f" ... and {len(player_names) - self.MAX_LISTED_PLAYERS} other(s)"
+            responses.append(listed_players)
+        return responses
+
+    def _parse_selector(self, selector_string: str) -> PlayerSelector:
+        try:
+            return PlayerSelector(selector_string)
+        except PlayerSelector.InvalidSelector as exc:
+            raise RemoteCommanderServer.RequestError(self.INVALID_SELECTOR, str(exc))
+
+    def _handle_bulk_command(self, controller: Controller, selector_string: str, command: str, args: list[str]):
+        selector = self._parse_selector(selector_string)
+        players_responses = controller.handle_bulk_admin_action(selector, command, args)
+        return self._summarize(selector, command, players_responses)
+
+    def _summarize(self, selector: PlayerSelector, command: str, players_responses: dict[str, list[str]]) -> list[str]:
+        responses_counts = collections.Counter()
+        for player_name, responses in players_responses.items():
+            player_prefix = f"@{player_name}: "
+            for response in responses:
+                responses_counts[response.removeprefix(player_prefix)] += 1
+        summary = [f"'{command}' run for {len(players_responses)} player(s) selected by '{selector}'."]
+        for response, count in responses_counts.most_common(self.MAX_SUMMARIZED_RESPONSES):
+            summary.append(f"{count}x {response}")
+        if len(responses_counts) > self.MAX_SUMMARIZED_RESPONSES:
+            summary.append(f"... and {len(responses_counts) - self.MAX_SUMMARIZED_RESPONSES} other response(s).")
+        return summary
+
+    def _is_log_level_request(self, request: dict) -> bool:
+        return self._is_keyword_request(request, self.LOG_LEVEL_COMMAND)
+
+    @staticmethod
+    def _is_keyword_request(request: dict, keyword: str) -> bool:
+        if keyword in request:
+            return True
+        line = request.get('line')
+        return isinstance(line, str) and line.split()[:1] == [keyword]
+
+    def _handle_profile_request(self, request: dict) -> list[str]:
+        if self._profiler is None:
+            raise RemoteCommanderServer.RequestError(self.INVALID_PROFILE_COMMAND, f"Profiling is not enabled.")
+        if 'line' in request:
+            args = request['line'].split()[1:]
+        else:
+            args = request[Profiler.COMMAND]
+            if isinstance(args, str):
+                args = args.split()
+            if not isinstance(args, list) or not all(isinstance(arg, str) for arg in args):
+                self._raise_invalid_request(f"'{Profiler.COMMAND}' needs to be a string or a list of strings.")
+        try:
+            return self._profiler.handle_command(args)
+        except Profiler.InvalidCommand as exc:
+            raise RemoteCommanderServer.RequestError(self.INVALID_PROFILE_COMMAND, str(exc))
+
+    def _handle_config_reload_request(self, request: dict) -> list[str]:
+        if self._config_reloader is None:
+            raise RemoteCommanderServer.RequestError(self.CONFIG_RELOAD_FAILED, f"Config reloading is not enabled.")
+        if 'line' in request:
+            args = request['line'].split()[1:]
+        else:
+            config_path = request[ConfigReloader.COMMAND]
+            if config_path is not None and not isinstance(config_path, str):
+                self._raise_invalid_request(f"'{ConfigReloader.COMMAND}' needs to be a config path or null.")
+            args = [config_path] if config_path else []
+        try:
+            return self._config_reloader.handle_command(args)
+        except ConfigReloader.ReloadFailed as exc:
+            raise RemoteCommanderServer.RequestError(self.CONFIG_RELOAD_FAILED, str(exc))
+
+    def _handle_log_level_request(self, request: dict) -> list[str]:
+        if 'line' in request:
+            args = request['line'].split()[1:]
+        else:
+            args = [arg for arg in (request.get('logger'), request[self.LOG_LEVEL_COMMAND]) if arg is not None]
+        if len(args) == 0:
+            return self._log_levels()
+        if len(args) > 2 or not all(isinstance(arg, str) for arg in args):
+            self._raise_invalid_request(f"Log level request needs an optional logger and a level.")
+        logger_name, level_name = (None, args[0]) if len(args) == 1 else args
+        if logger_name is not None and logger_name not in logging.root.manager.loggerDict:
+            raise RemoteCommanderServer.RequestError(self.INVALID_LOG_LEVEL, f"Logger '{logger_name}' does not exist.")
+        if not isinstance(logging.getLevelName(level_name.upper()), int):
+            raise RemoteCommanderServer.RequestError(
+                self.INVALID_LOG_LEVEL,
+                f"Log level '{level_name}' does not exist.")
+        logging.getLogger(logger_name).setLevel(level_name.upper())
+        response = f"Log level of '{logger_name or 'root'}' set to {level_name.upper()}."
+        logger.info(response)
+        return [response]
+
+    @staticmethod
+    def _log_levels() -> list[str]:
+        levels = [f"root: {logging.getLevelName(logging.root.level)}"]
+        for logger_name, module_logger in sorted(logging.root.manager.loggerDict.items()):
+            if isinstance(module_logger, logging.Logger) and module_logger.level != logging.NOTSET:
+                levels.append(f"{logger_name}: {logging.getLevelName(module_logger.level)}")
+        return levels
+
+    def _parse_command_line(self, command_line) -> (str, str, str, list[str]):
+        if not isinstance(command_line, str):
+            self._raise_invalid_request(f"'line' needs to be a string.")
         splitted = command_line.split()
+        channel_name = None
+        if len(splitted) > 0 and splitted[0].startswith('#'):
+            channel_name, splitted = splitted[0], splitted[1:]
         if len(splitted) < 2:
-            logger.warning(f"Too short remote command '{command_line}'.")
-            return
+            self._raise_invalid_request(f"Too short remote command '{command_line}'.")
         player_name, command, args = splitted[0], splitted[1], splitted[2:]
+        if player_name.startswith(self.SELECTOR_PREFIX):
+            return channel_name, player_name, command, args
         if not player_name.startswith('@'):
-            logger.warning(f"Player name needs to start with '@' character.")
-            return
-        player_name = player_name.lstrip('@')
-        if not self._controller.does_player_exist(player_name):
-            logger.warning(f"Player with name '{player_name}' does not exist.")
-            return
-        logger.info(f"Sending command '{command}' with args {args} to '{player_name}'.")
-        self._controller.handle_admin_action(player_name, command, args)
+            self._raise_invalid_request(f"Player name needs to start with '@' or '{self.SELECTOR_PREFIX}' character.")
+        return channel_name, player_name.lstrip('@'), command, args
+
+    def _parse_command_fields(self, request: dict) -> (str, str, str, list[str]):
+        player_name, command, args = request.get('player'), request.get('command'), request.get('args', [])
+        if isinstance(request.get('select'), str):
+            player_name = self.SELECTOR_PREFIX + request['select']
+        if not isinstance(player_name, str) or not isinstance(command, str):
+            self._raise_invalid_request(f"Request needs 'player' or 'select' and 'command' strings or a 'line' string.")
+        if not isinstance(args, list) or not all(isinstance(arg, str) for arg in args):
+            self._raise_invalid_request(f"'args' needs to be a list of strings.")
+        if not player_name.startswith(self.SELECTOR_PREFIX):
+            player_name = player_name.lstrip('@')
+        return request.get('channel'), player_name, command, args
+
+    def _controller(self, channel_name: str) -> Controller:
+        if channel_name is None:
+            if len(self._controllers) > 1:
+                raise RemoteCommanderServer.RequestError(
+                    self.UNKNOWN_CHANNEL,
+                    "Channel needs to be given when serving multiple channels.")
+            return next(iter(self._controllers.values()))
+        channel_name = channel_name.lstrip('#').lower()
+        if channel_name not in self._controllers:
+            raise RemoteCommanderServer.RequestError(self.UNKNOWN_CHANNEL, f"Channel '{channel_name}' is not served.")
+        return self._controllers[channel_name]
+
+    @staticmethod
+    def _raise_invalid_request(message: str):
+        raise RemoteCommanderServer.RequestError(RemoteCommanderServer.INVALID_REQUEST, message)
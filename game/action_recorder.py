@@ -0,0 +1,76 @@
+import json
+import time
+import zlib
+from typing import Iterator, TextIO
+
+
+class ActionRecorder:
+    # Every line is a JSON object with short keys, the first one being the START entry:
+    # k - kind, t - seconds since start, p - player, c - command, a - args, s - selector, r - responses digest.
+    START = 'start'
+    USER_ACTION = 'user'
+    ADMIN_ACTION = 'admin'
+    BULK_ADMIN_ACTION = 'bulk'
+    EVENT = 'event'
+    JOIN = 'join'
+    PART = 'part'
+    EXPIRE = 'expire'
+
+    def __init__(self, log_file: TextIO):
+        self._log_file = log_file
+        self._start_time = time.monotonic()
+        self._recorded_entries_count = 0
+
+    @classmethod
+    def open(cls, log_file_path: str) -> '__class__':
+        return cls(open(log_file_path, mode='a', buffering=1))
+
+    def close(self):
+        self._log_file.close()
+
+    @property
+    def recorded_entries_count(self) -> int:
+        return self._recorded_entries_count
+
+    @staticmethod
+    def responses_digest(responses: list[str]) -> int:
+        return zlib.crc32('\n'.join(responses).encode())
+
+    @staticmethod
+    def read(log_file: TextIO) -> Iterator[dict]:
+        for line in log_file:
+            if len(line.strip()) > 0:
+                yield json.loads(line)
+
+    def record_start(self, seed: int, loaded_players: list[str]):
+        self._write({'k': self.START, 'time': time.time(), 'seed': seed, 'loaded': sorted(loaded_players)})
+
+    def record_action(self, kind: str, player_name: str, command: str, args, responses: list[str]):
+        self._write({
+            'k': kind,
+            't': self._elapsed_time(),
+            'p': player_name,
+            'c': command,
+            'a': list(args),
+            'r': self.responses_digest(responses)
+        })
+
+    def record_bulk_action(self, selector: str, command: str, args, responses: list[str]):
+        self._write({
+            'k': self.BULK_ADMIN_ACTION,
+            't': self._elapsed_time(),
+            's': selector,
+            'c': command,
+            'a': list(args),
+            'r': self.responses_digest(responses)
+        })
+
+    def record_presence(self, kind: str, players_names: list[str]):
+        self._write({'k': kind, 't': self._elapsed_time(), 'p': players_names})
+
+    def _elapsed_time(self) -> float:
+        return round(time.monotonic() - self._start_time, 3)
+
+    def _write(self, entry: dict):
+        self._log_file.write(json.dumps(entry, separators=(',', ':')) + '\n')
+        self._recorded_entries_count += 1
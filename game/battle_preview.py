@@ -0,0 +1,106 @@
+import math
+from game.damage_calculator import DamageCalculator
+from game.unit import Unit
+
+
+class DamageDistribution:
+    def __init__(self, probabilities: dict):
+        self._probabilities = probabilities
+        self._expected_hits_to_kill = [0.0]
+
+    @classmethod
+    def certain(cls, damage: int) -> '__class__':
+        return cls({damage: 1.0})
+
+    @classmethod
+    def physical_attack(cls, attacker: Unit, defender: Unit) -> '__class__':
+        damage_calculator = DamageCalculator(attacker, defender)
+        hit_chance = damage_calculator.hit_chance()
+        critical_hit_chance = damage_calculator.critical_hit_chance()
+        damage_rolls_weights = dict(zip(DamageCalculator.DAMAGE_ROLLS, DamageCalculator.DAMAGE_ROLLS_WEIGHTS))
+        total_damage_rolls_weight = sum(DamageCalculator.DAMAGE_ROLLS_WEIGHTS)
+        outcomes = damage_calculator.physical_damage_outcomes(relative_heights=(damage_calculator.relative_height(),))
+        probabilities = {0: 1.0 - hit_chance}
+        for (damage_roll, _, is_critical), damage in outcomes.items():
+            probability = hit_chance * damage_rolls_weights[damage_roll] / total_damage_rolls_weight
+            probability *= critical_hit_chance if is_critical else 1.0 - critical_hit_chance
+            probabilities[damage] = probabilities.get(damage, 0.0) + probability
+        return cls(probabilities)
+
+    @classmethod
+    def mixture(cls, weighted_distributions: list) -> '__class__':
+        probabilities = {}
+        for weight, distribution in weighted_distributions:
+            for damage, probability in distribution._probabilities.items():
+                probabilities[damage] = probabilities.get(damage, 0.0) + weight * probability
+        return cls(probabilities)
+
+    @property
+    def probabilities(self) -> dict:
+        return self._probabilities
+
+    @property
+    def hit_chance(self) -> float:
+        return 1.0 - self._probabilities.get(0, 0.0)
+
+    @property
+    def min_damage(self) -> int:
+        return min((damage for damage in self._probabilities if damage > 0), default=0)
+
+    @property
+    def max_damage(self) -> int:
+        return max(self._probabilities, default=0)
+
+    @property
+    def mean_damage(self) -> float:
+        return sum(damage * probability for damage, probability in self._probabilities.items())
+
+    def kill_chance(self, hp: int) -> float:
+        return sum(probability for damage, probability in self._probabilities.items() if damage >= hp)
+
+    def expected_hits_to_kill(self, hp: int) -> float:
+        miss_chance = self._probabilities.get(0, 0.0)
+        if miss_chance >= 1.0:
+            return math.inf
+        expected_hits = self._expected_hits_to_kill
+        for remaining_hp in range(len(expected_hits), hp + 1):
+            expected_follow_up_hits = sum(
+                probability * expected_hits[max(remaining_hp - damage, 0)]
+                for damage, probability in self._probabilities.items()
+                if damage > 0)
+            expected_hits.append((1.0 + expected_follow_up_hits) / (1.0 - miss_chance))
+        return expected_hits[max(hp, 0)]
+
+
+class BattlePreview:
+    def __init__(self, familiar: Unit, enemy: Unit, enemy_spell_attack_probability: float):
+        self._key = self.key(familiar, enemy)
+        self._familiar_attack = DamageDistribution.physical_attack(familiar, enemy)
+        self._familiar_spell_damage = DamageCalculator(familiar, enemy).spell_damage() if familiar.has_spell() else None
+        enemy_attack = DamageDistribution.physical_attack(enemy, familiar)
+        if enemy.has_spell() and enemy.has_enough_mp_for_spell():
+            enemy_spell = DamageDistribution.certain(DamageCalculator(enemy, familiar).spell_damage())
+            enemy_attack = DamageDistribution.mixture([
+                (enemy_spell_attack_probability, enemy_spell),
+                (1.0 - enemy_spell_attack_probability, enemy_attack)])
+        self._enemy_attack = enemy_attack
+
+    @classmethod
+    def key(cls, familiar: Unit, enemy: Unit) -> tuple:
+        can_enemy_cast_spell = enemy.has_spell() and enemy.has_enough_mp_for_spell()
+        return familiar.combat_signature(), enemy.combat_signature(), can_enemy_cast_spell
+
+    def is_up_to_date(self, familiar: Unit, enemy: Unit) -> bool:
+        return self._key == self.key(familiar, enemy)
+
+    @property
+    def familiar_attack(self) -> DamageDistribution:
+        return self._familiar_attack
+
+    @property
+    def familiar_spell_damage(self) -> int:
+        return self._familiar_spell_damage
+
+    @property
+    def enemy_attack(self) -> DamageDistribution:
+        return self._enemy_attack
@@ -12,10 +12,12 @@ FAMILIAR_EVENT = 'familiar_event'
 START_BATTLE = 'start_battle'
 BATTLE_PREPARE_PHASE = 'battle_prepare_phase'
 APPROACH = 'approach'
+AUTO = 'auto'
 BATTLE_PREPARE_PHASE_ACTION_PERFORMED = 'battle_prepare_phase_action_performed'
 BATTLE_PREPARE_PHASE_FINISHED = 'battle_prepare_phase_finished'
 PLAYER_TURN = 'player_turn'
 ENEMY_STATS = 'enemy_stats'
+SCOUT = 'scout'
 ATTACK = 'attack'
 USE_SPELL = 'use_spell'
 CANNOT_USE_SPELL = 'cannot_use_spell'
@@ -49,6 +51,8 @@ SHOW_FAMILIAR_STATS = 'fam_stats'
 SHOW_INVENTORY = 'inventory'
 SHOW_FLOOR = 'floor'
 SHOW_STATE = 'state'
+SHOW_TOP = 'top'
+AUTO_BATTLE = 'auto_battle'
 GIVE_ITEM = 'give_item'
 RESTORE_HP = 'restore_hp'
 RESTORE_MP = 'restore_mp'
@@ -1,9 +1,16 @@
 from collections.abc import Mapping, Sequence
+import hashlib
 import json
+import logging
+import os
+import pickle
+import sys
 from game.floor_descriptor import FloorDescriptor, Monster
 from game.items import all_items
 from game.traits import UnitTraits, Genus, Talents, SpellTraits
 
+logger = logging.getLogger(__name__)
+
 
 class Config:
     class InvalidConfig(Exception):
@@ -13,6 +20,7 @@ class Config:
         def __init__(self):
             self.event_interval = 0
             self.event_penalty_duration = 0
+            self.player_inactivity_timeout = 0
 
     class Probabilities:
         def __init__(self):
@@ -53,6 +61,7 @@ class Config:
         self._levels = self.Levels()
         self._monsters_traits = {}
         self._special_units_traits = self.SpecialUnitsTraits()
+        self._spells_traits = {}
         self._floors = []
 
     @property
@@ -79,6 +88,15 @@ class Config:
     def special_units_traits(self):
         return self._special_units_traits
 
+    @property
+    def spells_traits(self) -> Mapping[str, SpellTraits]:
+        return self._spells_traits
+
+    def find_unit_traits(self, name: str) -> UnitTraits:
+        if name == self._special_units_traits.ghosh.name:
+            return self._special_units_traits.ghosh
+        return self._monsters_traits.get(name)
+
     @property
     def floors(self) -> Sequence[FloorDescriptor]:
         return self._floors
@@ -91,6 +109,47 @@ class Config:
     def from_file(cls, config_file) -> '__class__':
         return cls.from_json(config_file.read())
 
+    @classmethod
+    def from_file_cached(cls, config_file, cache_directory: str) -> '__class__':
+        config_json_string = config_file.read()
+        cache_file_path = os.path.join(cache_directory, f"game_config-{cls._cache_key(config_json_string)}.pickle")
+        try:
+            with open(cache_file_path, mode='rb') as cache_file:
+                return pickle.load(cache_file)
+        except FileNotFoundError:
+            pass
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as exc:
+            logger.warning(f"Could not load cached config '{cache_file_path}'. Reason - {exc}.")
+        config = cls.from_json(config_json_string)
+        cls._write_cache(config, cache_directory, cache_file_path)
+        return config
+
+    @staticmethod
+    def _cache_key(config_json_string: str) -> str:
+        # Pickled config is only valid for the classes it was pickled from, so game sources are part of the key.
+        key = hashlib.sha256(config_json_string.encode())
+        key.update(sys.version.encode())
+        game_directory = os.path.dirname(os.path.abspath(__file__))
+        for file_name in sorted(os.listdir(game_directory)):
+            if file_name.endswith('.py'):
+                file_stat = os.stat(os.path.join(game_directory, file_name))
+                key.update(f"{file_name}:{file_stat.st_size}:{file_stat.st_mtime_ns}".encode())
+        return key.hexdigest()[:32]
+
+    @staticmethod
+    def _write_cache(config: 'Config', cache_directory: str, cache_file_path: str):
+        try:
+            os.makedirs(cache_directory, exist_ok=True)
+            for file_name in os.listdir(cache_directory):
+                if file_name.startswith('game_config-'):
+                    os.remove(os.path.join(cache_directory, file_name))
+            temporary_file_path = f"{cache_file_path}.{os.getpid()}.tmp"
+            with open(temporary_file_path, mode='wb') as cache_file:
+                pickle.dump(config, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_file_path, cache_file_path)
+        except OSError as exc:
+            logger.warning(f"Could not cache config in '{cache_directory}'. Reason - {exc}.")
+
     @classmethod
     def from_json(cls, config_json_string) -> '__class__':
         config = Config()
@@ -108,12 +167,16 @@ class Config:
             cls._read_levels(config._levels, config_json['experience_per_level'])
             config._monsters_traits = cls._create_monsters_traits(config_json['monsters'])
             config._special_units_traits = cls._create_special_units_traits(config_json['special_units'])
+            config._spells_traits = cls._collect_spells_traits(config)
             config._floors = cls._create_floors(config_json['floors'])
+            cls._validate_config(config)
         except json.JSONDecodeError as exc:
             raise cls.InvalidConfig(f"Invalid JSON: {exc}")
         except KeyError as exc:
             raise cls.InvalidConfig(f"Missing key: {exc}")
-        cls._validate_config(config)
+        except (TypeError, AttributeError, ValueError) as exc:
+            # Valid JSON may still hold values of wrong types, which sections parsers cannot use.
+            raise cls.InvalidConfig(f"Invalid value: {exc}")
         return config
 
     @classmethod
@@ -121,6 +184,7 @@ class Config:
         try:
             timers.event_interval = int(timers_json['event_interval'])
             timers.event_penalty_duration = int(timers_json['event_penalty_duration'])
+            timers.player_inactivity_timeout = int(timers_json.get('player_inactivity_timeout', 0))
         except ValueError as exc:
             raise cls.InvalidConfig(f"{timers_json}: {exc}")
 
@@ -251,6 +315,14 @@ class Config:
             raise cls.InvalidConfig(f'Missing special units traits - {exc}')
         return special_units_traits
 
+    @classmethod
+    def _collect_spells_traits(cls, config):
+        spells_traits = {}
+        for unit_traits in (*config.monsters_traits.values(), config.special_units_traits.ghosh):
+            if unit_traits.native_spell_traits is not None:
+                spells_traits[unit_traits.native_spell_traits.name] = unit_traits.native_spell_traits
+        return spells_traits
+
     @classmethod
     def _create_floors(cls, floors_json):
         floors = []
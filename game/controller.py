@@ -1,17 +1,42 @@
 import asyncio
 import datetime
+from game.action_recorder import ActionRecorder
 from game.config import Config
+from game.inactivity_tracker import InactivityTracker
+from game.leaderboards import Leaderboards
+from game.player_indexes import PlayerIndexes
+from game.player_selector import PlayerSelector
 from game.state_machine import StateMachine, StateMachineContext
 from game.state_machine_action import StateMachineAction
 from game import commands
 from game.game_interface import GameInterface
 import logging
+from metrics.registry import Counter, Gauge, Histogram
 import random
+import sys
+import time
 from typing import Callable
 import os.path
 
 logger = logging.getLogger(__name__)
 
+ACTIONS = Counter('ad_bot_game_actions', 'Actions handled by players state machines.', ('channel', 'command', 'origin'))
+ON_ACTION_DURATION = Histogram('ad_bot_game_on_action_seconds', 'State machine action handling time.', ('channel',))
+STATE_SAVE_DURATION = Histogram('ad_bot_game_state_save_seconds', 'Player state saving time.', ('channel',))
+STATE_SAVE_SIZE = Histogram(
+    'ad_bot_game_state_save_bytes',
+    'Size of saved player states.',
+    ('channel',),
+    buckets=(1024, 2048, 4096, 8192, 16384, 32768, 65536, 131072, 262144))
+EVENT_TICKS = Counter('ad_bot_game_event_ticks', 'Event timer expiries by their outcome.', ('channel', 'outcome'))
+EVENT_ELIGIBLE_PLAYERS = Gauge(
+    'ad_bot_game_event_eligible_players',
+    'Players eligible for the last event.',
+    ('channel',))
+RESIDENT_STATE_MACHINES = Gauge('ad_bot_game_resident_state_machines', 'State machines kept in memory.', ('channel',))
+ACTIVE_PLAYERS = Gauge('ad_bot_game_active_players', 'Players currently present in channel.', ('channel',))
+EXPIRED_PLAYERS = Counter('ad_bot_game_expired_players', 'Players expired after inactivity.', ('channel',))
+
 
 class Controller(GameInterface):
     class PlayerDoesNotExist(Exception):
@@ -23,35 +48,105 @@ class Controller(GameInterface):
         pass
 
     STATE_FILE_SUFFIX = '.json'
+    # Commands sent by users are free text, anything not known to the game is counted under one label.
+    KNOWN_COMMANDS = frozenset(value for name, value in vars(commands).items() if name.isupper())
+    UNKNOWN_COMMAND_LABEL = 'unknown'
+    LEADERBOARD_DEFAULT_SIZE = 5
+    LEADERBOARD_MAX_SIZE = 10
 
-    def __init__(self, game_config: Config, state_files_directory: str):
+    def __init__(self, game_config: Config, state_files_directory: str, seed: int=None, timers_enabled: bool=True):
         self._game_config = game_config
         self._state_files_directory = state_files_directory
         self._rng = random.Random()
+        # New players' RNGs are seeded from here, so a recorded session can be replayed deterministically.
+        self._seed = seed if seed is not None else random.getrandbits(64)
+        self._seeds_rng = random.Random(self._seed)
+        self._timers_enabled = timers_enabled
+        self._action_recorder: ActionRecorder = None
+        self._action_wrapper: Callable[..., list[str]] = None
         self._player_state_machines = {}
         self._active_players = set()
+        self._leaderboards = Leaderboards()
+        self._player_indexes = PlayerIndexes()
+        self._inactivity_tracker = self._create_inactivity_tracker(game_config.timers.player_inactivity_timeout)
+        self._expired_players_count = 0
         self._event_timer: asyncio.Task = None
+        self._inactivity_sweep_timer: asyncio.Task = None
+        self._metrics_channel: str = None
+        self._bind_hot_path_metrics('')
         self._load_state_files()
 
+    def bind_metrics(self, channel_name: str):
+        self._bind_hot_path_metrics(channel_name)
+        RESIDENT_STATE_MACHINES.labels(channel_name).set_function(lambda: self.resident_state_machines_count)
+        ACTIVE_PLAYERS.labels(channel_name).set_function(lambda: self.active_players_count)
+        EXPIRED_PLAYERS.labels(channel_name).set_function(lambda: self.expired_players_count)
+
+    def _bind_hot_path_metrics(self, channel_name: str):
+        # Children labelled before binding were not observed yet, so they are not exposed as stale series.
+        if self._metrics_channel is not None:
+            for metric in (ON_ACTION_DURATION, STATE_SAVE_DURATION, STATE_SAVE_SIZE, EVENT_ELIGIBLE_PLAYERS):
+                metric.remove(self._metrics_channel)
+        self._metrics_channel = channel_name
+        self._on_action_duration = ON_ACTION_DURATION.labels(channel_name)
+        self._state_save_duration = STATE_SAVE_DURATION.labels(channel_name)
+        self._state_save_size = STATE_SAVE_SIZE.labels(channel_name)
+        self._event_eligible_players_gauge = EVENT_ELIGIBLE_PLAYERS.labels(channel_name)
+
+    @staticmethod
+    def _create_inactivity_tracker(timeout: int) -> InactivityTracker:
+        if timeout <= 0:
+            return None
+        return InactivityTracker(timeout)
+
     def _load_state_files(self):
         for file_name in os.listdir(self._state_files_directory):
             file_path = os.path.join(self._state_files_directory, file_name)
             if os.path.isfile(file_path):
                 self._load_state_file(file_path)
+        self._leaderboards.reset(
+            {player_name: state_machine.records for player_name, state_machine in self._player_state_machines.items()})
+        for player_name, state_machine in self._player_state_machines.items():
+            self._player_indexes.update(player_name, state_machine)
 
     def _load_state_file(self, state_file_path: str):
         _, state_file_name = os.path.split(state_file_path)
         player_name, file_extension = os.path.splitext(state_file_name)
         if file_extension != self.STATE_FILE_SUFFIX:
-            logger.debug(f"Non-json file trying to be loaded - {state_file_path}.")
+            logger.debug("Non-json file trying to be loaded - %s.", state_file_path)
             return
         try:
             with open(state_file_path, mode='r') as state_file:
                 state_machine = StateMachine.load(state_file, self._game_config)
                 self._player_state_machines[player_name] = state_machine
-            logger.info(f"Loaded '{player_name}'s' state.")
+            logger.info("Loaded '%s's' state.", player_name)
         except IOError as exc:
-            logger.error(f"Error while loading '{player_name}'s' state. Reason - {exc}.")
+            logger.error("Error while loading '%s's' state. Reason - %s.", player_name, exc)
+
+    def replace_game_config(self, game_config: Config) -> dict[str, list[str]]:
+        # Runs between actions on the event loop, so no player ever sees a mix of both configs.
+        players_unmapped_units_names = {}
+        for player_name, state_machine in self._player_state_machines.items():
+            unmapped_units_names = state_machine.replace_game_config(game_config)
+            if len(unmapped_units_names) > 0:
+                players_unmapped_units_names[player_name] = unmapped_units_names
+        previous_timers, self._game_config = self._timers, game_config
+        # Event interval is read whenever the event timer starts, so it changes from the next event on.
+        if game_config.timers.player_inactivity_timeout != previous_timers.player_inactivity_timeout:
+            self._replace_inactivity_tracker(game_config.timers.player_inactivity_timeout)
+        return players_unmapped_units_names
+
+    def _replace_inactivity_tracker(self, timeout: int):
+        # Active players get a fresh timeout, their previous activity times are not known to the new tracker.
+        self._inactivity_tracker = self._create_inactivity_tracker(timeout)
+        now = time.monotonic()
+        if self._inactivity_tracker is not None:
+            for player_name in self._active_players:
+                self._inactivity_tracker.touch(player_name, now)
+        self._cancel_timer(self._inactivity_sweep_timer)
+        self._inactivity_sweep_timer = None
+        if self._any_player_active() and self._timers_enabled:
+            self._start_inactivity_sweep_timer()
 
     @property
     def _timers(self) -> Config.Timers:
@@ -60,12 +155,31 @@ class Controller(GameInterface):
     def _any_player_active(self) -> bool:
         return len(self._active_players) > 0
 
-    def set_response_event_handler(self, handler: Callable[[str], bool]):
+    @property
+    def active_players_count(self) -> int:
+        return len(self._active_players)
+
+    @property
+    def expired_players_count(self) -> int:
+        return self._expired_players_count
+
+    @property
+    def resident_state_machines_count(self) -> int:
+        return len(self._player_state_machines)
+
+    def set_action_recorder(self, action_recorder: ActionRecorder):
+        self._action_recorder = action_recorder
+        action_recorder.record_start(self._seed, list(self._player_state_machines))
+
+    def set_response_event_handler(self, handler: Callable[[str, GameInterface.ResponseOrigin], None]):
         self._response_event_handler = handler
 
-    def _send_response(self, player_name: str, responses: list[str]):
-        for response_string in self._response_string_generator(responses):
-            self._response_event_handler(f"@{player_name}: {response_string}")
+    def _send_response(self, responses: list[str], origin: GameInterface.ResponseOrigin):
+        for response in responses:
+            self._response_event_handler(response, origin)
+
+    def _format_responses(self, player_name: str, responses: list[str]) -> list[str]:
+        return [f"@{player_name}: {response_string}" for response_string in self._response_string_generator(responses)]
 
     def _response_string_generator(self, responses: list[str]):
         def responses_group_to_string(responses_group: list[str]):
@@ -82,35 +196,157 @@ class Controller(GameInterface):
         if len(responses_group) > 0:
             yield responses_group_to_string(responses_group)
 
-    def handle_user_action(self, player_name: str, command: str, args: str):
-        self._handle_action(player_name, self._user_action(command, args))
+    def handle_user_action(self, player_name: str, command: str, args: str) -> list[str]:
+        if command == commands.SHOW_TOP:
+            responses = self._handle_leaderboard_query(player_name, args)
+        else:
+            responses = self._handle_action(player_name, self._user_action(command, args), self.ResponseOrigin.User)
+        if self._action_recorder is not None:
+            self._action_recorder.record_action(ActionRecorder.USER_ACTION, player_name, command, args, responses)
+        return responses
+
+    def _handle_leaderboard_query(self, player_name: str, args: list[str]) -> list[str]:
+        # Leaderboards span all players, so they are answered here without touching any state machine.
+        self.add_active_player(player_name)
+        responses = [self._leaderboard_response(player_name, args)]
+        responses = self._format_responses(player_name, responses)
+        self._send_response(responses, self.ResponseOrigin.User)
+        return responses
+
+    def _leaderboard_response(self, player_name: str, args: list[str]) -> str:
+        board, count = Leaderboards.Board.Floor, self.LEADERBOARD_DEFAULT_SIZE
+        for arg in args:
+            if arg.isdecimal():
+                count = min(max(int(arg), 1), self.LEADERBOARD_MAX_SIZE)
+                continue
+            try:
+                board = Leaderboards.parse_board(arg)
+            except Leaderboards.UnknownBoard as exc:
+                return str(exc)
+        top = self._leaderboards.top(board, count)
+        if len(top) == 0:
+            return f"{Leaderboards.BOARDS_TITLES[board]}: nobody yet."
+        entries = ', '.join(
+            f"{place}. {top_player_name} {Leaderboards.format_value(board, value)}"
+            for place, (top_player_name, value) in enumerate(top, start=1))
+        response = f"{Leaderboards.BOARDS_TITLES[board]}: {entries}."
+        rank = self._leaderboards.rank(board, player_name)
+        if rank is not None:
+            place, value = rank
+            players_count = self._leaderboards.size(board)
+            response += f" You are #{place} of {players_count} ({Leaderboards.format_value(board, value)})."
+        return response
 
     def _user_action(self, command: str, args: tuple=()) -> StateMachineAction:
         return StateMachineAction(command, args)
 
-    def handle_admin_action(self, player_name: str, command: str, args: str):
-        self._handle_action(player_name, self._admin_action(command, args))
+    def handle_admin_action(self, player_name: str, command: str, args: str) -> list[str]:
+        responses = self._handle_action(player_name, self._admin_action(command, args), self.ResponseOrigin.Admin)
+        if self._action_recorder is not None:
+            self._action_recorder.record_action(ActionRecorder.ADMIN_ACTION, player_name, command, args, responses)
+        return responses
 
     def _admin_action(self, command: str, args: tuple=()) -> StateMachineAction:
         return StateMachineAction(command, args, is_given_by_admin=True)
 
-    def _handle_action(self, player_name: str, action: StateMachineAction):
-        self.add_active_player(player_name)
+    def select_players(self, selector: PlayerSelector) -> list[str]:
+        if not selector.needs_state:
+            if selector.active_only:
+                return sorted(self._active_players)
+            return sorted(self._active_players.union(self._player_state_machines))
+        # Players without state machine are not indexed, so they are never selected by state.
+        selected = self._player_indexes.select(selector)
+        if selector.active_only:
+            selected.intersection_update(self._active_players)
+        return sorted(selected)
+
+    def handle_bulk_admin_action(self, selector: PlayerSelector, command: str, args: str) -> dict[str, list[str]]:
+        player_names = self.select_players(selector)
+        logger.info(f"Running '{command}' with args {args} for {len(player_names)} player(s) selected by '{selector}'.")
+        players_responses = {}
+        for player_name in player_names:
+            players_responses[player_name] = self._handle_action(
+                player_name,
+                self._admin_action(command, args),
+                self.ResponseOrigin.Admin,
+                is_bulk=True)
+        self._save_players_states(player_names)
+        if self._action_recorder is not None:
+            self._action_recorder.record_bulk_action(
+                str(selector),
+                command,
+                args,
+                [response for player_name in player_names for response in players_responses[player_name]])
+        return players_responses
+
+    def set_action_wrapper(self, action_wrapper: Callable[..., list[str]]):
+        # Wrapper is called with the unwrapped handler followed by its arguments, e.g. to profile actions.
+        self._action_wrapper = action_wrapper
+
+    def _handle_action(
+            self,
+            player_name: str,
+            action: StateMachineAction,
+            origin: GameInterface.ResponseOrigin,
+            is_bulk: bool=False) -> list[str]:
+        if self._action_wrapper is not None:
+            return self._action_wrapper(self._handle_unwrapped_action, player_name, action, origin, is_bulk)
+        return self._handle_unwrapped_action(player_name, action, origin, is_bulk)
+
+    def _handle_unwrapped_action(
+            self,
+            player_name: str,
+            action: StateMachineAction,
+            origin: GameInterface.ResponseOrigin,
+            is_bulk: bool) -> list[str]:
+        # Bulk actions neither activate players nor talk to chat, and their states are saved together afterwards.
+        if not is_bulk:
+            self.add_active_player(player_name)
         player_state_machine = self._player_state_machine(player_name)
-        responses = player_state_machine.on_action(action)
-        if len(responses) > 0:
-            self._send_response(player_name, responses)
+        start_time = time.perf_counter()
+        state_machine_responses = player_state_machine.on_action(action)
+        self._on_action_duration.observe(time.perf_counter() - start_time)
+        self._leaderboards.update(player_name, player_state_machine.records)
+        self._player_indexes.update(player_name, player_state_machine)
+        self._count_action(action, origin)
+        responses = self._format_responses(player_name, state_machine_responses)
+        if not is_bulk:
+            self._send_response(responses, self._response_origin(origin, player_state_machine))
         if player_state_machine.is_finished():
-            self._restart_game(player_name)
-        self._save_player_state(player_name)
+            responses.extend(self._restart_game(player_name, origin, is_bulk))
+        if not is_bulk:
+            self._save_player_state(player_name)
+        return responses
+
+    def _response_origin(
+            self,
+            origin: GameInterface.ResponseOrigin,
+            player_state_machine: StateMachine) -> GameInterface.ResponseOrigin:
+        # Event leaving the player nothing to answer, e.g. a trap or a finished battle, only narrates.
+        if origin is self.ResponseOrigin.Event and not player_state_machine.is_waiting_for_user_action() \
+                and not player_state_machine.is_finished():
+            return self.ResponseOrigin.Narration
+        return origin
+
+    def _count_action(self, action: StateMachineAction, origin: GameInterface.ResponseOrigin):
+        command = action.command if action.command in self.KNOWN_COMMANDS else self.UNKNOWN_COMMAND_LABEL
+        ACTIONS.labels(self._metrics_channel, command, origin.name).inc()
+
+    def _save_players_states(self, player_names: list[str]):
+        for player_name in player_names:
+            self._save_player_state(player_name)
+        logger.info("Saved state for %d player(s).", len(player_names))
 
     def _save_player_state(self, player_name: str):
-        logger.debug(f"Saving state for '{player_name}'.")
+        logger.debug("Saving state for '%s'.", player_name)
         try:
+            start_time = time.perf_counter()
             with open(self._player_state_file_path(player_name), mode='w') as player_state_file:
                 self._player_state_machine(player_name).save(player_state_file)
+                self._state_save_size.observe(player_state_file.tell())
+            self._state_save_duration.observe(time.perf_counter() - start_time)
         except IOError as exc:
-            logger.error(f"Could not save state file for '{player_name}'. Reason - {exc}.")
+            logger.error("Could not save state file for '%s'. Reason - %s.", player_name, exc)
 
     def _player_state_file_path(self, player_name: str) -> str:
         return os.path.join(self._state_files_directory, self._player_state_file_name(player_name))
@@ -120,44 +356,62 @@ class Controller(GameInterface):
         return player_name + cls.STATE_FILE_SUFFIX
 
     def _player_state_machine(self, player_name: str) -> StateMachine:
-        if not self.does_player_exist(player_name):
-            raise self.PlayerDoesNotExist(player_name)
-        return self._player_state_machines[player_name]
+        state_machine = self._player_state_machines.get(player_name)
+        if state_machine is None:
+            if not self._is_player_active(player_name):
+                raise self.PlayerDoesNotExist(player_name)
+            state_machine = self._create_player_state_machine(player_name)
+        return state_machine
+
+    def _create_player_state_machine(self, player_name: str) -> StateMachine:
+        logger.debug("Creating state machine for '%s'.", player_name)
+        state_machine = StateMachine(self._game_config, player_name)
+        state_machine.seed(self._seeds_rng.getrandbits(64))
+        self._player_state_machines[player_name] = state_machine
+        self._player_indexes.update(player_name, state_machine)
+        return state_machine
 
     def does_player_exist(self, player_name: str) -> bool:
+        return self._has_player_state_machine(player_name) or self._is_player_active(player_name)
+
+    def _has_player_state_machine(self, player_name: str) -> bool:
         return player_name in self._player_state_machines
 
-    def _restart_game(self, player_name: str):
-        self._handle_action(player_name, self._admin_action(commands.RESTART))
+    def _restart_game(self, player_name: str, origin: GameInterface.ResponseOrigin, is_bulk: bool=False) -> list[str]:
+        return self._handle_action(player_name, self._admin_action(commands.RESTART), origin, is_bulk)
 
     def add_active_player(self, player_name: str):
+        player_name = sys.intern(player_name)
+        if self._inactivity_tracker is not None:
+            self._inactivity_tracker.touch(player_name, time.monotonic())
         if self._is_player_active(player_name):
             return
         is_first_active_player = not self._any_player_active()
+        # State machine is created only once the player is selected for an event or sends a command.
         self._active_players.add(player_name)
-        if not self.does_player_exist(player_name):
-            self._player_state_machines[player_name] = StateMachine(self._game_config, player_name)
-        if is_first_active_player:
-            logger.info(f"First player became active. Starting event.")
+        if self._action_recorder is not None:
+            self._action_recorder.record_presence(ActionRecorder.JOIN, [player_name])
+        if is_first_active_player and self._timers_enabled:
+            logger.info("First player became active. Starting event.")
+            self._start_inactivity_sweep_timer()
             self._handle_event_timer_expiry()
 
     def _is_game_started(self, player_name: str) -> bool:
-        return self.does_player_exist(player_name) and self._player_state_machine(player_name).is_started()
+        return self._has_player_state_machine(player_name) and self._player_state_machine(player_name).is_started()
 
     def _start_game(self, player_name: str):
-        if player_name not in self._player_state_machines:
-            player_state_machine = StateMachine(self._game_config, player_name)
-            self._player_state_machines[player_name] = player_state_machine
-        else:
-            player_state_machine = self._player_state_machines[player_name]
-        self._handle_action(player_name, self._admin_action(commands.STARTED))
+        self._handle_action(player_name, self._admin_action(commands.STARTED), self.ResponseOrigin.Admin)
 
     def remove_active_player(self, player_name: str):
         if not self._is_player_active(player_name):
             return
         self._active_players.remove(player_name)
+        if self._inactivity_tracker is not None:
+            self._inactivity_tracker.remove(player_name)
+        if self._action_recorder is not None:
+            self._action_recorder.record_presence(ActionRecorder.PART, [player_name])
         if not self._any_player_active():
-            logger.info(f"All players became inactive. Stopping timers.")
+            logger.info("All players became inactive. Stopping timers.")
             self._stop_timers()
 
     def _is_player_active(self, player_name: str) -> bool:
@@ -165,9 +419,41 @@ class Controller(GameInterface):
 
     def _start_timers(self):
         self._start_event_timer()
+        self._start_inactivity_sweep_timer()
 
     def _stop_timers(self):
         self._cancel_timer(self._event_timer)
+        self._cancel_timer(self._inactivity_sweep_timer)
+
+    def _start_inactivity_sweep_timer(self):
+        if self._inactivity_tracker is None:
+            return
+        self._cancel_timer(self._inactivity_sweep_timer)
+        self._inactivity_sweep_timer = self._create_timer(
+            'Inactivity sweep',
+            self._inactivity_tracker.sweep_interval,
+            self._handle_inactivity_sweep_timer_expiry)
+
+    def _handle_inactivity_sweep_timer_expiry(self):
+        self._inactivity_sweep_timer = None
+        self._start_inactivity_sweep_timer()
+        self._expire_inactive_players()
+
+    def _expire_inactive_players(self):
+        expired_players = self._inactivity_tracker.pop_expired(time.monotonic())
+        if len(expired_players) == 0:
+            logger.debug("No inactive players. Active players: %d.", self.active_players_count)
+            return
+        self._active_players.difference_update(expired_players)
+        self._expired_players_count += len(expired_players)
+        if self._action_recorder is not None:
+            self._action_recorder.record_presence(ActionRecorder.EXPIRE, expired_players)
+        logger.info(
+            "Expired %d inactive player(s) after %ss. Active players: %d.",
+            len(expired_players), self._inactivity_tracker.timeout, self.active_players_count)
+        if not self._any_player_active():
+            logger.info("All players became inactive. Stopping timers.")
+            self._stop_timers()
 
     def _start_event_timer(self):
         self._cancel_timer(self._event_timer)
@@ -178,21 +464,31 @@ class Controller(GameInterface):
 
     def _handle_event_timer_expiry(self):
         self._event_timer = None
-        logger.info(f"Event timer expired")
+        logger.info("Event timer expired")
         self._start_event_timer()
         if not self._any_player_active():
-            logger.info(f"No players active. Ignoring event timer expiry.")
+            logger.info("No players active. Ignoring event timer expiry.")
+            EVENT_TICKS.labels(self._metrics_channel, 'no_players').inc()
             return
         try:
             player_name = self._select_player_for_event()
         except self.NoPlayerForEvent:
-            logger.info(f"No eligible players for event.")
+            logger.info("No eligible players for event.")
+            EVENT_TICKS.labels(self._metrics_channel, 'no_eligible_players').inc()
             return
+        EVENT_TICKS.labels(self._metrics_channel, 'event').inc()
+        self.run_event(player_name)
+
+    def run_event(self, player_name: str) -> (str, list[str]):
         event_command = commands.GENERATE_EVENT if self._is_game_started(player_name) else commands.STARTED
-        self._handle_action(player_name, self._admin_action(event_command))
+        responses = self._handle_action(player_name, self._admin_action(event_command), self.ResponseOrigin.Event)
+        if self._action_recorder is not None:
+            self._action_recorder.record_action(ActionRecorder.EVENT, player_name, event_command, (), responses)
+        return event_command, responses
 
     def _select_player_for_event(self) -> str:
         eligible_players = self._event_eligible_players()
+        self._event_eligible_players_gauge.set(len(eligible_players))
         if len(eligible_players) == 0:
             raise self.NoPlayerForEvent()
         players_weights = [self._player_event_weight(player_name) for player_name in eligible_players]
@@ -208,9 +504,11 @@ class Controller(GameInterface):
         return self._player_state_machine(player_name).is_waiting_for_event()
 
     def _player_event_weight(self, player_name: str) -> int:
+        player_selection_weights = self._game_config.player_selection_weights
+        if not self._has_player_state_machine(player_name):
+            return player_selection_weights.with_penalty
         self._update_event_selection_penalty(player_name)
         state_machine = self._player_state_machine(player_name)
-        player_selection_weights = self._game_config.player_selection_weights
         if not state_machine.has_event_selection_penalty():
             return player_selection_weights.with_penalty
         else:
@@ -227,13 +525,13 @@ class Controller(GameInterface):
         return asyncio.create_task(self._timer(name, interval, callback))
 
     async def _timer(self, name, interval, callback):
-        logger.debug(f"'{name}' timer started ({interval}s).")
+        logger.debug("'%s' timer started (%ss).", name, interval)
         try:
             await asyncio.sleep(interval)
-            logger.debug(f"'{name}' timer expired.")
+            logger.debug("'%s' timer expired.", name)
             callback()
         except asyncio.CancelledError:
-            logger.debug(f"'{name}' timer cancelled.")
+            logger.debug("'%s' timer cancelled.", name)
 
     def _cancel_timer(self, timer: asyncio.Task):
         if timer is not None and not timer.done():
@@ -1,7 +1,25 @@
 import enum
+from game.genus import Genus
+from game.statuses import Statuses
 from game.unit import Unit
 
 
+def _combat_advantage_table(strong_against_advantage: int, weak_against_advantage: int) -> tuple:
+    def combat_advantage(attacker_genus: Genus, defender_genus: Genus) -> int:
+        if attacker_genus.is_strong_against(defender_genus):
+            return strong_against_advantage
+        elif attacker_genus.is_weak_against(defender_genus):
+            return weak_against_advantage
+        else:
+            return 0
+
+    table = [[0] * len(Genus) for _ in Genus]
+    for attacker_genus in Genus:
+        for defender_genus in Genus:
+            table[attacker_genus.value][defender_genus.value] = combat_advantage(attacker_genus, defender_genus)
+    return tuple(tuple(row) for row in table)
+
+
 class DamageCalculator:
     class DamageRoll(enum.Enum):
         Low = 0
@@ -21,14 +39,87 @@ class DamageCalculator:
             else:
                 return DamageCalculator.RelativeHeight.Same
 
+    DAMAGE_ROLLS = (DamageRoll.Low, DamageRoll.Normal, DamageRoll.High)
+    DAMAGE_ROLLS_WEIGHTS = (1, 2, 1)
+    PHYSICAL_COMBAT_ADVANTAGE = _combat_advantage_table(strong_against_advantage=1, weak_against_advantage=-2)
+    SPELL_COMBAT_ADVANTAGE = _combat_advantage_table(strong_against_advantage=1, weak_against_advantage=-1)
+
     def __init__(self, attacker: Unit, defender: Unit):
         self._attacker = attacker
         self._defender = defender
 
+    def hit_chance(self) -> float:
+        luck = self._attacker.luck
+        if luck <= 0:
+            return 0.0
+        hit_chance = (luck - 1) / luck
+        if self._attacker.has_status(Statuses.Blind):
+            hit_chance /= 2
+        return hit_chance
+
+    def critical_hit_chance(self) -> float:
+        divider = 2 if self._attacker.is_atrocious else 64
+        return (self._attacker.luck // divider + 1) / 128
+
+    def relative_height(self) -> RelativeHeight:
+        relative_height = self._unit_height(self._attacker) - self._unit_height(self._defender)
+        if relative_height > 0:
+            return self.RelativeHeight.Higher
+        elif relative_height < 0:
+            return self.RelativeHeight.Lower
+        else:
+            return self.RelativeHeight.Same
+
+    @classmethod
+    def _unit_height(cls, unit: Unit) -> int:
+        unit_height = 0
+        if unit.has_status(Statuses.Crack):
+            unit_height -= 1
+        if unit.has_status(Statuses.Upheavel):
+            unit_height += 1
+        return unit_height
+
     def physical_damage(self, damage_roll: DamageRoll, relative_height: RelativeHeight, is_critical: bool) -> int:
-        base_damage = 2 * self._attacker.attack + damage_roll.value
-        combat_advantage = self._physical_combat_advantage(relative_height)
-        damage_dealt = base_damage + (base_damage * combat_advantage / 8) - self._base_defense()
+        return self._physical_damage(
+            2 * self._attacker.attack,
+            self._base_defense(),
+            self._physical_elemental_combat_advantage(),
+            damage_roll,
+            relative_height,
+            is_critical)
+
+    def physical_damage_outcomes(
+            self,
+            damage_rolls: tuple=tuple(DamageRoll),
+            relative_heights: tuple=tuple(RelativeHeight),
+            criticals: tuple=(False, True)) -> dict:
+        doubled_attack = 2 * self._attacker.attack
+        defense = self._base_defense()
+        elemental_combat_advantage = self._physical_elemental_combat_advantage()
+        return {
+            (damage_roll, relative_height, is_critical): self._physical_damage(
+                doubled_attack,
+                defense,
+                elemental_combat_advantage,
+                damage_roll,
+                relative_height,
+                is_critical)
+            for damage_roll in damage_rolls
+            for relative_height in relative_heights
+            for is_critical in criticals
+        }
+
+    def _physical_damage(
+            self,
+            doubled_attack: int,
+            defense: int,
+            elemental_combat_advantage: int,
+            damage_roll: DamageRoll,
+            relative_height: RelativeHeight,
+            is_critical: bool) -> int:
+        base_damage = doubled_attack + damage_roll.value
+        combat_advantage = elemental_combat_advantage + relative_height.value
+        damage_dealt = base_damage + (base_damage * combat_advantage / 8) - defense
         damage_dealt = int(damage_dealt / 2 * self._critical_hit_multiplier(is_critical))
         return max(damage_dealt, 1)
 
@@ -41,16 +132,8 @@ class DamageCalculator:
     def _base_defense(self):
         return self._defender.defense
 
-    def _physical_combat_advantage(self, relative_height: RelativeHeight):
-        return self._physical_elemental_combat_advantage() + relative_height.value
-
     def _physical_elemental_combat_advantage(self):
-        if self._attacker.genus.is_strong_against(self._defender.genus):
-            return 1
-        elif self._attacker.genus.is_weak_against(self._defender.genus):
-            return -2
-        else:
-            return 0
+        return self.PHYSICAL_COMBAT_ADVANTAGE[self._attacker.genus.value][self._defender.genus.value]
 
     def _spell_combat_damage(self, base_damage):
         combat_advantage = self._spell_combat_advantage()
@@ -60,12 +143,7 @@ class DamageCalculator:
         return combat_damage
 
     def _spell_combat_advantage(self):
-        if self._attacker.genus.is_strong_against(self._defender.genus):
-            return 1
-        elif self._attacker.genus.is_weak_against(self._defender.genus):
-            return -1
-        else:
-            return 0
+        return self.SPELL_COMBAT_ADVANTAGE[self._attacker.genus.value][self._defender.genus.value]
 
     def _critical_hit_multiplier(self, is_critical: bool) -> float:
         return 1.5 if is_critical else 1.0
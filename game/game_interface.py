@@ -1,14 +1,22 @@
+import enum
+from enum import auto
 from typing import Callable
 
 
 class GameInterface:
-    def set_response_event_handler(self, handler: Callable[[str], bool]):
+    class ResponseOrigin(enum.Enum):
+        User = auto()
+        Admin = auto()
+        Event = auto()
+        Narration = auto()
+
+    def set_response_event_handler(self, handler: Callable[[str, 'GameInterface.ResponseOrigin'], None]):
         raise NotImplementedError(f"{self.__class__.__name__}.{self.set_response_event_handler}")
 
-    def handle_user_action(self, player_name: str, command: str, args: str):
+    def handle_user_action(self, player_name: str, command: str, args: str) -> list[str]:
         raise NotImplementedError(f"{self.__class__.__name__}.{self.handle_user_action}")
 
-    def handle_admin_action(self, player_name: str, command: str, args: str):
+    def handle_admin_action(self, player_name: str, command: str, args: str) -> list[str]:
         raise NotImplementedError(f"{self.__class__.__name__}.{self.handle_admin_action}")
 
     def add_active_player(self, player_name: str):
@@ -0,0 +1,61 @@
+import math
+
+
+class InactivityTracker:
+    BUCKETS_PER_TIMEOUT = 10
+
+    def __init__(self, timeout: float):
+        self._timeout = timeout
+        self._bucket_width = timeout / self.BUCKETS_PER_TIMEOUT
+        self._buckets: dict[int, set[str]] = {}
+        self._names_buckets: dict[str, int] = {}
+        self._oldest_bucket_index = None
+
+    @property
+    def timeout(self) -> float:
+        return self._timeout
+
+    @property
+    def sweep_interval(self) -> float:
+        return self._bucket_width
+
+    def __len__(self) -> int:
+        return len(self._names_buckets)
+
+    def _bucket_index(self, time: float) -> int:
+        return math.floor(time / self._bucket_width)
+
+    def touch(self, name: str, now: float):
+        bucket_index = self._bucket_index(now)
+        previous_bucket_index = self._names_buckets.get(name)
+        if previous_bucket_index == bucket_index:
+            return
+        if previous_bucket_index is not None:
+            self._buckets[previous_bucket_index].discard(name)
+        self._names_buckets[name] = bucket_index
+        self._buckets.setdefault(bucket_index, set()).add(name)
+        if self._oldest_bucket_index is None:
+            self._oldest_bucket_index = bucket_index
+
+    def remove(self, name: str):
+        bucket_index = self._names_buckets.pop(name, None)
+        if bucket_index is not None:
+            self._buckets[bucket_index].discard(name)
+
+    def pop_expired(self, now: float) -> list[str]:
+        # Whole buckets are expired at once, so a name lives between timeout and timeout + one bucket width.
+        expired_names = []
+        if self._oldest_bucket_index is None:
+            return expired_names
+        last_expired_bucket_index = self._bucket_index(now - self._timeout) - 1
+        while self._oldest_bucket_index <= last_expired_bucket_index:
+            bucket = self._buckets.pop(self._oldest_bucket_index, None)
+            if bucket is not None:
+                for name in bucket:
+                    del self._names_buckets[name]
+                expired_names.extend(bucket)
+            self._oldest_bucket_index += 1
+        if len(self._names_buckets) == 0:
+            self._buckets.clear()
+            self._oldest_bucket_index = None
+        return expired_names
@@ -0,0 +1,132 @@
+import bisect
+import enum
+from typing import Callable
+from game.player_records import PlayerRecords
+
+
+class Leaderboard:
+    # Entries are kept sorted as (sort key, player name), so the top k is a slice and a player's rank a bisection.
+    def __init__(self, is_descending: bool):
+        self._is_descending = is_descending
+        self._entries: list[tuple[int, str]] = []
+        self._players_keys: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _sort_key(self, value: int) -> int:
+        return -value if self._is_descending else value
+
+    def _value(self, sort_key: int) -> int:
+        return -sort_key if self._is_descending else sort_key
+
+    def update(self, player_name: str, value: int):
+        previous_sort_key = self._players_keys.pop(player_name, None)
+        if previous_sort_key is not None:
+            del self._entries[bisect.bisect_left(self._entries, (previous_sort_key, player_name))]
+        if value is None:
+            return
+        sort_key = self._sort_key(value)
+        self._players_keys[player_name] = sort_key
+        bisect.insort(self._entries, (sort_key, player_name))
+
+    def remove(self, player_name: str):
+        self.update(player_name, None)
+
+    def reset(self, players_values: dict[str, int]):
+        # One sort instead of an insertion per player, which is quadratic for a big population.
+        self._players_keys = {
+            player_name: self._sort_key(value) for player_name, value in players_values.items() if value is not None}
+        self._entries = sorted((sort_key, player_name) for player_name, sort_key in self._players_keys.items())
+
+    def top(self, count: int) -> list[tuple[str, int]]:
+        return [(player_name, self._value(sort_key)) for sort_key, player_name in self._entries[:count]]
+
+    def rank(self, player_name: str) -> tuple[int, int]:
+        sort_key = self._players_keys.get(player_name)
+        if sort_key is None:
+            return None
+        # Players sharing the value share the rank.
+        return bisect.bisect_left(self._entries, (sort_key,)) + 1, self._value(sort_key)
+
+
+class Leaderboards:
+    class Board(enum.Enum):
+        Floor = 'floor'
+        Level = 'level'
+        Clear = 'clear'
+        Wins = 'wins'
+
+    class UnknownBoard(Exception):
+        pass
+
+    BOARDS_RECORDS: dict['Leaderboards.Board', Callable[[PlayerRecords], int]] = {
+        Board.Floor: lambda records: records.highest_floor or None,
+        Board.Level: lambda records: records.highest_familiar_level or None,
+        Board.Clear: lambda records: records.fastest_clear_events_count,
+        Board.Wins: lambda records: records.wins_count or None
+    }
+    BOARDS_DESCENDING = {Board.Floor: True, Board.Level: True, Board.Clear: False, Board.Wins: True}
+    BOARDS_TITLES = {
+        Board.Floor: 'Highest floor',
+        Board.Level: 'Highest familiar level',
+        Board.Clear: 'Fastest tower clear',
+        Board.Wins: 'Most battles won'
+    }
+    BOARDS_VALUES_FORMATS = {
+        Board.Floor: '{}F',
+        Board.Level: 'LVL {}',
+        Board.Clear: '{} event(s)',
+        Board.Wins: '{} win(s)'
+    }
+
+    def __init__(self):
+        self._boards = {board: Leaderboard(self.BOARDS_DESCENDING[board]) for board in self.Board}
+        self._players_values: dict[str, tuple] = {}
+
+    @classmethod
+    def parse_board(cls, board_name: str) -> 'Leaderboards.Board':
+        try:
+            return cls.Board(board_name.lower())
+        except ValueError:
+            raise cls.UnknownBoard(
+                f"Unknown leaderboard '{board_name}', use {', '.join(board.value for board in cls.Board)}.")
+
+    @classmethod
+    def format_value(cls, board: 'Leaderboards.Board', value: int) -> str:
+        return cls.BOARDS_VALUES_FORMATS[board].format(value)
+
+    def reset(self, players_records: dict[str, PlayerRecords]):
+        self._players_values = {
+            player_name: self._records_values(records) for player_name, records in players_records.items()}
+        for index, board in enumerate(self.BOARDS_RECORDS):
+            self._boards[board].reset(
+                {player_name: values[index] for player_name, values in self._players_values.items()})
+
+    def _records_values(self, records: PlayerRecords) -> tuple:
+        return tuple(record(records) for record in self.BOARDS_RECORDS.values())
+
+    def update(self, player_name: str, records: PlayerRecords):
+        # Called after every action, so the unchanged case is one tuple comparison.
+        values = self._records_values(records)
+        previous_values = self._players_values.get(player_name)
+        if values == previous_values:
+            return
+        self._players_values[player_name] = values
+        for index, board in enumerate(self.BOARDS_RECORDS):
+            if previous_values is None or values[index] != previous_values[index]:
+                self._boards[board].update(player_name, values[index])
+
+    def remove(self, player_name: str):
+        if self._players_values.pop(player_name, None) is not None:
+            for leaderboard in self._boards.values():
+                leaderboard.remove(player_name)
+
+    def top(self, board: 'Leaderboards.Board', count: int) -> list[tuple[str, int]]:
+        return self._boards[board].top(count)
+
+    def rank(self, board: 'Leaderboards.Board', player_name: str) -> tuple[int, int]:
+        return self._boards[board].rank(player_name)
+
+    def size(self, board: 'Leaderboards.Board') -> int:
+        return len(self._boards[board])
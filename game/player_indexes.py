@@ -0,0 +1,66 @@
+from game.player_selector import PlayerSelector
+from game.state_machine import StateMachine
+
+
+class PlayerIndexes:
+    # Players are indexed by what selectors ask about, so a selection costs the size of its smallest indexed set.
+    def __init__(self):
+        self._flags: dict[str, set[str]] = {flag: set() for flag in PlayerSelector.FLAGS}
+        self._states: dict[str, set[str]] = {}
+        self._floors: dict[int, set[str]] = {}
+        self._players_keys: dict[str, tuple] = {}
+
+    def __len__(self) -> int:
+        return len(self._players_keys)
+
+    @staticmethod
+    def _key(state_machine: StateMachine) -> tuple:
+        return state_machine.state_name, state_machine.floor, PlayerSelector.state_machine_flags(state_machine)
+
+    def update(self, player_name: str, state_machine: StateMachine):
+        # Called after every action, so the unchanged case is one tuple comparison.
+        key = self._key(state_machine)
+        previous_key = self._players_keys.get(player_name)
+        if key == previous_key:
+            return
+        self._players_keys[player_name] = key
+        state_name, floor, flags = key
+        if previous_key is None:
+            previous_state_name, previous_floor, previous_flags = None, None, (False,) * len(flags)
+        else:
+            previous_state_name, previous_floor, previous_flags = previous_key
+        if state_name != previous_state_name:
+            self._move(self._states, previous_state_name, state_name, player_name)
+        if floor != previous_floor:
+            self._move(self._floors, previous_floor, floor, player_name)
+        for flag, is_set, was_set in zip(PlayerSelector.FLAGS, flags, previous_flags):
+            if is_set and not was_set:
+                self._flags[flag].add(player_name)
+            elif was_set and not is_set:
+                self._flags[flag].discard(player_name)
+
+    @staticmethod
+    def _move(index: dict, previous_value, value, player_name: str):
+        if previous_value is not None:
+            players = index[previous_value]
+            players.discard(player_name)
+            if len(players) == 0:
+                del index[previous_value]
+        index.setdefault(value, set()).add(player_name)
+
+    def select(self, selector: PlayerSelector) -> set[str]:
+        candidates_sets = [self._flags[flag] for flag in selector.flags]
+        candidates_sets.extend(self._states.get(state_name, set()) for state_name in selector.states_names)
+        for compare, floor in selector.floors_conditions:
+            # Floors are few, so matching ones are found by checking each and merged into one set.
+            candidates_sets.append(set().union(*(
+                players for indexed_floor, players in self._floors.items() if compare(indexed_floor, floor))))
+        if len(candidates_sets) == 0:
+            return set(self._players_keys)
+        candidates_sets.sort(key=len)
+        selected = set(candidates_sets[0])
+        for candidates in candidates_sets[1:]:
+            if len(selected) == 0:
+                break
+            selected.intersection_update(candidates)
+        return selected
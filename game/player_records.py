@@ -0,0 +1,41 @@
+class PlayerRecords:
+    # Best results over all games of the player, kept in the player's state and indexed by leaderboards.
+    def __init__(self):
+        self._highest_floor = 0
+        self._highest_familiar_level = 0
+        self._fastest_clear_events_count: int = None
+        self._wins_count = 0
+        self._game_events_count = 0
+
+    @property
+    def highest_floor(self) -> int:
+        return self._highest_floor
+
+    @property
+    def highest_familiar_level(self) -> int:
+        return self._highest_familiar_level
+
+    @property
+    def fastest_clear_events_count(self) -> int:
+        return self._fastest_clear_events_count
+
+    @property
+    def wins_count(self) -> int:
+        return self._wins_count
+
+    def update_progress(self, floor: int, familiar_level: int):
+        self._highest_floor = max(self._highest_floor, floor)
+        self._highest_familiar_level = max(self._highest_familiar_level, familiar_level)
+
+    def start_game(self):
+        self._game_events_count = 0
+
+    def count_event(self):
+        self._game_events_count += 1
+
+    def count_win(self):
+        self._wins_count += 1
+
+    def count_clear(self):
+        if self._fastest_clear_events_count is None or self._game_events_count < self._fastest_clear_events_count:
+            self._fastest_clear_events_count = self._game_events_count
@@ -0,0 +1,94 @@
+import operator
+import re
+from typing import Callable
+from game.state_machine import StateMachine
+
+
+class PlayerSelector:
+    class InvalidSelector(Exception):
+        pass
+
+    ALL = 'all'
+    ACTIVE = 'active'
+    STARTED = 'started'
+    IN_BATTLE = 'in_battle'
+    WAITING_FOR_USER = 'waiting'
+    FULL_INVENTORY = 'full_inventory'
+    FLAGS = (STARTED, IN_BATTLE, WAITING_FOR_USER, FULL_INVENTORY)
+    FLOOR_REGEX = re.compile(r'floor(?P<operator>>=|<=|==|=|>|<)(?P<floor>\d+)')
+    FLOOR_OPERATORS = {
+        '>=': operator.ge,
+        '<=': operator.le,
+        '==': operator.eq,
+        '=': operator.eq,
+        '>': operator.gt,
+        '<': operator.lt
+    }
+    STATE_PREFIX = 'state='
+    STATES_NAMES = frozenset(state.__name__ for state in StateMachine.TRANSITIONS)
+
+    def __init__(self, selector: str):
+        self._selector = selector
+        self._active_only = False
+        # Criteria are kept apart by kind, so they can be answered from the controller's players indexes.
+        self._flags: list[str] = []
+        self._floors_conditions: list[tuple[Callable[[int, int], bool], int]] = []
+        self._states_names: list[str] = []
+        for criterion in selector.split(','):
+            self._add_criterion(criterion.strip())
+
+    def _add_criterion(self, criterion: str):
+        if criterion == self.ALL:
+            return
+        elif criterion == self.ACTIVE:
+            self._active_only = True
+        elif criterion in self.FLAGS:
+            self._flags.append(criterion)
+        elif criterion.startswith(self.STATE_PREFIX):
+            self._states_names.append(self._parse_state_name(criterion[len(self.STATE_PREFIX):]))
+        else:
+            floor_match = self.FLOOR_REGEX.fullmatch(criterion)
+            if floor_match is None:
+                raise self.InvalidSelector(
+                    f"Unknown selector '{criterion}'. Expected {self.ALL}, {self.ACTIVE}, {', '.join(self.FLAGS)}, "
+                    f"{self.STATE_PREFIX}STATE or floor>=N.")
+            compare = self.FLOOR_OPERATORS[floor_match.group('operator')]
+            self._floors_conditions.append((compare, int(floor_match.group('floor'))))
+
+    def _parse_state_name(self, state_name: str) -> str:
+        # Both 'StateBattlePlayerTurn' and 'BattlePlayerTurn' name the same state.
+        for name in (state_name, f"State{state_name}"):
+            if name in self.STATES_NAMES:
+                return name
+        raise self.InvalidSelector(f"Unknown state '{state_name}'.")
+
+    def __str__(self) -> str:
+        return self._selector
+
+    @property
+    def active_only(self) -> bool:
+        return self._active_only
+
+    @property
+    def flags(self) -> list[str]:
+        return self._flags
+
+    @property
+    def floors_conditions(self) -> list[tuple[Callable[[int, int], bool], int]]:
+        return self._floors_conditions
+
+    @property
+    def states_names(self) -> list[str]:
+        return self._states_names
+
+    @property
+    def needs_state(self) -> bool:
+        return len(self._flags) > 0 or len(self._floors_conditions) > 0 or len(self._states_names) > 0
+
+    @classmethod
+    def state_machine_flags(cls, state_machine: StateMachine) -> tuple[bool, ...]:
+        return (
+            state_machine.is_started(),
+            state_machine.is_in_battle(),
+            state_machine.is_waiting_for_user_action(),
+            state_machine.has_full_inventory())
@@ -41,7 +41,7 @@ class StateBase:
         return self._context.inventory
 
     def on_enter(self):
-        logger.debug(f"{self}.on_enter()")
+        logger.debug("%s.on_enter()", self)
 
     def is_waiting_for_user_action(self) -> bool:
         return False
@@ -6,7 +6,6 @@ from game.state_with_inventory_item import StateWithInventoryItem
 from game.stats_calculator import StatsCalculator
 from game.state_machine_context import BattleContext
 from game.statuses import Statuses
-from game.talents import Talents
 from game.unit import Unit
 from game.unit_creator import UnitCreator
 
@@ -63,6 +62,8 @@ class StateStartBattle(StateBattleBase):
         self._context.add_response(f"You encountered LVL {enemy.level} {enemy.name} ({enemy.hp} HP).")
         self._context.add_response(f"{enemy.to_string()}.")
         self._context.start_battle(self._enemy)
+        if self._context.is_auto_battle_enabled:
+            self._battle_context.start_auto_battle(self._context.familiar)
         self._battle_context.start_prepare_phase(counter=3)
         self._context.generate_action(commands.BATTLE_PREPARE_PHASE, (True,))
 
@@ -77,7 +78,9 @@ class StateBattlePreparePhase(StateBattleBase):
         self._prepare_phase_turn_used = prepare_phase_turn_used
 
     def on_enter(self):
-        if self._context.familiar.has_status(Statuses.Sleep):
+        if self._battle_context.is_auto_battle():
+            self._battle_context.finish_prepare_phase()
+        elif self._context.familiar.has_status(Statuses.Sleep):
             self._context.add_response(
                 "You are very sleepy and before you even noticed enemy approached you. Time to battle!")
             self._battle_context.finish_prepare_phase()
@@ -107,6 +110,8 @@ class StateBattleApproach(StateBattleBase):
 
 
 class StateBattlePhaseBase(StateBattleBase):
+    MAX_AUTO_BATTLE_TURNS = 100
+
     def _is_enemy_dead(self) -> bool:
         return self._battle_context.enemy.is_dead()
 
@@ -116,18 +121,43 @@ class StateBattlePhaseBase(StateBattleBase):
     def _is_battle_finished(self) -> bool:
         return self._battle_context.is_finished() or self._is_enemy_dead() or self._is_familiar_dead()
 
+    def _add_turn_response(self, response: str):
+        # Auto battles report one summary instead of every turn.
+        if not self._battle_context.is_auto_battle():
+            self._context.add_response(response)
+
+    def _auto_battle_command(self) -> str:
+        self._battle_context.inc_auto_battle_turns_count()
+        familiar = self._context.familiar
+        if familiar.has_spell() and familiar.has_enough_mp_for_spell():
+            battle_preview = self._context.battle_preview()
+            spell_damage = battle_preview.familiar_spell_damage
+            # Spell never misses, so it is cast when it finishes the enemy or outdoes an average attack.
+            if spell_damage >= self._battle_context.enemy.hp or \
+                    spell_damage > battle_preview.familiar_attack.mean_damage:
+                return commands.USE_SPELL
+        return commands.ATTACK
+
+    def _finish_auto_battle(self):
+        familiar_start_hp, enemy_start_hp = self._battle_context.stop_auto_battle()
+        dealt_damage = enemy_start_hp - self._battle_context.enemy.hp
+        taken_damage = familiar_start_hp - self._context.familiar.hp
+        self._context.add_response(
+            f"Auto battle: {self._battle_context.auto_battle_turns_count} turn(s), "
+            f"you dealt {dealt_damage} damage and took {taken_damage}.")
+
     def _perform_physical_attack(self, attacker: Unit, defender: Unit):
-        if not self._is_physical_attack_accurate(attacker):
+        damage_calculator = DamageCalculator(attacker, defender)
+        if not self._is_physical_attack_accurate(attacker, damage_calculator):
             return self._physical_attack_miss_response(attacker, defender)
         else:
-            damage_calculator = DamageCalculator(attacker, defender)
-            relative_height = self._select_relative_height(attacker, defender)
-            is_critical = self._select_whether_attack_is_critical(attacker)
+            relative_height = damage_calculator.relative_height()
+            is_critical = self._select_whether_attack_is_critical(damage_calculator)
             damage = damage_calculator.physical_damage(self._select_damage_roll(), relative_height, is_critical)
             defender.deal_damage(damage)
             physical_attack_descriptor = damage, relative_height, is_critical
             response = self._physical_attack_hit_response(attacker, defender, physical_attack_descriptor)
-            if defender.talents.has(Talents.ElectricShock):
+            if defender.has_electric_shock:
                 shock_damage = max(damage // 4, 1)
                 attacker.deal_damage(shock_damage)
                 response += ' ' + self._shock_damage_response(attacker, defender, shock_damage)
@@ -139,41 +169,19 @@ class StateBattlePhaseBase(StateBattleBase):
         attacker.use_mp(attacker.spell.traits.mp_cost)
         return self._spell_attack_response(attacker, defender, damage)
 
-    def _is_physical_attack_accurate(self, attacker: Unit):
+    def _is_physical_attack_accurate(self, attacker: Unit, damage_calculator: DamageCalculator):
         if attacker.luck <= 0:
             return False
         else:
-            hit_chance = (attacker.luck - 1) / attacker.luck
-            if attacker.has_status(Statuses.Blind):
-                hit_chance /= 2
-            return self._context.does_action_succeed(success_chance=hit_chance)
+            return self._context.does_action_succeed(success_chance=damage_calculator.hit_chance())
 
     def _select_damage_roll(self) -> DamageRoll:
-        return self._context.rng.choices([DamageRoll.Low, DamageRoll.Normal, DamageRoll.High], weights=[1, 2, 1])[0]
-
-    def _select_relative_height(self, attacker: Unit, defender: Unit) -> RelativeHeight:
-        def unit_height(unit: Unit):
-            unit_height = 0
-            if unit.has_status(Statuses.Crack):
-                unit_height -= 1
-            if unit.has_status(Statuses.Upheavel):
-                unit_height += 1
-            return unit_height
-
-        attacker_height = unit_height(attacker)
-        defender_height = unit_height(defender)
-        relative_height = attacker_height - defender_height
-        if relative_height > 0:
-            return RelativeHeight.Higher
-        elif relative_height < 0:
-            return RelativeHeight.Lower
-        else:
-            return RelativeHeight.Same
+        return self._context.rng.choices(
+            DamageCalculator.DAMAGE_ROLLS,
+            weights=DamageCalculator.DAMAGE_ROLLS_WEIGHTS)[0]
 
-    def _select_whether_attack_is_critical(self, attacker: Unit) -> bool:
-        divider = 2 if attacker.talents.has(Talents.Atrocious) else 64
-        crit_chance = (attacker.luck // divider + 1) / 128
-        return self._context.does_action_succeed(success_chance=crit_chance)
+    def _select_whether_attack_is_critical(self, damage_calculator: DamageCalculator) -> bool:
+        return self._context.does_action_succeed(success_chance=damage_calculator.critical_hit_chance())
 
     def _physical_attack_miss_response(self, attacker: Unit, defender: Unit):
         def is_familiar_attack() -> bool:
@@ -250,6 +258,8 @@ class StateBattlePhaseBase(StateBattleBase):
 class StateBattlePhase(StateBattlePhaseBase):
     def on_enter(self):
         if self._is_battle_finished():
+            if self._battle_context.is_auto_battle():
+                self._finish_auto_battle()
             self._clear_statuses()
             if self._is_enemy_dead():
                 self._handle_enemy_defeated()
@@ -275,6 +285,7 @@ class StateBattlePhase(StateBattlePhaseBase):
 
     def _handle_enemy_defeated(self):
         enemy = self._battle_context.enemy
+        self._context.records.count_win()
         response = f'You defeated {enemy.name}'
         familiar = self._context.familiar
         if not familiar.is_max_level():
@@ -304,7 +315,7 @@ class StateBattlePhase(StateBattlePhaseBase):
         else:
             attacker = self._battle_context.enemy
             defender = self._context.familiar
-        if attacker.talents.has(Talents.Quick) and not defender.talents.has(Talents.Quick):
+        if attacker.is_quick and not defender.is_quick:
             max_turn_counter = 2
         else:
             max_turn_counter = 1
@@ -324,29 +335,81 @@ class StateBattlePhase(StateBattlePhaseBase):
         if self._battle_context.is_player_turn:
             self._battle_context.dec_holy_scroll_counter()
         if not self._battle_context.is_holy_scroll_active():
-            self._context.add_response("Holy scroll's beams dissipate.")
+            self._add_turn_response("Holy scroll's beams dissipate.")
 
 
 class StateBattlePlayerTurn(StateBattlePhaseBase):
     def on_enter(self):
+        if self._battle_context.is_auto_battle():
+            if self._battle_context.auto_battle_turns_count < self.MAX_AUTO_BATTLE_TURNS:
+                self._context.generate_action(self._auto_battle_command())
+                return
+            self._finish_auto_battle()
+            self._context.add_response("Auto battle stopped, the fight takes too long.")
         self._context.add_response(f"Your turn.")
 
     def is_waiting_for_user_action(self) -> bool:
         return True
 
 
+class StateBattleAuto(StateBattlePhaseBase):
+    def on_enter(self):
+        self._battle_context.start_auto_battle(self._context.familiar)
+        if self._battle_context.is_prepare_phase():
+            self._battle_context.finish_prepare_phase()
+            self._context.generate_action(commands.BATTLE_PREPARE_PHASE_FINISHED)
+        else:
+            self._context.generate_action(self._auto_battle_command())
+
+
 class StateEnemyStats(StateBattleBase):
     def on_enter(self):
         self._context.add_response(f"Enemy stats: {self._battle_context.enemy.to_string()}.")
         self._context.generate_action(commands.PLAYER_TURN)
 
 
+class StateBattleScout(StateBattleBase):
+    def on_enter(self):
+        familiar = self._context.familiar
+        enemy = self._battle_context.enemy
+        battle_preview = self._context.battle_preview()
+        familiar_attack = battle_preview.familiar_attack
+        enemy_attack = battle_preview.enemy_attack
+        self._context.add_response(
+            f"Your attack: {self._damage_range_string(familiar_attack)}, "
+            f"{self._percent_string(familiar_attack.kill_chance(enemy.hp))} to finish {enemy.name}, "
+            f"~{self._hits_string(familiar_attack.expected_hits_to_kill(enemy.hp))} attacks to win.")
+        spell_damage = battle_preview.familiar_spell_damage
+        if spell_damage is not None:
+            self._context.add_response(
+                f"Your {familiar.spell.traits.name}: {spell_damage} damage, "
+                f"{-(-enemy.hp // spell_damage)} casts to win (MP for {familiar.mp // familiar.spell_mp_cost}).")
+        self._context.add_response(
+            f"{enemy.name}'s attack: {self._damage_range_string(enemy_attack)}, "
+            f"{self._percent_string(enemy_attack.kill_chance(familiar.hp))} to finish you, "
+            f"~{self._hits_string(enemy_attack.expected_hits_to_kill(familiar.hp))} attacks to lose.")
+        self._context.generate_action(commands.PLAYER_TURN)
+
+    @classmethod
+    def _damage_range_string(cls, damage_distribution) -> str:
+        return f"{damage_distribution.min_damage}-{damage_distribution.max_damage} damage " \
+            f"(avg {damage_distribution.mean_damage:.1f}, {cls._percent_string(damage_distribution.hit_chance)} to hit)"
+
+    @classmethod
+    def _percent_string(cls, probability: float) -> str:
+        return f"{probability * 100:.0f}%"
+
+    @classmethod
+    def _hits_string(cls, hits: float) -> str:
+        return '∞' if hits == float('inf') else f"{hits:.1f}"
+
+
 class StateBattleAttack(StateBattlePhaseBase):
     def on_enter(self):
         familiar = self._context.familiar
         enemy = self._battle_context.enemy
         response = self._perform_physical_attack(attacker=familiar, defender=enemy)
-        self._context.add_response(response)
+        self._add_turn_response(response)
         self._context.generate_action(commands.BATTLE_ACTION_PERFORMED)
 
 
@@ -361,7 +424,7 @@ class StateBattleUseSpell(StateBattlePhaseBase):
             self._context.generate_action(commands.CANNOT_USE_SPELL)
         else:
             response = self._perform_spell_attack(attacker=familiar, defender=self._battle_context.enemy)
-            self._context.add_response(response)
+            self._add_turn_response(response)
             self._context.generate_action(commands.BATTLE_ACTION_PERFORMED)
 
     @classmethod
@@ -421,7 +484,7 @@ class StateBattleEnemyTurn(StateBattlePhaseBase):
     def on_enter(self):
         enemy = self._battle_context.enemy
         if self._battle_context.is_holy_scroll_active():
-            self._context.add_response(f"Field is engulfed in holy scroll's beams. {enemy.name} cannot act.")
+            self._add_turn_response(f"Field is engulfed in holy scroll's beams. {enemy.name} cannot act.")
         else:
             familiar = self._context.familiar
             enemy = self._battle_context.enemy
@@ -433,5 +496,5 @@ class StateBattleEnemyTurn(StateBattlePhaseBase):
                 response = self._perform_spell_attack(attacker=enemy, defender=familiar)
             else:
                 response = self._perform_physical_attack(attacker=enemy, defender=familiar)
-            self._context.add_response(response)
+            self._add_turn_response(response)
         self._context.generate_action(commands.BATTLE_ACTION_PERFORMED)
@@ -28,5 +28,6 @@ class StateNextFloor(StateBase):
             self._context.add_response(f"You entered {floor}F.")
             self._context.generate_action(commands.EVENT_FINISHED)
         else:
+            self._context.records.count_clear()
             self._context.add_response(f"You have conquered the Tower! Congratulations!")
             self._context.generate_action(commands.FINISH_GAME)
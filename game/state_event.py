@@ -23,6 +23,7 @@ class StateWaitForEvent(StateBase):
 
 class StateGenerateEvent(StateBase):
     def on_enter(self):
+        self._context.records.count_event()
         self._context.generate_action(commands.EVENT_GENERATED, self._select_event())
 
     def _select_event(self):
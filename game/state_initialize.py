@@ -10,6 +10,7 @@ logger = logging.getLogger(__name__)
 class StateInitialize(StateWithMonster):
     def on_enter(self):
         self._context.floor = 0
+        self._context.records.start_game()
         self._generate_familiar()
         self._set_start_inventory()
         self._context.clear_battle_context()
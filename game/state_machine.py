@@ -1,12 +1,14 @@
 import datetime
 import json
 from game import commands
+from game.config import Config
 from game.errors import InvalidOperation
 from game.items import normalize_item_name, all_items
+from game.player_records import PlayerRecords
 from game.state_base import StateBase
 from game.state_battle import StateBattleEvent, StateStartBattle, StateBattlePreparePhase, StateBattleApproach, \
-    StateBattlePhase, StateBattlePlayerTurn, StateEnemyStats, StateBattleAttack, StateBattleUseSpell, \
-    StateBattleUseItem, StateBattleTryToFlee, StateBattleEnemyTurn
+    StateBattlePhase, StateBattlePlayerTurn, StateEnemyStats, StateBattleScout, StateBattleAttack, \
+    StateBattleUseSpell, StateBattleUseItem, StateBattleTryToFlee, StateBattleEnemyTurn, StateBattleAuto
 from game.state_character import StateCharacterEvent, StateItemTrade, StateItemTradeAccepted, StateItemTradeRejected, \
     StateFamiliarTrade, StateFamiliarTradeAccepted, StateFamiliarTradeRejected, StateEvolveFamiliar
 from game.state_elevator import StateElevatorEvent, StateGoUp, StateElevatorOmitted, StateNextFloor
@@ -75,9 +77,15 @@ class StateMachine:
         StateBattlePreparePhase: {
             commands.USE_ITEM: Transition.by_user(StateBattleUseItem),
             commands.APPROACH: Transition.by_user(StateBattleApproach),
+            commands.AUTO: Transition.by_user(StateBattleAuto),
             commands.BATTLE_PREPARE_PHASE_FINISHED: Transition.by_admin(StateBattlePhase)
         },
         StateBattleApproach: {commands.BATTLE_PREPARE_PHASE_FINISHED: Transition.by_admin(StateBattlePhase)},
+        StateBattleAuto: {
+            commands.BATTLE_PREPARE_PHASE_FINISHED: Transition.by_admin(StateBattlePhase),
+            commands.ATTACK: Transition.by_admin(StateBattleAttack),
+            commands.USE_SPELL: Transition.by_admin(StateBattleUseSpell)
+        },
         StateBattlePhase: {
             commands.PLAYER_TURN: Transition.by_admin(StateBattlePlayerTurn),
             commands.ENEMY_TURN: Transition.by_admin(StateBattleEnemyTurn),
@@ -86,12 +94,15 @@ class StateMachine:
         },
         StateBattlePlayerTurn: {
             commands.ENEMY_STATS: Transition.by_user(StateEnemyStats),
+            commands.SCOUT: Transition.by_user(StateBattleScout),
             commands.ATTACK: Transition.by_user(StateBattleAttack),
             commands.USE_SPELL: Transition.by_user(StateBattleUseSpell),
             commands.USE_ITEM: Transition.by_user(StateBattleUseItem),
-            commands.FLEE: Transition.by_user(StateBattleTryToFlee)
+            commands.FLEE: Transition.by_user(StateBattleTryToFlee),
+            commands.AUTO: Transition.by_user(StateBattleAuto)
         },
         StateEnemyStats: {commands.PLAYER_TURN: Transition.by_admin(StateBattlePlayerTurn)},
+        StateBattleScout: {commands.PLAYER_TURN: Transition.by_admin(StateBattlePlayerTurn)},
         StateBattleAttack: {commands.BATTLE_ACTION_PERFORMED: Transition.by_admin(StateBattlePhase)},
         StateBattleUseSpell: {
             commands.BATTLE_ACTION_PERFORMED: Transition.by_admin(StateBattlePhase),
@@ -179,6 +190,7 @@ class StateMachine:
             commands.SHOW_INVENTORY: (False, self._handle_inventory_query),
             commands.SHOW_FLOOR: (False, self._handle_floor_query),
             commands.SHOW_STATE: (False, self._handle_state_query),
+            commands.AUTO_BATTLE: (False, self._handle_auto_battle_setting),
             commands.GIVE_ITEM: (True, self._give_item),
             commands.RESTORE_HP: (True, self._restore_hp),
             commands.RESTORE_MP: (True, self._restore_mp)
@@ -218,8 +230,12 @@ class StateMachine:
         state_machine._last_responses = state_machine_json.get('responses', [])
         state_machine._context = StateMachineContext.from_json(state_machine_json['context'], game_config)
         state_machine._state = StateBase.from_json(state_machine_json['state'], state_machine._context)
+        state_machine._update_records()
         return state_machine
 
+    def replace_game_config(self, game_config: Config) -> list[str]:
+        return self._context.replace_game_config(game_config)
+
     def is_started(self) -> bool:
         return type(self._state) is not StateStart
 
@@ -232,15 +248,50 @@ class StateMachine:
     def is_waiting_for_event(self) -> bool:
         return self._state.is_waiting_for_event()
 
+    def seed(self, seed: int):
+        self._context.rng.seed(seed)
+
+    def is_in_battle(self) -> bool:
+        return self._context.is_in_battle()
+
+    def has_full_inventory(self) -> bool:
+        return self._context.inventory.is_full()
+
+    @property
+    def state_name(self) -> str:
+        return self._state.name
+
+    @property
+    def floor(self) -> int:
+        return self._context.floor
+
+    @property
+    def familiar_level(self) -> int:
+        familiar = self._context.familiar
+        return familiar.level if familiar is not None else 0
+
+    @property
+    def records(self) -> PlayerRecords:
+        return self._context.records
+
     def on_action(self, action):
         try:
             if not self._handle_generic_action(action):
                 self._handle_non_generic_action(action)
                 self._last_responses = self._context.peek_responses()
+                # Only state transitions move the player up or level the familiar, queries are not slowed down.
+                self._update_records()
         except InvalidOperation as exc:
             self._context.add_response(str(exc))
         return self._context.take_responses()
 
+    def _update_records(self):
+        familiar = self._context.familiar
+        if familiar is not None:
+            # Floor past the highest one is only entered by conquering the tower.
+            floor = min(self._context.floor + 1, self._context.game_config.highest_floor)
+            self._context.records.update_progress(floor, familiar.level)
+
     def _handle_generic_action(self, action: StateMachineAction) -> bool:
         for command, (is_admin_command, handler) in self._generic_actions_handlers.items():
             if command == action.command:
@@ -308,6 +359,15 @@ class StateMachine:
             for response in self._last_responses:
                 self._context.add_response(response)
 
+    def _handle_auto_battle_setting(self, action):
+        if len(action.args) > 0:
+            if action.args[0] not in ('on', 'off'):
+                self._context.add_response(f"Use '{commands.AUTO_BATTLE} on' or '{commands.AUTO_BATTLE} off'.")
+                return
+            self._context.set_auto_battle_enabled(action.args[0] == 'on')
+        setting = 'on' if self._context.is_auto_battle_enabled else 'off'
+        self._context.add_response(f"Auto battle is {setting}, it applies from your next battle.")
+
     def _give_item(self, action):
         if not self._has_entered_tower():
             logger.warning(f"{self.player_name} has not entered tower yet.")
@@ -349,31 +409,32 @@ class StateMachine:
         return self.is_started() and type(self._state) is not StateInitialize
 
     def _handle_non_generic_action(self, action):
-        state_transition_table = self._current_state_transition_table()
-        if state_transition_table is None:
-            self._on_unknown_state()
-            return
-        transition = state_transition_table.get(action.command)
-        if transition is None:
-            self._on_unexpected_action(action)
-        else:
+        # Generated actions are handled in a loop, as an auto battle chains hundreds of them.
+        while action is not None:
+            state_transition_table = self._current_state_transition_table()
+            if state_transition_table is None:
+                self._on_unknown_state()
+                return
+            transition = state_transition_table.get(action.command)
+            if transition is None:
+                self._on_unexpected_action(action)
+                return
             self._change_state(transition, action)
-            if self._context.has_action():
-                self._handle_non_generic_action(self._context.take_action())
+            action = self._context.take_action() if self._context.has_action() else None
 
     def _current_state_transition_table(self) -> dict:
         return self.TRANSITIONS.get(type(self._state))
 
     def _on_unknown_state(self):
-        logger.error(f"{self} is in state {self._state} for which there is no transition.")
+        logger.error("%s is in state %s for which there is no transition.", self, self._state)
 
     def _on_unexpected_action(self, action):
-        logger.warning(f"{self} in state {self._state} does not have transition for '{action.command}'")
+        logger.warning("%s in state %s does not have transition for '%s'", self, self._state, action.command)
 
     def _change_state(self, transition, action):
         if transition.guard(action):
             self._state = transition.nextState.create(self._context, action.args)
-            logger.debug(f"{self} changed state to {self._state}.")
+            logger.debug("%s changed state to %s.", self, self._state)
             self._state.on_enter()
 
     def __str__(self):
@@ -1,9 +1,11 @@
 import copy
 import jsonpickle
 import random
+from game.battle_preview import BattlePreview
 from game.config import Config
 from game.errors import InvalidOperation
 from game.inventory import Inventory
+from game.player_records import PlayerRecords
 from game.unit import Unit
 from game.state_machine_action import StateMachineAction
 from game.talents import Talents
@@ -13,6 +15,11 @@ from game.items import Item
 
 
 class BattleContext:
+    _battle_preview = None
+    # Class defaults also serve battles saved before auto battles existed.
+    _auto_battle_start_hps: tuple[int, int] = None
+    _auto_battle_turns_count = 0
+
     def __init__(self, enemy: Unit):
         self._enemy = enemy
         self._prepare_phase_counter = 0
@@ -22,10 +29,41 @@ class BattleContext:
         self.clear_turn_counter()
         self._finished = False
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_battle_preview', None)
+        return state
+
     @property
     def enemy(self) -> Unit:
         return self._enemy
 
+    def battle_preview(self, familiar: Unit, enemy_spell_attack_probability: float) -> BattlePreview:
+        if self._battle_preview is None or not self._battle_preview.is_up_to_date(familiar, self._enemy):
+            self._battle_preview = BattlePreview(familiar, self._enemy, enemy_spell_attack_probability)
+        return self._battle_preview
+
+    def clear_battle_preview(self):
+        self._battle_preview = None
+
+    def start_auto_battle(self, familiar: Unit):
+        self._auto_battle_start_hps = familiar.hp, self._enemy.hp
+        self._auto_battle_turns_count = 0
+
+    def is_auto_battle(self) -> bool:
+        return self._auto_battle_start_hps is not None
+
+    @property
+    def auto_battle_turns_count(self) -> int:
+        return self._auto_battle_turns_count
+
+    def inc_auto_battle_turns_count(self):
+        self._auto_battle_turns_count += 1
+
+    def stop_auto_battle(self) -> tuple[int, int]:
+        start_hps, self._auto_battle_start_hps = self._auto_battle_start_hps, None
+        return start_hps
+
     def start_prepare_phase(self, counter: int):
         self._prepare_phase_counter = counter
 
@@ -66,6 +104,7 @@ class BattleContext:
 
 class StateMachineContext:
     RESPONSE_LINE_BREAK = '\n'
+    _is_auto_battle_enabled = False
 
     def __init__(self, game_config: Config):
         self._game_config = game_config
@@ -79,6 +118,7 @@ class StateMachineContext:
         self._rng = random.Random()
         self._responses = []
         self._generated_action = None
+        self._records = PlayerRecords()
 
     def to_json(self):
         context_copy = copy.deepcopy(self)
@@ -89,12 +129,56 @@ class StateMachineContext:
     def from_json(cls, context_json, game_config):
         context = jsonpickle.decode(context_json)
         context._game_config = game_config
+        if not hasattr(context, '_records'):
+            context._records = PlayerRecords()
+        units = [context._familiar, context._unit_buffer]
+        if context._battle_context is not None:
+            units.append(context._battle_context.enemy)
+        for unit in units:
+            if unit is not None:
+                unit.upgrade_legacy_state()
         return context
 
     @property
     def game_config(self):
         return self._game_config
 
+    def replace_game_config(self, game_config: Config) -> list[str]:
+        # Units are remapped to the new config's traits by name, those missing from it keep their old traits.
+        unmapped_units_names = []
+        units = [(self._familiar, False), (self._unit_buffer, False)]
+        if self._battle_context is not None:
+            # Preview depends on spells and probabilities taken from the config.
+            self._battle_context.clear_battle_preview()
+            units.append((self._battle_context.enemy, True))
+        for unit, is_enemy in units:
+            if unit is None:
+                continue
+            traits = game_config.find_unit_traits(unit.traits.name)
+            if traits is None:
+                unmapped_units_names.append(unit.traits.name)
+                continue
+            if is_enemy:
+                # Enemies are created with their own levels and without forbidden talents, see generate_floor_monster.
+                traits = traits.copy()
+                self._remove_enemy_forbidden_talents(traits)
+                unit.replace_config_traits(traits, game_config.spells_traits)
+            else:
+                unit.replace_config_traits(traits, game_config.spells_traits, game_config.levels)
+        self._game_config = game_config
+        return unmapped_units_names
+
+    @property
+    def records(self) -> PlayerRecords:
+        return self._records
+
+    @property
+    def is_auto_battle_enabled(self) -> bool:
+        return self._is_auto_battle_enabled
+
+    def set_auto_battle_enabled(self, is_enabled: bool):
+        self._is_auto_battle_enabled = is_enabled
+
     @property
     def is_tutorial_done(self) -> bool:
         return self._is_tutorial_done
@@ -174,6 +258,9 @@ class StateMachineContext:
             raise InvalidOperation(f'Battle already started - {enemy.name}')
         self._battle_context = BattleContext(enemy)
 
+    def battle_preview(self) -> BattlePreview:
+        return self._battle_context.battle_preview(self._familiar, self._game_config.probabilities.enemy_spell_attack)
+
     def finish_battle(self):
         if not self.is_in_battle():
             raise InvalidOperation(f'Battle not started')
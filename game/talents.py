@@ -15,7 +15,7 @@ class Talents(enum.Flag):
     Atrocious = 0x200000
 
     def has(self, talents: '__class__') -> bool:
-        return (self & talents) == talents
+        return (self._value_ & talents._value_) == talents._value_
 
     def clear(self, talents: '__class__'):
         self = self & (~talents)
@@ -1,3 +1,4 @@
+from collections.abc import Mapping
 import logging
 from game.config import Config
 from game.errors import InvalidOperation
@@ -12,13 +13,24 @@ logger = logging.getLogger(__name__)
 
 
 class Unit:
+    _TALENT_FLAGS_NAMES = (
+        'is_quick',
+        'is_atrocious',
+        'has_electric_shock',
+        '_has_hp_increased',
+        '_has_mp_increased',
+        '_has_strength_increased',
+        '_is_hard',
+        '_has_magic_attack_increased',
+        '_has_mp_consumption_decreased')
+
     def __init__(self, traits: UnitTraits, levels: Config.Levels):
         self._traits = traits
         self._levels = levels
         self.name = traits.name
         self.genus = traits.native_genus
         self.level = 1
-        self._talents = traits.talents
+        self._set_talents(traits.talents)
         self.max_hp = traits.base_hp
         self.hp = self.max_hp
         self.max_mp = traits.base_mp
@@ -61,16 +73,57 @@ class Unit:
     def level(self, value):
         self._level = value
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_talents'] = Talents(state.pop('_talents_mask'))
+        state['_statuses'] = Statuses(state.pop('_statuses_mask'))
+        for talent_flag_name in self._TALENT_FLAGS_NAMES:
+            del state[talent_flag_name]
+        return state
+
+    def __setstate__(self, state):
+        state = state.copy()
+        talents = state.pop('_talents')
+        statuses = state.pop('_statuses')
+        self.__dict__.update(state)
+        self._set_talents(talents)
+        self._statuses_mask = statuses.value
+
+    def upgrade_legacy_state(self):
+        # Units saved before talents and statuses were kept as masks are restored without __setstate__.
+        if '_talents_mask' in self.__dict__:
+            return
+        legacy_state = self.__dict__.copy()
+        self.__dict__.clear()
+        self.__setstate__(legacy_state)
+
     def is_max_level(self) -> bool:
         return self.level >= self._levels.max_level
 
     @property
     def talents(self) -> Talents:
-        return self._talents
+        return Talents(self._talents_mask)
+
+    def _set_talents(self, talents: Talents):
+        talents_mask = talents.value
+        self._talents_mask = talents_mask
+
+        def has(talent: Talents) -> bool:
+            return (talents_mask & talent.value) == talent.value
+
+        self.is_quick = has(Talents.Quick)
+        self.is_atrocious = has(Talents.Atrocious)
+        self.has_electric_shock = has(Talents.ElectricShock)
+        self._has_hp_increased = has(Talents.HpIncreased)
+        self._has_mp_increased = has(Talents.MpIncreased)
+        self._has_strength_increased = has(Talents.StrengthIncreased)
+        self._is_hard = has(Talents.Hard)
+        self._has_magic_attack_increased = has(Talents.MagicAttackIncreased)
+        self._has_mp_consumption_decreased = has(Talents.MpConsumptionDecreased)
 
     @property
     def max_hp(self):
-        multiplier = 2 if self.talents.has(Talents.HpIncreased) else 1
+        multiplier = 2 if self._has_hp_increased else 1
         return self._max_hp * multiplier
 
     @max_hp.setter
@@ -101,7 +154,7 @@ class Unit:
 
     @property
     def max_mp(self):
-        multiplier = 2 if self.talents.has(Talents.MpIncreased) else 1
+        multiplier = 2 if self._has_mp_increased else 1
         return self._max_mp * multiplier
 
     @max_mp.setter
@@ -123,7 +176,7 @@ class Unit:
         self.mp = self.max_mp
 
     def use_mp(self, mp_usage):
-        if self.talents.has(Talents.MpConsumptionDecreased):
+        if self._has_mp_consumption_decreased:
             mp_usage -= mp_usage // 2
         self.mp -= mp_usage
         if self.mp < 0:
@@ -131,7 +184,7 @@ class Unit:
 
     @property
     def attack(self):
-        multiplier = 2 if self.talents.has(Talents.StrengthIncreased) else 1
+        multiplier = 2 if self._has_strength_increased else 1
         return int(self._attack * self._stat_factor() * multiplier)
 
     @attack.setter
@@ -140,7 +193,7 @@ class Unit:
 
     @property
     def defense(self):
-        multiplier = 2 if self.talents.has(Talents.Hard) else 1
+        multiplier = 2 if self._is_hard else 1
         return int(self._defense * self._stat_factor() * multiplier)
 
     @defense.setter
@@ -162,30 +215,35 @@ class Unit:
             stat_factor += STAT_BOOST_FACTOR
         return stat_factor
 
+    def combat_signature(self) -> tuple:
+        spell_name = self._spell_traits.name if self.has_spell() else None
+        return self.genus, self._talents_mask, self._statuses_mask, self.max_hp, self.attack, self.defense, self.luck, \
+            spell_name, self._spell_level
+
     def has_any_status(self) -> bool:
-        return self._statuses.value != 0
+        return self._statuses_mask != 0
 
     def has_status(self, status: Statuses) -> bool:
-        return (self._statuses & status) == status
+        return (self._statuses_mask & status._value_) == status._value_
 
     def has_boosted_stats(self) -> bool:
         return self.has_status(Statuses.StatsBoost)
 
     def set_status(self, status: Statuses):
-        self._statuses |= status
+        self._statuses_mask |= status._value_
 
     def clear_statuses(self):
-        self._statuses = Statuses(0)
+        self._statuses_mask = 0
 
     def clear_status(self, status: Statuses):
-        self._statuses &= ~status
+        self._statuses_mask &= ~status._value_
 
     @property
     def spell(self) -> Spell:
         if not self.has_spell():
             return None
         spell_level = self._spell_level
-        if self.talents.has(Talents.MagicAttackIncreased):
+        if self._has_magic_attack_increased:
             spell_level *= 2
         return Spell(self._spell_traits, spell_level)
 
@@ -231,7 +289,7 @@ class Unit:
         return self._levels.experience_for_next_level(self.level)
 
     def fuse(self, other: '__class__'):
-        self._talents = self.traits.talents | other.traits.talents
+        self._set_talents(self.traits.talents | other.traits.talents)
         if self.genus.is_weak_against(other.genus):
             self._genus = other.genus
 
@@ -244,6 +302,18 @@ class Unit:
         self._traits = evolved_unit_traits
         self.name = evolved_unit_traits.name
 
+    def replace_config_traits(
+            self,
+            traits: UnitTraits,
+            spells_traits: Mapping[str, SpellTraits],
+            levels: Config.Levels=None):
+        # Stats already gained are kept, only growth from now on follows the new traits.
+        self._traits = traits
+        if levels is not None:
+            self._levels = levels
+        if self.has_spell():
+            self._spell_traits = spells_traits.get(self._spell_traits.name, self._spell_traits)
+
     def _level_up(self):
         are_stats_boosted = self.has_boosted_stats()
         if are_stats_boosted:
@@ -312,10 +382,11 @@ class Unit:
             return self.genus.name
 
     def _talents_to_string(self) -> str:
-        if self.talents is Talents.Empty:
+        if self._talents_mask == 0:
             return '-'
         else:
-            return ', '.join(talent.name for talent in Talents.all() if self.talents.has(talent))
+            talents = self.talents
+            return ', '.join(talent.name for talent in Talents.all() if talents.has(talent))
 
     def _statuses_to_string(self) -> str:
         return ', '.join(status.name for status in Statuses if self.has_status(status))
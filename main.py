@@ -1,54 +1,44 @@
+import time
+# Taken before any other import, so the startup report covers the imports too.
+IMPORTS_START_TIME = time.perf_counter()
 import argparse
 import asyncio
 import json
 from commander.commander import Commander
+from commander.config_reloader import ConfigReloader
+from commander.profiler import Profiler
 from commander.remote_commander_server import RemoteCommanderServer
 from commander.remote_commands_handler import RemoteCommandsHandler
+from game.action_recorder import ActionRecorder
 from game.controller import Controller as GameController, Config as GameConfig
+from metrics.loop_lag_monitor import LoopLagMonitor
+from metrics.metrics_server import MetricsServer
+from metrics.registry import REGISTRY
 import logging.handlers
-from twitch_bot.ad_bot import AdBot, User
+import os.path
+import queue
 
+logger = logging.getLogger(__name__)
 
-class TwitchGameMediator:
-    def __init__(self, ad_twitch_bot: AdBot, game_controller: GameController):
-        self._ad_twitch_bot = ad_twitch_bot
-        self._game_controller = game_controller
-        self._connect_twitch_if_events()
-        self._connect_game_if_events()
 
-    def _connect_twitch_if_events(self):
-        self._ad_twitch_bot.set_bot_connected_event_handler(self._handle_bot_connected)
-        self._ad_twitch_bot.set_join_event_handler(self._handle_user_joined_channel)
-        self._ad_twitch_bot.set_part_event_handler(self._handle_user_left_channel)
-        self._ad_twitch_bot.set_message_event_handler(self._handle_user_sent_message)
-        self._ad_twitch_bot.set_command_event_handler(self._handle_user_command)
+class StartupReport:
+    def __init__(self, start_time: float):
+        self._start_time = start_time
+        self._phase_start_time = start_time
+        self._phases_durations: list[tuple[str, float]] = []
 
-    def _connect_game_if_events(self):
-        self._game_controller.set_response_event_handler(self._handle_game_response)
+    def finish_phase(self, phase_name: str):
+        now = time.perf_counter()
+        self._phases_durations.append((phase_name, now - self._phase_start_time))
+        self._phase_start_time = now
 
-    def _handle_bot_connected(self):
-        pass
+    @property
+    def total_duration(self) -> float:
+        return self._phase_start_time - self._start_time
 
-    def _handle_user_joined_channel(self, user: User):
-        self._game_controller.add_active_player(self._player_name(user))
-
-    def _handle_user_left_channel(self, user: User):
-        self._game_controller.remove_active_player(self._player_name(user))
-
-    def _handle_user_sent_message(self, user: User):
-        self._game_controller.add_active_player(self._player_name(user))
-
-    def _handle_user_command(self, user: User, command: str, args: list[str]):
-        self._game_controller.handle_user_action(self._player_name(user), command, args)
-
-    def _handle_game_response(self, response: str) -> bool:
-        return self._ad_twitch_bot.send_message(response)
-
-    def _player_name(self, user: User) -> str:
-        return user.name.strip()
-
-    def run(self):
-        self._ad_twitch_bot.run()
+    def __str__(self):
+        phases = ', '.join(f"{name} {duration * 1e3:.1f}ms" for name, duration in self._phases_durations)
+        return f"Started in {self.total_duration * 1e3:.1f}ms - {phases}."
 
 
 def sss(sss: str):
@@ -56,21 +46,102 @@ def sss(sss: str):
 
 
 def main():
+    startup_report = StartupReport(IMPORTS_START_TIME)
+    startup_report.finish_phase('imports')
     args = parse_args()
-    configure_logger()
+    log_listener = configure_logger(args.log_level)
+    try:
+        run(args, startup_report)
+    finally:
+        log_listener.stop()
+
+
+def run(args, startup_report: StartupReport):
     event_loop = asyncio.get_event_loop()
-    game_config = GameConfig.from_file(args.game_config)
-    game_controller = GameController(game_config, args.state_files_directory)
-    if args.server_port is not None:
-        remote_commands_handler = RemoteCommandsHandler(game_controller)
-        remote_commander_server = RemoteCommanderServer(args.server_port, remote_commands_handler.handle_command)
-        event_loop.create_task(remote_commander_server.start())
-    if args.bot_config is not None:
-        bot_config = json.load(args.bot_config)
+    game_config = load_game_config(args.game_config, args.config_cache_directory)
+    bot_config = json.load(args.bot_config) if args.bot_config is not None else None
+    startup_report.finish_phase('config')
+    if bot_config is not None:
+        # Twitch stack is imported only when it is used, the local commander does not need it.
+        from twitch_bot.ad_bot import AdBot
+        from twitch_game_mediator import TwitchGameMediator
+        startup_report.finish_phase('twitch imports')
+    game_controllers = create_game_controllers(game_config, args.state_files_directory, bot_config)
+    startup_report.finish_phase('state files')
+    if args.record_actions_directory is not None:
+        attach_action_recorders(game_controllers, args.record_actions_directory)
+    # Services are started only once the event loop runs, and not at all when only reporting startup.
+    services = []
+    if args.loop_lag_threshold > 0:
+        services.append(LoopLagMonitor(args.loop_lag_threshold).run)
+    profiler = Profiler(list(game_controllers.values()), args.profiles_directory)
+    config_reloader = ConfigReloader(
+        list(game_controllers.values()),
+        args.game_config.name,
+        args.config_cache_directory)
+    if args.server_port is not None or args.server_unix_socket is not None:
+        remote_commands_handler = RemoteCommandsHandler(game_controllers, profiler, config_reloader)
+        remote_commander_server = RemoteCommanderServer(
+            remote_commands_handler.handle_request,
+            args.server_port,
+            args.server_unix_socket)
+        services.append(remote_commander_server.start)
+    if args.metrics_port is not None:
+        for channel_name, game_controller in game_controllers.items():
+            game_controller.bind_metrics(channel_name)
+        services.append(MetricsServer(REGISTRY, args.metrics_port).start)
+    if bot_config is not None:
         ad_twitch_bot = AdBot(bot_config, event_loop)
-        TwitchGameMediator(ad_twitch_bot, game_controller).run()
+        response_coalescing_window = bot_config.get(
+            'RESPONSE_COALESCING_WINDOW',
+            TwitchGameMediator.DEFAULT_RESPONSE_COALESCING_WINDOW)
+        for channel_name, game_controller in game_controllers.items():
+            TwitchGameMediator(ad_twitch_bot.channel(channel_name), game_controller, response_coalescing_window)
+        startup_report.finish_phase('bot')
+        run_service = ad_twitch_bot.run
     else:
-        Commander(game_controller).run()
+        run_service = Commander(next(iter(game_controllers.values())), profiler, config_reloader).run
+    logger.info(str(startup_report))
+    if args.startup_report:
+        print(startup_report)
+        return
+    for service in services:
+        event_loop.create_task(service())
+    run_service()
+
+
+def load_game_config(config_file, config_cache_directory: str) -> GameConfig:
+    if config_cache_directory == '':
+        return GameConfig.from_file(config_file)
+    return GameConfig.from_file_cached(config_file, config_cache_directory)
+
+
+def channels_names(bot_config: dict) -> list[str]:
+    from twitch_bot.ad_bot import AdBot
+    return AdBot.channels_names(bot_config)
+
+
+def create_game_controllers(
+        game_config: GameConfig,
+        state_files_directory: str,
+        bot_config: dict) -> dict[str, GameController]:
+    if bot_config is None or 'CHANNELS' not in bot_config:
+        channel_name = channels_names(bot_config)[0] if bot_config is not None else ''
+        return {channel_name: GameController(game_config, state_files_directory)}
+    # Every channel keeps its players' state files in its own subdirectory.
+    game_controllers = {}
+    for channel_name in channels_names(bot_config):
+        channel_state_files_directory = os.path.join(state_files_directory, channel_name)
+        os.makedirs(channel_state_files_directory, exist_ok=True)
+        game_controllers[channel_name] = GameController(game_config, channel_state_files_directory)
+    return game_controllers
+
+
+def attach_action_recorders(game_controllers: dict[str, GameController], record_actions_directory: str):
+    os.makedirs(record_actions_directory, exist_ok=True)
+    for channel_name, game_controller in game_controllers.items():
+        actions_log_path = os.path.join(record_actions_directory, f"{channel_name or 'game'}.actions.ndjson")
+        game_controller.set_action_recorder(ActionRecorder.open(actions_log_path))
 
 
 def parse_args():
@@ -79,12 +150,34 @@ def parse_args():
     parser.add_argument('-b', '--bot_config', type=argparse.FileType('r'))
     parser.add_argument('-d', '--state_files_directory', default='.')
     parser.add_argument('-p', '--server_port', type=int)
+    parser.add_argument('-u', '--server_unix_socket')
+    parser.add_argument('-r', '--record_actions_directory')
+    parser.add_argument('-m', '--metrics_port', type=int, help='Localhost port serving Prometheus metrics.')
+    parser.add_argument(
+        '-L', '--loop_lag_threshold',
+        type=float,
+        default=0.25,
+        help='Event loop stall in seconds reported with its cause, 0 disables monitoring.')
+    parser.add_argument(
+        '-C', '--config_cache_directory',
+        default='.ad_bot_cache',
+        help='Where compiled game config is cached, empty string disables caching.')
+    parser.add_argument('-S', '--startup_report', action='store_true', help='Print startup report and exit.')
+    parser.add_argument('-P', '--profiles_directory', default='profiles', help='Where profiling results are written.')
+    parser.add_argument(
+        '-l', '--log_level',
+        action='append',
+        default=[],
+        help='Root log level or LOGGER=LEVEL, can be given multiple times.')
     return parser.parse_args()
 
 
-def configure_logger():
+def configure_logger(log_levels: list[str]) -> logging.handlers.QueueListener:
     root_logger = logging.getLogger()
     root_logger.setLevel(logging.DEBUG)
+    for log_level in log_levels:
+        logger_name, _, level = log_level.rpartition('=')
+        logging.getLogger(logger_name or None).setLevel(level.upper())
     formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     file_handler = logging.handlers.RotatingFileHandler('ad_bot.log', maxBytes=megabytes_to_bytes(100), backupCount=1)
     file_handler.setLevel(logging.DEBUG)
@@ -92,8 +185,13 @@ def configure_logger():
     stream_handler = logging.StreamHandler()
     stream_handler.setLevel(logging.INFO)
     stream_handler.setFormatter(formatter)
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(stream_handler)
+    # QueueHandler still formats each record's message on the calling thread, only writing and rotating the log file
+    # happen on the listener's thread.
+    log_queue = queue.SimpleQueue()
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    log_listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    log_listener.start()
+    return log_listener
 
 
 def megabytes_to_bytes(mb):
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from types import FrameType
+from metrics.registry import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+LOOP_LAG = Histogram(
+    'ad_bot_loop_lag_seconds',
+    'Delay of event loop wake-ups past their schedule.',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+LOOP_STALLS = Counter('ad_bot_loop_stalls', 'Event loop stalls by code running when they were detected.', ('site',))
+
+
+class LoopLagMonitor:
+    # Lag is measured by a coroutine sleeping on the loop. The culprit is found by a watchdog thread, which samples
+    # the loop thread's stack once the coroutine's wake-up is overdue, i.e. while the slow code is still running.
+    PROJECT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    UNKNOWN_SITE = 'unknown'
+    STACK_DEPTH = 6
+
+    def __init__(self, threshold: float, interval: float=0.1, warning_interval: float=10.0):
+        self._threshold = threshold
+        self._interval = interval
+        self._warning_interval = warning_interval
+        self._loop_thread_id: int = None
+        self._expected_wake_up_time = time.monotonic()
+        # Site and stack of the ongoing stall, swapped as one tuple between the watchdog and the loop thread.
+        self._stall: tuple[str, list[str]] = None
+        self._stopped = threading.Event()
+        self._last_warning_time = -warning_interval
+        self._suppressed_warnings_count = 0
+        self._stalls_count = 0
+        self._max_lag = 0.0
+
+    @property
+    def stalls_count(self) -> int:
+        return self._stalls_count
+
+    @property
+    def max_lag(self) -> float:
+        return self._max_lag
+
+    async def run(self):
+        self._loop_thread_id = threading.get_ident()
+        self._expected_wake_up_time = time.monotonic() + self._interval
+        self._stopped.clear()
+        logger.info(f"Monitoring event loop lag, stalls over {self._threshold}s are reported.")
+        threading.Thread(target=self._watch, name='Loop lag watchdog', daemon=True).start()
+        try:
+            while True:
+                self._expected_wake_up_time = time.monotonic() + self._interval
+                await asyncio.sleep(self._interval)
+                self._record_lag(max(0.0, time.monotonic() - self._expected_wake_up_time))
+        finally:
+            self._stopped.set()
+
+    def _record_lag(self, lag: float):
+        LOOP_LAG.observe(lag)
+        self._max_lag = max(self._max_lag, lag)
+        stall, self._stall = self._stall, None
+        if lag < self._threshold:
+            return
+        # Watchdog has already sampled the stall, unless it took less than a watchdog period past the threshold.
+        site, stack = stall if stall is not None else (self.UNKNOWN_SITE, [])
+        self._stalls_count += 1
+        LOOP_STALLS.labels(site).inc()
+        self._warn(lag, site, stack)
+
+    def _warn(self, lag: float, site: str, stack: list[str]):
+        now = time.monotonic()
+        if now - self._last_warning_time < self._warning_interval:
+            self._suppressed_warnings_count += 1
+            return
+        suppressed = ''
+        if self._suppressed_warnings_count > 0:
+            suppressed = f" ({self._suppressed_warnings_count} more stall(s) since last warning)"
+        stack_description = f" Stack: {' <- '.join(stack)}." if len(stack) > 0 else ''
+        logger.warning(f"Event loop stalled for {lag:.3f}s in {site}{suppressed}.{stack_description}")
+        self._last_warning_time = now
+        self._suppressed_warnings_count = 0
+
+    def _watch(self):
+        while not self._stopped.wait(self._interval / 2):
+            if self._stall is not None:
+                continue
+            if time.monotonic() - self._expected_wake_up_time <= self._threshold:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            project_frames = self._project_frames(frame)
+            stack = [f"{path}:{line} {function}" for path, line, function in project_frames]
+            # Site omits line numbers, so stalls of one function are counted under one label.
+            site = f"{project_frames[0][0]} {project_frames[0][2]}" if len(project_frames) > 0 else self.UNKNOWN_SITE
+            self._stall = (site, stack)
+
+    @classmethod
+    def _project_frames(cls, frame: FrameType) -> list[tuple[str, int, str]]:
+        # Innermost first, e.g. ('game/state_machine.py', 206, 'StateMachine.save').
+        project_frames = []
+        while frame is not None and len(project_frames) < cls.STACK_DEPTH:
+            file_name = frame.f_code.co_filename
+            if file_name.startswith(cls.PROJECT_DIRECTORY):
+                relative_path = os.path.relpath(file_name, cls.PROJECT_DIRECTORY)
+                project_frames.append((relative_path, frame.f_lineno, frame.f_code.co_qualname))
+            frame = frame.f_back
+        return project_frames
@@ -0,0 +1,61 @@
+import asyncio
+import logging
+from metrics.registry import Registry
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsServer:
+    HOST = '127.0.0.1'
+    PATH = '/metrics'
+    CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+    MAX_HEADERS_COUNT = 100
+
+    def __init__(self, registry: Registry, port: int):
+        self._registry = registry
+        self._port = port
+        self._server: asyncio.AbstractServer = None
+        self._scrapes_count = 0
+
+    @property
+    def scrapes_count(self) -> int:
+        return self._scrapes_count
+
+    async def start(self):
+        logger.info(f"Starting metrics server on port {self._port}.")
+        self._server = await asyncio.start_server(self._handle_connection, self.HOST, self._port)
+
+    async def stop(self):
+        if self._server is None:
+            return
+        self._server.close()
+        await self._server.wait_closed()
+        self._server = None
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+            for _ in range(self.MAX_HEADERS_COUNT):
+                if (await reader.readline()).strip() == b'':
+                    break
+            if len(request_line) < 2 or request_line[0] not in ('GET', 'HEAD'):
+                writer.write(self._response('405 Method Not Allowed', b''))
+            elif request_line[1].split('?')[0] != self.PATH:
+                writer.write(self._response('404 Not Found', b''))
+            else:
+                body = self._registry.exposition().encode()
+                self._scrapes_count += 1
+                writer.write(self._response('200 OK', body if request_line[0] == 'GET' else b'', len(body)))
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError) as exc:
+            logger.warning(f"Metrics scrape connection broken. Reason - {exc}.")
+        finally:
+            writer.close()
+
+    def _response(self, status: str, body: bytes, content_length: int=None) -> bytes:
+        headers = (
+            f"HTTP/1.1 {status}\r\n"
+            f"Content-Type: {self.CONTENT_TYPE}\r\n"
+            f"Content-Length: {content_length if content_length is not None else len(body)}\r\n"
+            f"Connection: close\r\n\r\n")
+        return headers.encode() + body
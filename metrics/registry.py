@@ -0,0 +1,205 @@
+import bisect
+import math
+from typing import Callable, Iterator
+
+
+class Registry:
+    class DuplicatedMetric(Exception):
+        def __init__(self, name: str):
+            super().__init__(f"Metric '{name}' is already registered.")
+            self.name = name
+
+    def __init__(self):
+        self._metrics: dict[str, 'Metric'] = {}
+
+    def register(self, metric: 'Metric'):
+        if metric.name in self._metrics:
+            raise self.DuplicatedMetric(metric.name)
+        self._metrics[metric.name] = metric
+
+    def metric(self, name: str) -> 'Metric':
+        return self._metrics[name]
+
+    def exposition(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.TYPE}")
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{self._format_labels(labels)} {self._format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _format_labels(labels: dict[str, str]) -> str:
+        if len(labels) == 0:
+            return ''
+        escaped = (
+            f'{name}="{value.translate(LABEL_VALUE_ESCAPES)}"'
+            for name, value in labels.items())
+        return '{' + ','.join(escaped) + '}'
+
+    @staticmethod
+    def _format_value(value: float) -> str:
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        if float(value).is_integer():
+            return str(int(value))
+        return repr(float(value))
+
+
+LABEL_VALUE_ESCAPES = str.maketrans({'\\': '\\\\', '"': '\\"', '\n': '\\n'})
+REGISTRY = Registry()
+
+
+class Metric:
+    # Metrics are only touched from the event loop thread, so children are not guarded by locks.
+    TYPE = None
+
+    class Child:
+        def __init__(self):
+            self._function: Callable[[], float] = None
+
+        def set_function(self, function: Callable[[], float]):
+            self._function = function
+
+    def __init__(self, name: str, documentation: str, labels_names: tuple=(), registry: Registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self._labels_names = tuple(labels_names)
+        self._children: dict[tuple, 'Metric.Child'] = {}
+        if len(self._labels_names) == 0:
+            self._children[()] = self._create_child()
+        registry.register(self)
+
+    def _create_child(self) -> 'Metric.Child':
+        raise NotImplementedError()
+
+    def labels(self, *labels_values) -> 'Metric.Child':
+        if len(labels_values) != len(self._labels_names):
+            raise ValueError(f"'{self.name}' needs labels {self._labels_names}, got {labels_values}.")
+        labels_values = tuple(str(label_value) for label_value in labels_values)
+        child = self._children.get(labels_values)
+        if child is None:
+            child = self._children[labels_values] = self._create_child()
+        return child
+
+    def remove(self, *labels_values):
+        self._children.pop(tuple(str(label_value) for label_value in labels_values), None)
+
+    @property
+    def _default_child(self) -> 'Metric.Child':
+        return self._children[()]
+
+    def samples(self) -> Iterator[tuple[str, dict[str, str], float]]:
+        for labels_values, child in self._children.items():
+            labels = dict(zip(self._labels_names, labels_values))
+            for suffix, extra_labels, value in child.samples():
+                yield suffix, {**labels, **extra_labels}, value
+
+
+class Counter(Metric):
+    TYPE = 'counter'
+
+    class Child(Metric.Child):
+        def __init__(self):
+            super().__init__()
+            self._value = 0
+
+        def inc(self, amount: float=1):
+            self._value += amount
+
+        @property
+        def value(self) -> float:
+            return self._function() if self._function is not None else self._value
+
+        def samples(self):
+            yield '_total', {}, self.value
+
+    def _create_child(self) -> 'Counter.Child':
+        return self.Child()
+
+    def inc(self, amount: float=1):
+        self._default_child.inc(amount)
+
+
+class Gauge(Metric):
+    TYPE = 'gauge'
+
+    class Child(Metric.Child):
+        def __init__(self):
+            super().__init__()
+            self._value = 0
+
+        def set(self, value: float):
+            self._value = value
+
+        def inc(self, amount: float=1):
+            self._value += amount
+
+        def dec(self, amount: float=1):
+            self._value -= amount
+
+        @property
+        def value(self) -> float:
+            return self._function() if self._function is not None else self._value
+
+        def samples(self):
+            yield '', {}, self.value
+
+    def _create_child(self) -> 'Gauge.Child':
+        return self.Child()
+
+    def set(self, value: float):
+        self._default_child.set(value)
+
+    def set_function(self, function: Callable[[], float]):
+        self._default_child.set_function(function)
+
+
+class Histogram(Metric):
+    TYPE = 'histogram'
+    DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+    class Child(Metric.Child):
+        def __init__(self, buckets: tuple):
+            super().__init__()
+            self._buckets = buckets
+            # Counts are kept per bucket and accumulated only when scraped.
+            self._counts = [0] * (len(buckets) + 1)
+            self._sum = 0.0
+
+        def observe(self, value: float):
+            self._counts[bisect.bisect_left(self._buckets, value)] += 1
+            self._sum += value
+
+        @property
+        def count(self) -> int:
+            return sum(self._counts)
+
+        @property
+        def sum(self) -> float:
+            return self._sum
+
+        def samples(self):
+            cumulative_count = 0
+            for upper_bound, count in zip(self._buckets + (math.inf,), self._counts):
+                cumulative_count += count
+                yield '_bucket', {'le': Registry._format_value(upper_bound)}, cumulative_count
+            yield '_sum', {}, self._sum
+            yield '_count', {}, cumulative_count
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labels_names: tuple=(),
+            buckets: tuple=DEFAULT_BUCKETS,
+            registry: Registry=REGISTRY):
+        self._buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labels_names, registry)
+
+    def _create_child(self) -> 'Histogram.Child':
+        return self.Child(self._buckets)
+
+    def observe(self, value: float):
+        self._default_child.observe(value)
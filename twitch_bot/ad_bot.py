@@ -1,105 +1,146 @@
 import asyncio
 import logging
 import random
-from twitch_bot.twitch_interface import TwitchInterface
+from twitch_bot.ad_bot_channel import AdBotChannel
+from twitch_bot.inbound_command_filter import InboundCommandFilter
+from twitch_bot.message_chunker import MessageChunker
+from twitch_bot.outbound_message_queue import TokenBucket
 from twitchio.dataclasses import Channel, Message, User, Context
 from twitchio.ext import commands
-from typing import Callable
 
 logger = logging.getLogger(__name__)
 
 
-class AdBot(commands.Bot, TwitchInterface):
+class AdBot(commands.Bot):
+    class UnknownChannel(Exception):
+        def __init__(self, channel_name: str):
+            super().__init__()
+            self.channel_name = channel_name
+
+    MESSAGE_LENGTH_LIMIT = 500
+    IRC_LINE_BYTES_LIMIT = 512
+    RATE_LIMIT_PERIOD = 30
+    RATE_LIMITS = {
+        'normal': 20,
+        'moderator': 100,
+        'verified': 7500
+    }
+    DEFAULT_OUTBOUND_QUEUE_SIZE = 200
+    # A battle turn takes a player a few seconds to read and answer, with a couple of quick queries in between,
+    # so a command every 2 seconds with a burst of 5 leaves normal play untouched and still stops flooding.
+    DEFAULT_USER_COMMANDS_BURST = 5
+    DEFAULT_USER_COMMANDS_RATE = 0.5
+    # Repeating a command is how the game is played, only the same command resent within a moment is a duplicate.
+    DEFAULT_DUPLICATE_COMMAND_WINDOW = 0.5
+    GAME_COMMAND = 'adbot'
+
     def __init__(self, bot_config: dict, loop=None):
         self._excluded_user_names = set(bot_config['EXCLUDED_USERS'])
-        self._channel_name = bot_config['CHANNEL'].lstrip('#')
+        self._command_prefix = bot_config['PREFIX']
         self._rng = random.Random()
+        self._channels = {}
+        for channel_name in self.channels_names(bot_config):
+            self._channels[channel_name] = self._create_channel(channel_name, bot_config)
+        self._outbound_message_queues_tasks: list[asyncio.Task] = []
         super().__init__(
             irc_token=bot_config['OATH_TOKEN'],
             client_id=bot_config['CLIENT_ID'],
-            prefix=bot_config['PREFIX'],
+            prefix=self._command_prefix,
             nick=bot_config['NICK'],
-            initial_channels=[self._channel_name],
+            initial_channels=list(self._channels),
             loop=loop)
+        irc_host = bot_config.get('IRC_HOST')
+        if irc_host is not None:
+            # twitchio does not expose the IRC endpoint, so it is overridden for local test servers.
+            self._ws._host = irc_host
+
+    @staticmethod
+    def channels_names(bot_config: dict) -> list[str]:
+        channels_names = bot_config['CHANNELS'] if 'CHANNELS' in bot_config else [bot_config['CHANNEL']]
+        return [channel_name.lstrip('#').lower() for channel_name in channels_names]
+
+    def _create_channel(self, channel_name: str, bot_config: dict) -> AdBotChannel:
+        return AdBotChannel(
+            channel_name,
+            self.get_channel,
+            self._excluded_user_names,
+            MessageChunker(f'PRIVMSG #{channel_name} :.me ', self.MESSAGE_LENGTH_LIMIT, self.IRC_LINE_BYTES_LIMIT),
+            self._create_token_bucket(bot_config.get('RATE_LIMIT', 'normal')),
+            bot_config.get('OUTBOUND_QUEUE_SIZE', self.DEFAULT_OUTBOUND_QUEUE_SIZE),
+            InboundCommandFilter(
+                bot_config.get('USER_COMMANDS_BURST', self.DEFAULT_USER_COMMANDS_BURST),
+                bot_config.get('USER_COMMANDS_RATE', self.DEFAULT_USER_COMMANDS_RATE),
+                bot_config.get('DUPLICATE_COMMAND_WINDOW', self.DEFAULT_DUPLICATE_COMMAND_WINDOW)))
+
+    @classmethod
+    def _create_token_bucket(cls, rate_limit: str) -> TokenBucket:
+        if rate_limit not in cls.RATE_LIMITS:
+            raise ValueError(f"Unknown rate limit '{rate_limit}'. Expected one of: {', '.join(cls.RATE_LIMITS)}.")
+        return TokenBucket.for_rate_limit(cls.RATE_LIMITS[rate_limit], cls.RATE_LIMIT_PERIOD)
+
+    @property
+    def channels(self) -> list[AdBotChannel]:
+        return list(self._channels.values())
+
+    def channel(self, channel_name: str) -> AdBotChannel:
+        try:
+            return self._channels[channel_name.lstrip('#').lower()]
+        except KeyError:
+            raise self.UnknownChannel(channel_name)
 
-    def set_bot_connected_event_handler(self, handler: Callable):
-        self._bot_connected_event_handler = handler
-
-    def set_join_event_handler(self, handler: Callable[[User], None]):
-        self._join_event_handler = handler
-
-    def set_part_event_handler(self, handler: Callable[[User], None]):
-        self._part_event_handler = handler
-
-    def set_message_event_handler(self, handler: Callable[[User], None]):
-        self._message_event_handler = handler
-
-    def set_command_event_handler(self, handler: Callable[[User, str, list[str]], None]):
-        self._command_event_handler = handler
-
-    def ignore_user(self, user_name: str):
-        logger.info(f"Adding {user_name} to excluded list.")
-        self._excluded_user_names.add(user_name)
-
-    def unignore_user(self, user_name: str):
-        if user_name not in self._excluded_player_names:
-            logger.warning(f"{user_name} is not in excluded list.")
-            return
-        logger.info(f"Removing {user_name} from excluded list.")
-        self._excluded_user_names.remove(user_name)
-
-    def send_message(self, message: str) -> bool:
-        channel = self._get_channel()
-        if channel is None:
-            return False
-        index = 0
-        while index < len(message):
-            asyncio.create_task(channel.send_me(message[index:index + 500]))
-            index += 500
-        return True
-
-    def _get_channel(self) -> Channel:
-        return self.get_channel(self._channel_name)
+    def _bot_channel(self, channel: Channel) -> AdBotChannel:
+        return self._channels.get(channel.name.lower()) if channel is not None else None
 
     async def event_ready(self):
         logger.info(f"Bot connected.")
-        self._bot_connected_event_handler()
+        if len(self._outbound_message_queues_tasks) == 0:
+            for bot_channel in self._channels.values():
+                self._outbound_message_queues_tasks.append(
+                    self.loop.create_task(bot_channel.outbound_message_queue.run()))
+        for bot_channel in self._channels.values():
+            bot_channel.handle_bot_connected()
 
     async def event_join(self, user: User):
-        if self._is_excluded_user(user):
+        bot_channel = self._bot_channel(user.channel)
+        if bot_channel is None or self._is_excluded_user(user):
             return
-        logger.info(f"'{user.name}' joined channel.")
-        self._join_event_handler(user)
+        bot_channel.handle_join(user)
 
     async def event_part(self, user: User):
-        if self._is_excluded_user(user):
+        bot_channel = self._bot_channel(user.channel)
+        if bot_channel is None or self._is_excluded_user(user):
             return
-        logger.info(f"'{user.name}' left channel.")
-        self._part_event_handler(user)
+        bot_channel.handle_part(user)
 
     async def event_message(self, message: Message):
         user = message.author
-        if self._is_excluded_user(user):
+        bot_channel = self._bot_channel(message.channel)
+        if bot_channel is None or self._is_excluded_user(user):
+            return
+        bot_channel.handle_message(user)
+        # Only game commands are filtered, other bots' commands sharing the prefix do not use up the user's bucket.
+        if self._is_game_command(message) and not bot_channel.accept_command(user, message.content):
             return
-        self._message_event_handler(user)
         await self.handle_commands(message)
 
+    def _is_game_command(self, message: Message) -> bool:
+        return message.content.split(maxsplit=1)[:1] == [f"{self._command_prefix}{self.GAME_COMMAND}"]
+
     def _is_excluded_user(self, user: User):
         return user.name.strip() in self._excluded_user_names
 
-    @commands.command(name='adbot')
-    async def _handle_ad_bot_command(self, ctx, *args):
+    @commands.command(name=GAME_COMMAND)
+    async def _handle_ad_bot_command(self, ctx: Context, *args):
         if len(args) == 0:
             return
         command, command_args = args[0], args[1:]
-        self._command_event_handler(ctx.author, command, command_args)
+        self._bot_channel(ctx.channel).handle_command(ctx.author, command, command_args)
 
     @commands.command(name='rng_range')
     async def _handle_rng_range_command(self, ctx: Context, *args):
         if len(args) == 0:
             await self._send_user_message(
-                ctx.author,
-                ctx.channel,
+                ctx,
                 f"Usage: '!rng_range UPPER_LIMIT' or '!rng_range LOWER_LIMIT UPPER_LIMIT'.")
             return
         try:
@@ -109,25 +150,23 @@ class AdBot(commands.Bot, TwitchInterface):
                 random_number = self._rng.randint(int(args[0]), int(args[1]))
         except ValueError:
             await self._send_user_message(
-                ctx.author,
-                ctx.channel,
+                ctx,
                 "LIMITs for !rng_range command must be ordered numbers.")
             return
-        await self._send_rngesus_message(ctx.author, ctx.channel, random_number)
+        await self._send_rngesus_message(ctx, random_number)
 
     @commands.command(name='rng_choice')
     async def _handle_rng_choice_command(self, ctx: Context, *args):
         if len(args) == 0:
             await self._send_user_message(
-                ctx.author,
-                ctx.channel,
+                ctx,
                 f"Usage: '!rng_choice OPTION_1 OPTION_2 OPTION_3...'.")
             return
-        await self._send_rngesus_message(ctx.author, ctx.channel, self._rng.choice(args))
+        await self._send_rngesus_message(ctx, self._rng.choice(args))
 
-    async def _send_rngesus_message(self, user: User, channel: Channel, value: str):
-        await self._send_user_message(user, channel, f"RNGesus says: {value}.")
+    async def _send_rngesus_message(self, ctx: Context, value: str):
+        await self._send_user_message(ctx, f"RNGesus says: {value}.")
 
-    async def _send_user_message(self, user: User, channel: Channel, msg: str):
-        user_name = user.name.strip()
-        await channel.send_me(f"@{user_name}: {msg}")
+    async def _send_user_message(self, ctx: Context, msg: str):
+        user_name = ctx.author.name.strip()
+        self._bot_channel(ctx.channel).send_message(f"@{user_name}: {msg}")
@@ -0,0 +1,137 @@
+import functools
+import logging
+from metrics.registry import Counter, Gauge
+from twitch_bot.inbound_command_filter import InboundCommandFilter
+from twitch_bot.message_chunker import MessageChunker
+from twitch_bot.outbound_message_queue import OutboundMessageQueue, TokenBucket
+from twitch_bot.twitch_interface import TwitchInterface
+from twitchio.dataclasses import Channel, User
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+OUTBOUND_QUEUE_DEPTH = Gauge('ad_bot_outbound_queue_depth', 'Messages waiting in outbound lanes.', ('channel', 'lane'))
+OUTBOUND_MAX_WAIT = Gauge('ad_bot_outbound_max_wait_seconds', 'Longest time a message waited to be sent.', ('channel',))
+OUTBOUND_MESSAGES = Counter('ad_bot_outbound_messages', 'Outbound messages by their fate.', ('channel', 'outcome'))
+INBOUND_COMMANDS = Counter('ad_bot_inbound_commands', 'Chat commands by filtering outcome.', ('channel', 'outcome'))
+INBOUND_TRACKED_USERS = Gauge('ad_bot_inbound_tracked_users', 'Users tracked by inbound command filter.', ('channel',))
+
+
+class AdBotChannel(TwitchInterface):
+    def __init__(
+            self,
+            name: str,
+            channel_getter: Callable[[str], Channel],
+            excluded_user_names: set[str],
+            message_chunker: MessageChunker,
+            token_bucket: TokenBucket,
+            outbound_queue_size: int,
+            inbound_command_filter: InboundCommandFilter):
+        self._name = name
+        self._channel_getter = channel_getter
+        self._excluded_user_names = excluded_user_names
+        self._message_chunker = message_chunker
+        self._outbound_message_queue = OutboundMessageQueue(
+            self._send_queued_message,
+            token_bucket,
+            outbound_queue_size)
+        self._inbound_command_filter = inbound_command_filter
+        self._bot_connected_event_handler = lambda: None
+        self._join_event_handler = lambda user: None
+        self._part_event_handler = lambda user: None
+        self._message_event_handler = lambda user: None
+        self._command_event_handler = lambda user, command, args: None
+        self._register_metrics()
+
+    def _register_metrics(self):
+        queue, command_filter = self._outbound_message_queue, self._inbound_command_filter
+        for lane in OutboundMessageQueue.Lane:
+            OUTBOUND_QUEUE_DEPTH.labels(self._name, lane.name).set_function(functools.partial(queue.lane_depth, lane))
+        OUTBOUND_MAX_WAIT.labels(self._name).set_function(lambda: queue.max_wait_time)
+        OUTBOUND_MESSAGES.labels(self._name, 'sent').set_function(lambda: queue.sent_messages_count)
+        OUTBOUND_MESSAGES.labels(self._name, 'rejected').set_function(lambda: queue.rejected_messages_count)
+        OUTBOUND_MESSAGES.labels(self._name, 'dropped').set_function(lambda: queue.dropped_messages_count)
+        INBOUND_COMMANDS.labels(self._name, 'accepted').set_function(lambda: command_filter.accepted_commands_count)
+        INBOUND_COMMANDS.labels(self._name, 'throttled').set_function(lambda: command_filter.throttled_commands_count)
+        INBOUND_COMMANDS.labels(self._name, 'duplicate').set_function(lambda: command_filter.duplicate_commands_count)
+        INBOUND_TRACKED_USERS.labels(self._name).set_function(lambda: command_filter.tracked_users_count)
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def message_chunker(self) -> MessageChunker:
+        return self._message_chunker
+
+    @property
+    def outbound_message_queue(self) -> OutboundMessageQueue:
+        return self._outbound_message_queue
+
+    @property
+    def inbound_command_filter(self) -> InboundCommandFilter:
+        return self._inbound_command_filter
+
+    def set_bot_connected_event_handler(self, handler: Callable):
+        self._bot_connected_event_handler = handler
+
+    def set_join_event_handler(self, handler: Callable[[User], None]):
+        self._join_event_handler = handler
+
+    def set_part_event_handler(self, handler: Callable[[User], None]):
+        self._part_event_handler = handler
+
+    def set_message_event_handler(self, handler: Callable[[User], None]):
+        self._message_event_handler = handler
+
+    def set_command_event_handler(self, handler: Callable[[User, str, list[str]], None]):
+        self._command_event_handler = handler
+
+    def ignore_user(self, user_name: str):
+        logger.info(f"Adding {user_name} to excluded list.")
+        self._excluded_user_names.add(user_name)
+
+    def unignore_user(self, user_name: str):
+        if user_name not in self._excluded_user_names:
+            logger.warning(f"{user_name} is not in excluded list.")
+            return
+        logger.info(f"Removing {user_name} from excluded list.")
+        self._excluded_user_names.remove(user_name)
+
+    def send_message(
+            self,
+            message: str,
+            lane: OutboundMessageQueue.Lane=OutboundMessageQueue.Lane.Reply,
+            order_keys: frozenset[str]=frozenset()) -> bool:
+        return self._outbound_message_queue.put(self._message_chunker.chunk(message), lane, order_keys)
+
+    async def _send_queued_message(self, message: str):
+        channel = self._channel_getter(self._name)
+        if channel is None:
+            logger.warning("Not connected to '%s'. Dropping message '%s'.", self._name, message)
+            return
+        await channel.send_me(message)
+
+    def handle_bot_connected(self):
+        self._bot_connected_event_handler()
+
+    def handle_join(self, user: User):
+        logger.info("'%s' joined '%s' channel.", user.name, self._name)
+        self._join_event_handler(user)
+
+    def handle_part(self, user: User):
+        logger.info("'%s' left '%s' channel.", user.name, self._name)
+        self._part_event_handler(user)
+
+    def accept_command(self, user: User, content: str) -> bool:
+        user_name = user.name.strip()
+        verdict = self._inbound_command_filter.check(user_name, content)
+        if verdict is InboundCommandFilter.Verdict.FirstThrottled:
+            self.send_message(f"@{user_name}: You are sending commands too fast, wait a moment before the next one.")
+        return verdict is InboundCommandFilter.Verdict.Accepted
+
+    def handle_message(self, user: User):
+        self._message_event_handler(user)
+
+    def handle_command(self, user: User, command: str, args: list[str]):
+        self._command_event_handler(user, command, args)
@@ -0,0 +1,94 @@
+import collections
+import enum
+import logging
+import time
+from twitch_bot.outbound_message_queue import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+class InboundCommandFilter:
+    class Verdict(enum.Enum):
+        Accepted = enum.auto()
+        Duplicate = enum.auto()
+        Throttled = enum.auto()
+        # First throttled command since the last accepted one, the user is told to slow down only once.
+        FirstThrottled = enum.auto()
+
+    class UserState:
+        def __init__(self, token_bucket: TokenBucket):
+            self.token_bucket = token_bucket
+            self.last_command = None
+            self.last_command_time = 0.0
+            self.last_seen_time = 0.0
+            self.is_throttled = False
+
+    def __init__(self, burst: int, refill_rate: float, duplicate_window: float):
+        self._burst = burst
+        self._refill_rate = refill_rate
+        self._duplicate_window = duplicate_window
+        # Users idle for this long have a full bucket and no live duplicate, so their state can be forgotten.
+        self._idle_time = max(burst / refill_rate, duplicate_window)
+        self._users_states = collections.OrderedDict()
+        self._accepted_commands_count = 0
+        self._throttled_commands_count = 0
+        self._duplicate_commands_count = 0
+
+    @property
+    def tracked_users_count(self) -> int:
+        return len(self._users_states)
+
+    @property
+    def accepted_commands_count(self) -> int:
+        return self._accepted_commands_count
+
+    @property
+    def throttled_commands_count(self) -> int:
+        return self._throttled_commands_count
+
+    @property
+    def duplicate_commands_count(self) -> int:
+        return self._duplicate_commands_count
+
+    @property
+    def rejected_commands_count(self) -> int:
+        return self._throttled_commands_count + self._duplicate_commands_count
+
+    def check(self, user_name: str, command: str) -> 'InboundCommandFilter.Verdict':
+        now = time.monotonic()
+        self._forget_idle_users(now)
+        user_state = self._user_state(user_name)
+        user_state.last_seen_time = now
+        command = ' '.join(command.split())
+        if command == user_state.last_command and now - user_state.last_command_time < self._duplicate_window:
+            self._duplicate_commands_count += 1
+            logger.debug("Ignoring duplicated command '%s' from '%s'.", command, user_name)
+            return self.Verdict.Duplicate
+        if not user_state.token_bucket.try_take():
+            self._throttled_commands_count += 1
+            logger.debug("Throttling command '%s' from '%s'.", command, user_name)
+            if user_state.is_throttled:
+                return self.Verdict.Throttled
+            user_state.is_throttled = True
+            return self.Verdict.FirstThrottled
+        user_state.last_command = command
+        user_state.last_command_time = now
+        user_state.is_throttled = False
+        self._accepted_commands_count += 1
+        return self.Verdict.Accepted
+
+    def _user_state(self, user_name: str) -> 'InboundCommandFilter.UserState':
+        user_state = self._users_states.get(user_name)
+        if user_state is None:
+            user_state = self.UserState(TokenBucket(self._burst, self._refill_rate))
+            self._users_states[user_name] = user_state
+        else:
+            self._users_states.move_to_end(user_name)
+        return user_state
+
+    def _forget_idle_users(self, now: float):
+        while len(self._users_states) > 0:
+            user_state = next(iter(self._users_states.values()))
+            if now - user_state.last_seen_time < self._idle_time:
+                break
+            self._users_states.popitem(last=False)
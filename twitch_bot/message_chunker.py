@@ -0,0 +1,53 @@
+class MessageChunker:
+    RESPONSE_BOUNDARY = '\n'
+    LINE_TERMINATOR = '\r\n'
+
+    def __init__(self, line_prefix: str, max_characters: int, max_line_bytes: int):
+        self._max_characters = max_characters
+        self._max_bytes = max_line_bytes - len((line_prefix + self.LINE_TERMINATOR).encode())
+        if self._max_bytes <= 0:
+            raise ValueError(f"Line prefix '{line_prefix}' does not leave space for message content.")
+
+    @property
+    def max_characters(self) -> int:
+        return self._max_characters
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    def fits(self, text: str) -> bool:
+        if len(text) > self._max_characters:
+            return False
+        if text.isascii():
+            return len(text) <= self._max_bytes
+        return len(text.encode()) <= self._max_bytes
+
+    def chunk(self, message: str) -> list[str]:
+        chunks = []
+        remaining = message.strip()
+        while len(remaining) > 0:
+            if self.fits(remaining):
+                chunks.append(remaining)
+                break
+            split_index = self._split_index(remaining, self._max_fitting_length(remaining))
+            chunks.append(remaining[:split_index].rstrip())
+            remaining = remaining[split_index:].lstrip()
+        return chunks
+
+    def _max_fitting_length(self, text: str) -> int:
+        candidate = text[:self._max_characters]
+        if candidate.isascii():
+            return min(len(candidate), self._max_bytes)
+        encoded_candidate = candidate.encode()
+        if len(encoded_candidate) <= self._max_bytes:
+            return len(candidate)
+        return len(encoded_candidate[:self._max_bytes].decode(errors='ignore'))
+
+    def _split_index(self, text: str, max_length: int) -> int:
+        min_split_index = max_length // 2
+        for separator in (self.RESPONSE_BOUNDARY, ' '):
+            split_index = text.rfind(separator, min_split_index, max_length + 1)
+            if split_index > 0:
+                return split_index
+        return max_length
@@ -0,0 +1,231 @@
+import asyncio
+import collections
+import enum
+import logging
+import time
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    def __init__(self, capacity: int, refill_rate: float):
+        self._capacity = capacity
+        self._refill_rate = refill_rate
+        self._tokens = float(capacity)
+        self._last_refill_time = time.monotonic()
+
+    @classmethod
+    def for_rate_limit(cls, messages: int, period: float) -> '__class__':
+        # Burst plus refill over any window of `period` seconds never exceeds `messages`.
+        capacity = max(messages // 4, 1)
+        return cls(capacity, (messages - capacity) / period)
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def refill_rate(self) -> float:
+        return self._refill_rate
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self._tokens + (now - self._last_refill_time) * self._refill_rate, self._capacity)
+        self._last_refill_time = now
+
+    def try_take(self) -> bool:
+        self._refill()
+        if self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        return True
+
+    def time_until_available(self) -> float:
+        self._refill()
+        return max(1.0 - self._tokens, 0.0) / self._refill_rate
+
+    async def take(self):
+        while not self.try_take():
+            await asyncio.sleep(self.time_until_available())
+
+
+class OutboundMessageQueue:
+    class Lane(enum.IntEnum):
+        System = 0
+        Reply = 1
+        Prompt = 2
+        Narration = 3
+
+    class QueuedMessage:
+        def __init__(
+                self,
+                sequence_number: int,
+                enqueue_time: float,
+                message: str,
+                lane: 'OutboundMessageQueue.Lane',
+                order_keys: frozenset[str]):
+            self.sequence_number = sequence_number
+            self.enqueue_time = enqueue_time
+            self.message = message
+            self.lane = lane
+            self.order_keys = order_keys
+
+    # Share of the rate limit each non-empty lane gets when several lanes are backlogged.
+    LANES_WEIGHTS = {
+        Lane.System: 6,
+        Lane.Reply: 3,
+        Lane.Prompt: 2,
+        Lane.Narration: 1
+    }
+    # Only messages nobody has to answer may be dropped, prompts waiting for a player's decision never are.
+    DROPPABLE_LANES = (Lane.Narration,)
+
+    def __init__(self, sender: Callable[[str], Awaitable], token_bucket: TokenBucket, max_size: int):
+        self._sender = sender
+        self._token_bucket = token_bucket
+        self._max_size = max_size
+        self._lanes = {lane: collections.deque() for lane in self.Lane}
+        self._lanes_credits = {lane: 0 for lane in self.Lane}
+        # Queued messages of each order key in the order they were put, whatever their lanes.
+        self._order_keys_messages: dict[str, collections.deque[OutboundMessageQueue.QueuedMessage]] = {}
+        self._next_sequence_number = 0
+        self._depth = 0
+        self._messages_available = asyncio.Event()
+        self._last_wait_time = 0.0
+        self._max_wait_time = 0.0
+        self._sent_messages_count = 0
+        self._rejected_messages_count = 0
+        self._dropped_messages_count = 0
+
+    @property
+    def depth(self) -> int:
+        return self._depth
+
+    def lane_depth(self, lane: 'OutboundMessageQueue.Lane') -> int:
+        return len(self._lanes[lane])
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    @property
+    def last_wait_time(self) -> float:
+        return self._last_wait_time
+
+    @property
+    def max_wait_time(self) -> float:
+        return self._max_wait_time
+
+    @property
+    def sent_messages_count(self) -> int:
+        return self._sent_messages_count
+
+    @property
+    def rejected_messages_count(self) -> int:
+        return self._rejected_messages_count
+
+    @property
+    def dropped_messages_count(self) -> int:
+        return self._dropped_messages_count
+
+    def put(
+            self,
+            messages: list[str],
+            lane: 'OutboundMessageQueue.Lane'=Lane.Reply,
+            order_keys: frozenset[str]=frozenset()) -> bool:
+        # Messages sharing an order key, e.g. lines addressed to one player, are sent in the order they were put
+        # whatever their lanes, other messages only follow the order of their lane.
+        if not self._make_room(len(messages), lane):
+            self._rejected_messages_count += len(messages)
+            logger.warning(
+                "Outbound queue full (%d/%d). Rejected %d %s message(s).",
+                self.depth, self._max_size, len(messages), lane.name)
+            return False
+        enqueue_time = time.monotonic()
+        for message in messages:
+            queued_message = self.QueuedMessage(self._next_sequence_number, enqueue_time, message, lane, order_keys)
+            self._next_sequence_number += 1
+            self._lanes[lane].append(queued_message)
+            for order_key in order_keys:
+                self._order_keys_messages.setdefault(order_key, collections.deque()).append(queued_message)
+        self._depth += len(messages)
+        self._messages_available.set()
+        return True
+
+    def _make_room(self, messages_count: int, lane: 'OutboundMessageQueue.Lane') -> bool:
+        missing_room = self._depth + messages_count - self._max_size
+        if missing_room <= 0:
+            return True
+        droppable_lanes = [droppable_lane for droppable_lane in self.DROPPABLE_LANES if droppable_lane >= lane]
+        if sum(self.lane_depth(droppable_lane) for droppable_lane in droppable_lanes) < missing_room:
+            return False
+        # Oldest narration is the least useful, so it makes room for anything at least as important.
+        for droppable_lane in sorted(droppable_lanes, reverse=True):
+            messages = self._lanes[droppable_lane]
+            while missing_room > 0 and len(messages) > 0:
+                self._forget_order(messages.popleft())
+                self._depth -= 1
+                self._dropped_messages_count += 1
+                missing_room -= 1
+        logger.warning(
+            "Outbound queue full (%d). Dropped old narration to fit %s message(s).", self._max_size, lane.name)
+        return True
+
+    def _forget_order(self, queued_message: 'OutboundMessageQueue.QueuedMessage'):
+        for order_key in queued_message.order_keys:
+            order_key_messages = self._order_keys_messages[order_key]
+            order_key_messages.remove(queued_message)
+            if len(order_key_messages) == 0:
+                del self._order_keys_messages[order_key]
+
+    def _next_message(self) -> (float, str):
+        # Smooth weighted round robin over non-empty lanes.
+        backlogged_lanes = [lane for lane in self.Lane if len(self._lanes[lane]) > 0]
+        total_weight = 0
+        for lane in backlogged_lanes:
+            self._lanes_credits[lane] += self.LANES_WEIGHTS[lane]
+            total_weight += self.LANES_WEIGHTS[lane]
+        selected_lane = max(backlogged_lanes, key=lambda lane: self._lanes_credits[lane])
+        queued_message = self._oldest_sharing_order_key(self._lanes[selected_lane][0])
+        self._lanes_credits[queued_message.lane] -= total_weight
+        for lane in self.Lane:
+            if len(self._lanes[lane]) == 0:
+                self._lanes_credits[lane] = 0
+        self._depth -= 1
+        self._lanes[queued_message.lane].remove(queued_message)
+        self._forget_order(queued_message)
+        return queued_message.enqueue_time, queued_message.message
+
+    def _oldest_sharing_order_key(
+            self,
+            queued_message: 'OutboundMessageQueue.QueuedMessage') -> 'OutboundMessageQueue.QueuedMessage':
+        # Older message sharing an order key goes first, wherever it waits, so no key's messages are overtaken.
+        while True:
+            oldest_message = queued_message
+            for order_key in queued_message.order_keys:
+                order_key_message = self._order_keys_messages[order_key][0]
+                if order_key_message.sequence_number < oldest_message.sequence_number:
+                    oldest_message = order_key_message
+            if oldest_message is queued_message:
+                return queued_message
+            queued_message = oldest_message
+
+    async def run(self):
+        while True:
+            if self._depth == 0:
+                self._messages_available.clear()
+                await self._messages_available.wait()
+            await self._token_bucket.take()
+            enqueue_time, message = self._next_message()
+            self._update_wait_time(time.monotonic() - enqueue_time)
+            try:
+                await self._sender(message)
+                self._sent_messages_count += 1
+            except Exception as exc:
+                logger.error("Could not send message '%s'. Reason - %s.", message, exc)
+            logger.debug("Sent message after %.2fs in outbound queue (%d left).", self._last_wait_time, self.depth)
+
+    def _update_wait_time(self, wait_time: float):
+        self._last_wait_time = wait_time
+        self._max_wait_time = max(self._max_wait_time, wait_time)
@@ -0,0 +1,74 @@
+import asyncio
+import logging
+from twitch_bot.message_chunker import MessageChunker
+from twitch_bot.outbound_message_queue import OutboundMessageQueue
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCoalescer:
+    SEPARATOR = MessageChunker.RESPONSE_BOUNDARY
+
+    def __init__(
+            self,
+            sender: Callable[[str, OutboundMessageQueue.Lane, frozenset[str]], bool],
+            message_chunker: MessageChunker,
+            window: float):
+        self._sender = sender
+        self._message_chunker = message_chunker
+        self._window = window
+        self._pending_responses = []
+        self._pending_length = 0
+        self._flush_handle: asyncio.TimerHandle = None
+
+    @property
+    def pending_responses_count(self) -> int:
+        return len(self._pending_responses)
+
+    def add(self, response: str, lane: OutboundMessageQueue.Lane=OutboundMessageQueue.Lane.Reply, order_key: str=None):
+        self._pending_responses.append((response, lane, order_key))
+        self._pending_length += len(response) + len(self.SEPARATOR)
+        if self._pending_length >= self._message_chunker.max_characters or self._window <= 0:
+            self.flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self._window, self.flush)
+
+    def flush(self) -> bool:
+        # Responses are sent later than they are added, so only flushing knows whether the sender accepted them.
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        responses = self._pending_responses
+        self._pending_responses = []
+        self._pending_length = 0
+        messages = self._pack(responses)
+        if len(messages) < len(responses):
+            logger.debug("Coalesced %d responses into %d message(s).", len(responses), len(messages))
+        are_all_accepted = True
+        for message, lane, order_keys in messages:
+            are_all_accepted = self._sender(message, lane, order_keys) and are_all_accepted
+        return are_all_accepted
+
+    def _pack(
+            self,
+            responses: list[tuple[str, OutboundMessageQueue.Lane, str]]
+    ) -> list[tuple[str, OutboundMessageQueue.Lane, frozenset[str]]]:
+        # Merged message takes the most urgent lane of its responses and keeps the order of all their keys.
+        messages = []
+        message, message_lane, message_order_keys = '', None, frozenset()
+        for response, lane, order_key in responses:
+            order_keys = frozenset() if order_key is None else frozenset((order_key,))
+            if len(message) == 0:
+                message, message_lane, message_order_keys = response, lane, order_keys
+            else:
+                merged_message = message + self.SEPARATOR + response
+                if self._message_chunker.fits(merged_message):
+                    message, message_lane = merged_message, min(message_lane, lane)
+                    message_order_keys = message_order_keys.union(order_keys)
+                else:
+                    messages.append((message, message_lane, message_order_keys))
+                    message, message_lane, message_order_keys = response, lane, order_keys
+        if len(message) > 0:
+            messages.append((message, message_lane, message_order_keys))
+        return messages
@@ -1,3 +1,4 @@
+from twitch_bot.outbound_message_queue import OutboundMessageQueue
 from twitchio.dataclasses import User
 from typing import Callable
 
@@ -24,5 +25,9 @@ class TwitchInterface:
     def unignore_user(self, user_name: str):
         raise NotImplementedError(f'{self.__class.__name__}.{self.unignore_user}')
 
-    def send_message(self, message: str) -> bool:
+    def send_message(
+            self,
+            message: str,
+            lane: OutboundMessageQueue.Lane=OutboundMessageQueue.Lane.Reply,
+            order_keys: frozenset[str]=frozenset()) -> bool:
         raise NotImplementedError(f'{self.__class.__name__}.{self.send_message}')
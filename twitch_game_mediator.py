@@ -0,0 +1,78 @@
+from game.controller import Controller as GameController
+from game.game_interface import GameInterface
+from twitch_bot.ad_bot import User
+from twitch_bot.outbound_message_queue import OutboundMessageQueue
+from twitch_bot.twitch_interface import TwitchInterface
+from twitch_bot.response_coalescer import ResponseCoalescer
+
+
+class TwitchGameMediator:
+    DEFAULT_RESPONSE_COALESCING_WINDOW = 0.5
+    RESPONSE_ORIGINS_LANES = {
+        GameInterface.ResponseOrigin.User: OutboundMessageQueue.Lane.Reply,
+        GameInterface.ResponseOrigin.Admin: OutboundMessageQueue.Lane.System,
+        GameInterface.ResponseOrigin.Event: OutboundMessageQueue.Lane.Prompt,
+        GameInterface.ResponseOrigin.Narration: OutboundMessageQueue.Lane.Narration
+    }
+
+    def __init__(
+            self,
+            ad_twitch_bot: TwitchInterface,
+            game_controller: GameController,
+            response_coalescing_window: float):
+        self._ad_twitch_bot = ad_twitch_bot
+        self._game_controller = game_controller
+        self._response_coalescer = ResponseCoalescer(
+            self._send_coalesced_message,
+            self._ad_twitch_bot.message_chunker,
+            response_coalescing_window)
+        self._connect_twitch_if_events()
+        self._connect_game_if_events()
+
+    def _connect_twitch_if_events(self):
+        self._ad_twitch_bot.set_bot_connected_event_handler(self._handle_bot_connected)
+        self._ad_twitch_bot.set_join_event_handler(self._handle_user_joined_channel)
+        self._ad_twitch_bot.set_part_event_handler(self._handle_user_left_channel)
+        self._ad_twitch_bot.set_message_event_handler(self._handle_user_sent_message)
+        self._ad_twitch_bot.set_command_event_handler(self._handle_user_command)
+
+    def _connect_game_if_events(self):
+        self._game_controller.set_response_event_handler(self._handle_game_response)
+
+    def _handle_bot_connected(self):
+        pass
+
+    def _handle_user_joined_channel(self, user: User):
+        self._game_controller.add_active_player(self._player_name(user))
+
+    def _handle_user_left_channel(self, user: User):
+        self._game_controller.remove_active_player(self._player_name(user))
+
+    def _handle_user_sent_message(self, user: User):
+        self._game_controller.add_active_player(self._player_name(user))
+
+    def _handle_user_command(self, user: User, command: str, args: list[str]):
+        self._game_controller.handle_user_action(self._player_name(user), command, args)
+
+    def _handle_game_response(self, response: str, origin: GameInterface.ResponseOrigin):
+        self._response_coalescer.add(
+            response,
+            self.RESPONSE_ORIGINS_LANES[origin],
+            self._addressed_player_name(response))
+
+    def _addressed_player_name(self, response: str) -> str:
+        # Game responses start with '@player: ', so each player's lines keep their order while lanes reorder the
+        # lines of different players.
+        if not response.startswith('@'):
+            return None
+        return response[1:].partition(':')[0]
+
+    def _send_coalesced_message(
+            self,
+            message: str,
+            lane: OutboundMessageQueue.Lane,
+            order_keys: frozenset[str]) -> bool:
+        return self._ad_twitch_bot.send_message(message, lane, order_keys)
+
+    def _player_name(self, user: User) -> str:
+        return user.name.strip()